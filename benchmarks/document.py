@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+editor document on 10k line file, edit followed by type lookup (hover)
+
+    python -m benchmarks.document
+"""
+import time
+
+from dotextensions.server.document import HttpDocument, TextEdit
+from dotextensions.server.handlers.gohandler import TypeFromPos
+
+REQUEST_COUNT = 1112
+
+
+def generate_http_file(count=REQUEST_COUNT) -> str:
+    blocks = []
+    for index in range(count):
+        blocks.append(
+            f'@name("req{index}")\n'
+            f'POST "https://httpbin.org/post/{index}"\n'
+            f'"header": "value"\n'
+            f'? query = "{index}"\n'
+            f'json({{\n    "index": {index},\n    "key": "value"\n}})\n'
+        )
+    return 'var host = "httpbin.org";\n\n' + "\n".join(blocks)
+
+
+def main():
+    content = generate_http_file()
+    start = time.perf_counter()
+    document = HttpDocument("benchmark.http", content)
+    print(f"{content.count(chr(10))} lines, open: {(time.perf_counter() - start) * 1000:.2f} ms")
+    for name, target in [
+        ("edit top", "req0"),
+        ("edit middle", f"req{REQUEST_COUNT // 2}"),
+        ("edit bottom", f"req{REQUEST_COUNT - 1}"),
+    ]:
+        position = document.content.index(f'"{target}"') + 2
+        start = time.perf_counter()
+        document.apply_change([TextEdit(position, position, "x")])
+        edited = time.perf_counter()
+        TypeFromPos.figure_n_get(document.get_model(), position)
+        looked_up = time.perf_counter()
+        print(
+            f"{name:<12} edit: {(edited - start) * 1000:6.2f} ms"
+            f" type lookup: {(looked_up - edited) * 1000:6.2f} ms"
+        )
+    assert document.full_parses == 1
+
+
+if __name__ == "__main__":
+    main()
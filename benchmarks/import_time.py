@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+import time of cli (`python -X importtime`), fails when it goes over budget
+or when optional dependencies, which are loaded on first use, are imported eagerly
+
+    python -m benchmarks.import_time
+    pytest benchmarks/import_time.py
+"""
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, Tuple
+
+MODULE = "dothttp.cli"
+# milliseconds, cumulative import time of cli (best of `RUNS`), override with env
+IMPORT_BUDGET_MS = float(os.environ.get("DOTHTTP_IMPORT_BUDGET_MS", 600))
+RUNS = 5
+# loaded only by scripts, property files or auth which need them (see `dothttp.utils.lazy`)
+LAZY_MODULES = (
+    "faker",
+    "msal",
+    "jsonschema",
+    "yaml",
+    "toml",
+    "xmltodict",
+    "magic",
+    "requests_ntlm",
+    "requests_aws4auth",
+    "requests_hawk",
+    "dothttp.auth.azure_auth",
+)
+
+_line_regex = re.compile(r"^import time:\s+(?P<own>\d+) \|\s+(?P<cumulative>\d+) \|(?P<indent>\s+)(?P<name>\S+)$")
+
+
+def get_import_times(module: str = MODULE) -> Dict[str, Tuple[int, int]]:
+    """module -> (own, cumulative) microseconds, in fresh interpreter"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    ).stderr
+    times = {}
+    for line in output.splitlines():
+        match = _line_regex.match(line)
+        if match:
+            times[match.group("name")] = (int(match.group("own")), int(match.group("cumulative")))
+    return times
+
+
+def get_best_import_time(module: str = MODULE, runs: int = RUNS) -> Tuple[float, Dict[str, Tuple[int, int]]]:
+    """milliseconds of fastest run and its module times (disk cache and noise are skipped)"""
+    best = None
+    for _ in range(runs):
+        times = get_import_times(module)
+        total = times[module][1] / 1000
+        if best is None or total < best[0]:
+            best = (total, times)
+    return best
+
+
+def test_import_budget():
+    total, _ = get_best_import_time()
+    assert total < IMPORT_BUDGET_MS, f"import of {MODULE} took {total:.1f}ms, budget is {IMPORT_BUDGET_MS}ms"
+
+
+def test_lazy_modules_not_imported():
+    times = get_import_times()
+    imported = [module for module in LAZY_MODULES if module in times]
+    assert not imported, f"{imported} are imported by {MODULE}, they should be loaded on first use"
+
+
+def main():
+    total, times = get_best_import_time()
+    print(f"import {MODULE}: {total:.1f}ms (budget {IMPORT_BUDGET_MS}ms)\n")
+    print(f"{'cumulative':>12}{'own':>10}  module")
+    top = sorted(times.items(), key=lambda item: item[1][1], reverse=True)[:20]
+    for name, (own, cumulative) in top:
+        print(f"{cumulative / 1000:>10.1f}ms{own / 1000:>8.1f}ms  {name}")
+    eager = [module for module in LAZY_MODULES if module in times]
+    if eager:
+        print(f"\nimported eagerly: {', '.join(eager)}")
+    if eager or total >= IMPORT_BUDGET_MS:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
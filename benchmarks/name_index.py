@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+name lookups on large http files (5k requests)
+
+    python -m benchmarks.name_index
+    pytest benchmarks/name_index.py  # with pytest-benchmark
+"""
+import timeit
+
+from dothttp.parse import BaseModelProcessor, model_cache
+from dothttp.parse.name_index import NameIndex, find_duplicate_name
+
+REQUEST_COUNT = 5000
+
+
+def generate_http_file(count=REQUEST_COUNT) -> str:
+    blocks = ['@name("base")\nGET "https://httpbin.org"\n']
+    for index in range(1, count):
+        # every request extends previous one, last target has longest chain
+        blocks.append(
+            f'@name("req{index}"): "{"base" if index == 1 else f"req{index - 1}"}"\n'
+            f'GET "/get/{index}"\n'
+        )
+    return "\n".join(blocks)
+
+
+def load_https(count=REQUEST_COUNT):
+    return model_cache.model_from_str(generate_http_file(count)).allhttps
+
+
+def linear_get_target(target, https):
+    # `get_target` before name index
+    return next(http for http in https if http.namewrap and http.namewrap.name == target)
+
+
+def linear_validate_names(https):
+    # `validate_names` before name index
+    names = []
+    for index, http in enumerate(https):
+        name = http.namewrap.name if http.namewrap else str(index + 1)
+        if name in names:
+            raise Exception(name)
+        names.append(name)
+        names.append(str(index + 1))
+
+
+def linear_resolve_chain(https, depth):
+    http = linear_get_target(f"req{len(https) - 1}", https)
+    for _ in range(depth):
+        http = linear_get_target(http.namewrap.base, https)
+    return http
+
+
+def indexed_resolve_chain(https, depth):
+    name_index = NameIndex(https)
+    http = name_index.get(f"req{len(https) - 1}")
+    for _ in range(depth):
+        http = name_index.get(http.namewrap.base)
+    return http
+
+
+def indexed_validate_names(https):
+    assert find_duplicate_name(
+        http.namewrap.name if http.namewrap else None for http in https
+    ) is None
+
+
+# walking complete chain with linear scan is quadratic, 100 ancestors are enough to show it
+CHAIN_DEPTH = 100
+
+
+def test_linear_chain(benchmark):
+    https = load_https()
+    benchmark(linear_resolve_chain, https, CHAIN_DEPTH)
+
+
+def test_indexed_chain(benchmark):
+    https = load_https()
+    benchmark(indexed_resolve_chain, https, CHAIN_DEPTH)
+
+
+def test_linear_validate_names(benchmark):
+    https = load_https()
+    benchmark(linear_validate_names, https)
+
+
+def test_indexed_validate_names(benchmark):
+    https = load_https()
+    benchmark(indexed_validate_names, https)
+
+
+def main():
+    https = load_https()
+    assert linear_resolve_chain(https, CHAIN_DEPTH) is indexed_resolve_chain(
+        https, CHAIN_DEPTH
+    )
+    assert BaseModelProcessor.get_target("req1", https) is https[1]
+    for name, func, args in [
+        ("resolve chain (linear)", linear_resolve_chain, (https, CHAIN_DEPTH)),
+        ("resolve chain (index)", indexed_resolve_chain, (https, CHAIN_DEPTH)),
+        ("validate names (linear)", linear_validate_names, (https,)),
+        ("validate names (index)", indexed_validate_names, (https,)),
+    ]:
+        seconds = min(timeit.repeat(lambda: func(*args), number=1, repeat=3))
+        print(f"{name:<26} {len(https)} requests: {seconds * 1000:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+loading one named target of a large http file, with empty model cache (cold cli run)
+
+    python -m benchmarks.target_only
+    pytest benchmarks/target_only.py  # with pytest-benchmark
+"""
+import os
+import tempfile
+import timeit
+
+from dothttp.parse import model_cache
+from dothttp.parse.request_base import Config, RequestCompiler
+
+REQUEST_COUNT = 300
+TARGET = f"req{REQUEST_COUNT // 2}"
+
+
+def generate_http_file(count=REQUEST_COUNT) -> str:
+    blocks = ['var host = "httpbin.org";\n']
+    for index in range(count):
+        blocks.append(
+            f'@name("req{index}")\n'
+            f'POST "https://{{{{host}}}}/post/{index}"\n'
+            f'? ("index", "{index}")\n'
+            f'json({{"index": {index}, "items": [1, 2, 3], "name": "{{{{name=default}}}}"}})\n'
+        )
+    return "\n".join(blocks)
+
+
+class FullParseCompiler(RequestCompiler):
+    target_only_parsing = False
+
+
+def load(filename, cls=RequestCompiler):
+    # every run starts with empty model cache, as cli does without disk cache
+    model_cache.clear()
+    config = Config(
+        file=filename,
+        curl=False,
+        debug=False,
+        property_file=None,
+        env=[],
+        properties=[],
+        no_cookie=True,
+        format=False,
+        info=False,
+        target=TARGET,
+    )
+    return cls(config).get_request()
+
+
+def write_http_file() -> str:
+    fd, filename = tempfile.mkstemp(suffix=".http")
+    with os.fdopen(fd, "w") as f:
+        f.write(generate_http_file())
+    return filename
+
+
+def test_target_only(benchmark):
+    filename = write_http_file()
+    try:
+        benchmark(load, filename)
+    finally:
+        os.remove(filename)
+
+
+def test_full_parse(benchmark):
+    filename = write_http_file()
+    try:
+        benchmark(load, filename, FullParseCompiler)
+    finally:
+        os.remove(filename)
+
+
+def main():
+    filename = write_http_file()
+    try:
+        assert load(filename).url == load(filename, FullParseCompiler).url
+        for name, cls in [("full parse", FullParseCompiler), ("target only", RequestCompiler)]:
+            seconds = min(timeit.repeat(lambda: load(filename, cls), number=1, repeat=5))
+            print(f"{name:<12} {REQUEST_COUNT} requests: {seconds * 1000:10.2f} ms")
+    finally:
+        os.remove(filename)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+batch mode of cli, runs jobs read as json lines and writes result of each job as json line.
+
+    {"id": "login", "file": "api.http", "target": "login", "env": ["dev"], "properties": {"user": "a"}}
+    {"content": "GET https://httpbin.org/get"}
+
+job records are params of `/file/execute` (`/content/execute` when job has `content`),
+results are in same shape as server's (`{"id": ..., "result": ...}`) and are written as jobs complete.
+jobs share models, property files and session (connections and cookies) of the process.
+"""
+import json
+import logging
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, TextIO
+
+from dothttp.exceptions import DotHttpException
+
+from .handlers.basic_handlers import ContentExecuteHandler, RunHttpFileHandler
+from .models import Command, Result
+
+logger = logging.getLogger("handler")
+
+
+@dataclass
+class BatchSummary:
+    jobs: int = 0
+    errors: int = 0
+
+    @property
+    def success(self) -> bool:
+        return self.errors == 0
+
+
+class BatchRunner:
+    def __init__(
+        self,
+        output: Optional[TextIO] = None,
+        workers: int = 1,
+        defaults: Optional[Dict] = None,
+    ):
+        self.output = output or sys.stdout
+        self.workers = max(workers or 1, 1)
+        # params from command line, job's own params take precedence
+        self.defaults = defaults or {}
+        self.file_handler = RunHttpFileHandler()
+        self.content_handler = ContentExecuteHandler()
+        self.summary = BatchSummary()
+        self._lock = threading.Lock()
+        # jobs read ahead of workers are bounded, input can be arbitrarily long
+        self._slots = threading.BoundedSemaphore(self.workers * 2)
+
+    def get_command(self, job_id, job: Dict) -> Command:
+        params = {**self.defaults, **job}
+        params.pop("id", None)
+        if isinstance(job.get("properties"), dict):
+            # job's properties are merged over command line properties
+            params["properties"] = {**self.defaults.get("properties", {}), **job["properties"]}
+        handler = self.content_handler if params.get("content") else self.file_handler
+        return Command(method=handler.get_method(), params=params, id=job_id)
+
+    def run_job(self, job_id, job) -> Result:
+        if not isinstance(job, dict):
+            return Result.to_error(Command(method="", params={}, id=job_id), "job should be json object")
+        command = self.get_command(job_id, job)
+        if not command.params.get("file") and not command.params.get("content"):
+            return Result.to_error(command, "job needs `file` or `content`")
+        handler = self.content_handler if command.method == self.content_handler.get_method() else self.file_handler
+        try:
+            return handler.execute(command)
+        except DotHttpException as exc:
+            message = exc.message
+        except Exception as exc:
+            message = str(exc)
+        # error is part of job's result, traceback is only for debugging
+        logger.debug(f"job {job_id} failed", exc_info=True)
+        return Result.to_error(command, message)
+
+    def write_result(self, result: Result):
+        line = json.dumps({"id": result.id, "result": result.result}, default=str)
+        with self._lock:
+            self.summary.jobs += 1
+            if result.result.get("error"):
+                self.summary.errors += 1
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def _run_and_write(self, job_id, job):
+        try:
+            result = self.run_job(job_id, job)
+        except Exception as exc:
+            logger.debug(f"job {job_id} failed", exc_info=True)
+            result = Result(id=job_id, result={"error_message": str(exc), "error": True})
+        finally:
+            self._slots.release()
+        self.write_result(result)
+
+    def run(self, lines: Iterable[str]) -> BatchSummary:
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="dothttp-batch") as pool:
+            for line_number, line in enumerate(lines, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    job = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.info(f"input line `{line.strip()}` is not json decodable")
+                    self.write_result(
+                        Result(id=line_number, result={"error": True, "error_message": "not json decodable"})
+                    )
+                    continue
+                job_id = job.get("id", line_number) if isinstance(job, dict) else line_number
+                self._slots.acquire()
+                pool.submit(self._run_and_write, job_id, job)
+        return self.summary
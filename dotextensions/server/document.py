@@ -0,0 +1,223 @@
+import logging
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from dothttp.models.parse_models import MultidefHttp
+from dothttp.parse import model_cache
+
+logger = logging.getLogger("handler")
+
+
+@dataclass
+class TextEdit:
+    # offsets in document before this edit is applied
+    start: int
+    end: int
+    text: str
+
+
+def _is_model(model) -> bool:
+    # textx returns empty string for empty document
+    return hasattr(model, "allhttps")
+
+
+def _get_nodes(obj, nodes: list) -> list:
+    """textx objects in subtree of obj (including obj), parent links are not followed"""
+    if isinstance(obj, list):
+        for item in obj:
+            _get_nodes(item, nodes)
+    elif hasattr(type(obj), "_tx_fqn"):
+        nodes.append(obj)
+        for key, value in vars(obj).items():
+            if key != "parent" and not key.startswith("_tx"):
+                _get_nodes(value, nodes)
+    return nodes
+
+
+def _shift(nodes_list: List[list], offset: int):
+    if not offset:
+        return
+    for nodes in nodes_list:
+        for node in nodes:
+            node._tx_position += offset
+            node._tx_position_end += offset
+
+
+class HttpDocument:
+    """
+    open editor document with its parsed model.
+
+    edits are applied as ranges. http definitions touched by an edit are found with
+    `_tx_position` of each definition, only those are reparsed and spliced into
+    cached model; positions of definitions after the edit are shifted.
+    anything unusual (edit breaks syntax, definitions merge, ..) falls back to
+    complete parse, so model is always same as `model_from_str(content)`
+    """
+
+    def __init__(self, uri: str, content: str, version: Optional[int] = None):
+        self.uri = uri
+        self.lock = threading.RLock()
+        self.full_parses = 0
+        self.partial_parses = 0
+        # changes which arrived before their previous version
+        self._pending: Dict[int, List[TextEdit]] = {}
+        self.set_content(content, version)
+
+    def set_content(self, content: str, version: Optional[int] = None):
+        with self.lock:
+            self.content = content
+            self.version = version
+            self._pending = {
+                pending: edits
+                for pending, edits in self._pending.items()
+                if version is not None and pending > version
+            }
+            self._parse_all()
+            self._apply_pending()
+
+    def apply_change(self, edits: List[TextEdit], version: Optional[int] = None):
+        with self.lock:
+            if version is not None and self.version is not None:
+                if version <= self.version:
+                    logger.debug(f"ignoring stale change {version} for {self.uri}")
+                    return
+                if version > self.version + 1:
+                    # handlers run on a pool, keep it until previous change arrives
+                    self._pending[version] = edits
+                    return
+            for edit in edits:
+                self._apply_edit(edit)
+            self.version = version
+            self._apply_pending()
+
+    def _apply_pending(self):
+        while self.version is not None and self.version + 1 in self._pending:
+            self.version += 1
+            for edit in self._pending.pop(self.version):
+                self._apply_edit(edit)
+
+    def get_model(self) -> MultidefHttp:
+        """parsed model of current content. raises syntax error of current content, if any"""
+        with self.lock:
+            if self.error:
+                raise self.error
+            return self.model
+
+    def _parse_all(self):
+        self.full_parses += 1
+        try:
+            self.model = model_cache.model_from_str(self.content)
+            self.error = None
+        except Exception as e:
+            self.model = None
+            self.error = e
+        # flattened nodes of each definition, shifting positions after an edit
+        # is a plain loop instead of walking the tree again
+        self._http_nodes = [
+            _get_nodes(http, []) for http in getattr(self.model, "allhttps", [])
+        ]
+
+    def _apply_edit(self, edit: TextEdit):
+        old_content = self.content
+        if not (0 <= edit.start <= edit.end <= len(old_content)):
+            raise ValueError(
+                f"edit range {edit.start}-{edit.end} outside of document ({len(old_content)})"
+            )
+        self.content = (
+            old_content[: edit.start] + edit.text + old_content[edit.end :]
+        )
+        if not self._splice(edit, len(old_content)):
+            self._parse_all()
+
+    def _splice(self, edit: TextEdit, old_length: int) -> bool:
+        model = self.model
+        if not _is_model(model) or not model.allhttps:
+            return False
+        https = model.allhttps
+        starts = [http._tx_position for http in https]
+        # an edit right at start of a definition can extend previous one (new header),
+        # so previous definition is reparsed too. -1 is preamble (imports, variables)
+        first = bisect_left(starts, edit.start) - 1
+        last = max(first, bisect_right(starts, edit.end) - 1)
+        delta = len(edit.text) - (edit.end - edit.start)
+        segment_start = starts[first] if first >= 0 else 0
+        segment_end = starts[last + 1] if last + 1 < len(starts) else old_length
+        try:
+            segment = model_cache.model_from_str(
+                self.content[segment_start : segment_end + delta]
+            )
+        except Exception:
+            # mostly syntax errors while typing, complete parse will report it
+            return False
+        if _is_model(segment):
+            if first >= 0 and (segment.import_list or segment.variables):
+                return False
+            new_https = segment.allhttps
+        else:
+            new_https = []
+        before = https[: max(first, 0)]
+        after = https[last + 1 :]
+        if not before and not after and not new_https:
+            return False
+        new_nodes = [_get_nodes(http, []) for http in new_https]
+        after_nodes = self._http_nodes[last + 1 :]
+        _shift(new_nodes, segment_start)
+        _shift(after_nodes, delta)
+        for http in new_https:
+            http.parent = model
+        if first < 0:
+            # preamble was reparsed along with first definitions
+            model.import_list = segment.import_list if _is_model(segment) else None
+            model.variables = segment.variables if _is_model(segment) else []
+            for child in [model.import_list, *model.variables]:
+                if child is not None:
+                    child.parent = model
+            if model.import_list or model.variables:
+                model._tx_position = segment._tx_position
+            else:
+                model._tx_position = (new_https or after)[0]._tx_position
+        model.allhttps = before + new_https + after
+        self._http_nodes = self._http_nodes[: len(before)] + new_nodes + after_nodes
+        model._tx_position_end = model.allhttps[-1]._tx_position_end
+        self.partial_parses += 1
+        return True
+
+
+class DocumentStore:
+    """documents opened by editor, keyed by uri"""
+
+    def __init__(self):
+        self._documents: Dict[str, HttpDocument] = {}
+        self._lock = threading.Lock()
+
+    def open(self, uri: str, content: str, version: Optional[int] = None) -> HttpDocument:
+        document = HttpDocument(uri, content, version)
+        with self._lock:
+            self._documents[uri] = document
+        return document
+
+    def get(self, uri: Optional[str]) -> Optional[HttpDocument]:
+        if not uri:
+            return None
+        with self._lock:
+            return self._documents.get(uri)
+
+    def close(self, uri: str) -> bool:
+        with self._lock:
+            return self._documents.pop(uri, None) is not None
+
+    def get_synced(self, uri: Optional[str], content: Optional[str]) -> Optional[HttpDocument]:
+        """
+        returns open document for uri. if editor sent content along with uri and it
+        differs (missed change), document is resynced with it
+        """
+        document = self.get(uri)
+        if document and content is not None and content != document.content:
+            logger.info(f"document {uri} is out of sync, reloading")
+            document.set_content(content)
+        return document
+
+
+document_store = DocumentStore()
@@ -1,3 +1,4 @@
+import dataclasses
 import mimetypes
 from typing import List
 
@@ -14,13 +15,19 @@ from dothttp.parse import (
     HttpDef,
     MultidefHttp,
     UndefinedHttpToExtend,
+    import_resolver,
+    model_cache,
 )
+from dothttp.parse.adapter_pool import get_session_stats
+from dothttp.parse.name_index import NameIndex
 from dothttp.parse.request_base import (
     CurlCompiler,
     HttpFileFormatter,
+    RequestBase,
     RequestCompiler,
-    dothttp_model,
 )
+from dothttp.utils.profiling import CPROFILE, Profiler
+from ..document import document_store
 from ..models import BaseHandler, Command, DothttpTypes, Result
 from .gohandler import TypeFromPos
 from . import logger
@@ -40,6 +47,25 @@ class VersionHandler(BaseHandler):
         return Result(id=command.id, result={"version": __version__})
 
 
+class ConnectionStatsHandler(BaseHandler):
+    """open, idle and reused connections per host of global session"""
+
+    name = "/connection/stats"
+
+    def get_method(self):
+        return ConnectionStatsHandler.name
+
+    def run(self, command: Command) -> Result:
+        session = RequestBase.global_session
+        return Result(
+            id=command.id,
+            result={
+                "pool": dataclasses.asdict(session.pool_config),
+                "hosts": get_session_stats(session),
+            },
+        )
+
+
 class RunHttpFileHandler(BaseHandler):
     name = "/file/execute"
 
@@ -67,6 +93,18 @@ class RunHttpFileHandler(BaseHandler):
         return result
 
     def execute(self, command):
+        profile = command.params.get("profile")
+        if not profile:
+            return self._execute(command)
+        # `true` or {"mode": "sample", "output": "/tmp/run.collapsed"}
+        options = profile if isinstance(profile, dict) else {}
+        profiler = Profiler(options.get("mode", CPROFILE), options.get("output"))
+        with profiler:
+            result = self._execute(command)
+        result.result["profile"] = profiler.to_dict()
+        return result
+
+    def _execute(self, command):
         config = self.get_config(command)
         if config.curl:
             req = self.get_curl_comp(config)
@@ -97,6 +135,9 @@ class RunHttpFileHandler(BaseHandler):
         curl = params.get("curl", False)
         properties = [f"{i}={j}" for i, j in params.get("properties", {}).items()]
         content = params.get("content", None)
+        if content is None and (document := document_store.get(params.get("uri"))):
+            # document opened by editor with `/document/open`
+            content = document.content
         contexts = params.get("contexts")
         property_file = params.get("property-file", None)
         if contexts is None:
@@ -118,6 +159,8 @@ class RunHttpFileHandler(BaseHandler):
             info=False,
             target=target,
             content=content,
+            session_scope=params.get("session-scope"),
+            session_name=params.get("session"),
         )
         config.contexts = contexts
         return config
@@ -169,6 +212,8 @@ class RunHttpFileHandler(BaseHandler):
                 "body": body,  # for binary out, it will fail, check for alternatives
                 "output_file": output or "",
                 **self._get_resp_data(resp),
+                # milliseconds spent in each phase
+                "timings": comp.timings.to_dict(),
             },
             "script_result": script_result,
             "errors": [error.kwargs for error in comp.property_util.errors],
@@ -241,7 +286,7 @@ class ContentBase(BaseModelProcessor):
         for context in self.args.contexts:
             try:
                 # if model is generated, try to figure out target
-                model: MultidefHttp = dothttp_model.model_from_str(context)
+                model: MultidefHttp = model_cache.model_from_str(context)
                 # by including targets in to model
                 self.load_properties_from_var(model, self.property_util, can_override=False)
                 self.model.allhttps = self.model.allhttps + model.allhttps
@@ -342,13 +387,28 @@ class ResolveBase:
         filename = command.params.get("file")
         content = command.params.get("content")
         pos = command.params.get("position")
-        if content:
-            model: MultidefHttp = dothttp_model.model_from_str(content)
-        else:
-            with open(filename) as f:
-                content = f.read()
-                model: MultidefHttp = dothttp_model.model_from_str(content)
+        uri = command.params.get("uri")
+        if not filename and (document := document_store.get_synced(uri, content)):
+            # document opened by editor, model is kept up to date with edits
+            with document.lock:
+                content = document.content
+                type_dict = TypeFromPos.figure_n_get(document.get_model(), pos)
+            command.params["content"] = content
+        elif content or filename:
+            if not content:
+                with open(filename) as f:
+                    content = f.read()
                 command.params["content"] = content
+            model: MultidefHttp = model_cache.model_from_str(content)
+            type_dict = TypeFromPos.figure_n_get(model, pos)
+        else:
+            return Result(
+                id=command.id,
+                result={
+                    "error_message": "filename or content should be available",
+                    "error": True,
+                },
+            )
         property_hovered = None
         matches = property_regex.finditer(content)
         for match in matches:
@@ -356,7 +416,6 @@ class ResolveBase:
                 property_hovered = match.group()[2:-2].split("=")[0].strip()
                 break
 
-        type_dict = TypeFromPos.figure_n_get(model, pos)
         if "target" not in type_dict:
             command.params["target"] = 1
         else:
@@ -462,28 +521,28 @@ class GetNameReferencesHandler(BaseHandler):
         return result
 
     def parse_n_get(self, http_data, filename: str):
-        model: MultidefHttp = dothttp_model.model_from_str(http_data)
+        model: MultidefHttp = model_cache.model_from_str(http_data)
+        return self.get_names(model, filename)
+
+    def get_names(self, model: MultidefHttp, filename: str):
         all_names = []
         all_urls = []
         imported_names = []
         imported_urls = []
         self.get_for_http(model.allhttps, all_names, all_urls)
-        for new_model, _content in BaseModelProcessor._get_models_from_import(
-            model, filename
-        ):
+        # imported files are read and parsed once, unless modified
+        for new_model, _content in import_resolver.resolve(model, filename):
             self.get_for_http(new_model.allhttps, imported_names, imported_urls)
         return all_names, all_urls, imported_names, imported_urls
 
     def get_for_http(self, allhttps, all_names, all_urls):
-        for index, http in enumerate(allhttps):
+        name_index = NameIndex(allhttps)
+        for http, name in zip(allhttps, name_index.names):
             if http.namewrap:
-                name = http.namewrap.name if http.namewrap else str(index)
                 start = http.namewrap._tx_position
-                end = http._tx_position_end
             else:
                 start = http.urlwrap._tx_position
-                end = http._tx_position_end
-                name = str(index + 1)
+            end = http._tx_position_end
             name = {
                 "name": name,
                 "method": http.urlwrap.method,
@@ -507,11 +566,17 @@ class ContentNameReferencesHandler(GetNameReferencesHandler):
         return ContentNameReferencesHandler.name
 
     def execute(self, command, filename):
-        http_data = command.params.get("content", "")
+        http_data = command.params.get("content", None)
         context = command.params.get("context", [])
-        all_names, all_urls, imported_names, imported_urls = self.parse_n_get(
-            http_data, filename
-        )
+        if document := document_store.get_synced(command.params.get("uri"), http_data):
+            with document.lock:
+                all_names, all_urls, imported_names, imported_urls = self.get_names(
+                    document.get_model(), filename
+                )
+        else:
+            all_names, all_urls, imported_names, imported_urls = self.parse_n_get(
+                http_data or "", filename
+            )
         for context_context in context:
             try:
                 (
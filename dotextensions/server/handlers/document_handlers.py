@@ -0,0 +1,75 @@
+from dotextensions.server.document import TextEdit, document_store
+from dotextensions.server.models import BaseHandler, Result
+
+
+def get_document_result(command, document):
+    return Result.get_result(
+        command,
+        {
+            "uri": document.uri,
+            "version": document.version,
+            "error": False,
+            # syntax error (if any) is reported by lookups on document
+            "valid": document.error is None,
+        },
+    )
+
+
+class DocumentOpenHandler(BaseHandler):
+    """
+    editor opens a document, following `/content/*` requests can send `uri`
+    instead of complete content
+    """
+
+    def get_method(self):
+        return "/document/open"
+
+    def run(self, command):
+        uri = command.params.get("uri")
+        content = command.params.get("content")
+        if not uri or not isinstance(content, str):
+            return Result.to_error(command, "uri and content are required")
+        document = document_store.open(uri, content, command.params.get("version"))
+        return get_document_result(command, document)
+
+
+class DocumentChangeHandler(BaseHandler):
+    """
+    params: {"uri": .., "version": 2, "changes": [{"start": 10, "end": 12, "text": "..."}]}
+    offsets of each change are in document as left by previous change.
+    `content` can be sent instead of changes to replace complete document
+    """
+
+    def get_method(self):
+        return "/document/change"
+
+    def run(self, command):
+        uri = command.params.get("uri")
+        version = command.params.get("version")
+        document = document_store.get(uri)
+        if not document:
+            return Result.to_error(command, f"document {uri} is not open")
+        try:
+            if isinstance(content := command.params.get("content"), str):
+                document.set_content(content, version)
+            else:
+                edits = [
+                    TextEdit(start=change["start"], end=change["end"], text=change["text"])
+                    for change in command.params.get("changes", [])
+                ]
+                document.apply_change(edits, version)
+        except (KeyError, TypeError, ValueError) as e:
+            # document is out of sync, editor has to send complete content
+            return Result.to_error(command, f"invalid change {e}")
+        return get_document_result(command, document)
+
+
+class DocumentCloseHandler(BaseHandler):
+    def get_method(self):
+        return "/document/close"
+
+    def run(self, command):
+        uri = command.params.get("uri")
+        if not document_store.close(uri):
+            return Result.to_error(command, f"document {uri} is not open")
+        return Result.get_result(command, {"uri": uri, "error": False})
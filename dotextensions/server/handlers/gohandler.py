@@ -1,9 +1,10 @@
 import os
 from typing import Any, Union
 
-from dothttp.parse import BaseModelProcessor, Http, MultidefHttp
+from dothttp.parse import Http, MultidefHttp, model_cache
+from dothttp.parse.name_index import NameIndex
 from dothttp.parse.dsl_jsonparser import jsonmodel_to_json
-from dothttp.parse.request_base import dothttp_model
+from ..document import document_store
 from ..models import BaseHandler, Command, DothttpTypes, Result
 
 
@@ -36,6 +37,15 @@ class TypeFromPos(BaseHandler):
                     id=command.id,
                     result={"error_message": f"non existant file", "error": True},
                 )
+        uri: Union[str, None] = command.params.get("uri", None)
+        if not filename and (document := document_store.get_synced(uri, content)):
+            # document opened by editor, model is kept up to date with edits
+            with document.lock:
+                try:
+                    result = self.figure_n_get(document.get_model(), position)
+                except Exception as e:
+                    result = {"error_message": f"unknown Exception {e}", "error": True}
+            return Result(id=command.id, result=result)
         if not filename and not content:
             return Result(
                 id=command.id,
@@ -50,9 +60,9 @@ class TypeFromPos(BaseHandler):
                 result={"error_message": f"content should be string", "error": True},
             )
         if filename:
-            model: MultidefHttp = dothttp_model.model_from_file(filename)
-        else:
-            model: MultidefHttp = dothttp_model.model_from_str(content)
+            with open(filename, "r", encoding="utf-8") as f:
+                content = f.read()
+        model: MultidefHttp = model_cache.model_from_str(content)
         try:
             return Result(id=command.id, result=self.figure_n_get(model, position))
         except Exception as e:
@@ -113,9 +123,9 @@ class TypeFromPos(BaseHandler):
                             base = namewrap.base
                             if base:
                                 try:
-                                    base_position = BaseModelProcessor.get_target(
-                                        base, model.allhttps
-                                    )._tx_position
+                                    base_position = NameIndex(
+                                        model.allhttps
+                                    ).get(base)._tx_position
                                 except BaseException:
                                     pass
                         ret.update(
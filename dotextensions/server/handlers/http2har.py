@@ -40,6 +40,9 @@ class Http2Har(BaseHandler):
             result.result = {
                 "target": {config.target: request_compiler_obj.httpdef.get_har()}
             }
+            if params.get("timings"):
+                # request is not sent, only local phases (parse, properties, scripts) are known
+                result.result["timings"] = {config.target: request_compiler_obj.timings.to_har()}
             return result
         except Exception as e:
             logger.error("unknown error happened", exc_info=True)
@@ -23,8 +23,8 @@ from dothttp.parse import (
     ParameterException,
     Payload,
     UndefinedHttpToExtend,
-    dothttp_model,
     json_or_array_to_json,
+    model_cache,
     request_logger,
 )
 from dothttp.parse.request_base import RequestCompiler
@@ -207,7 +207,7 @@ class Http2Postman(RunHttpFileHandler):
         #     for code in json.loads(content):
         #         if (code["kind"] == 2):
         #
-        http_list = dothttp_model.model_from_str(content)
+        http_list = model_cache.model_from_str(content)
         dothttpenvjson = pathlib.Path(filename).parent.joinpath(".dothttp.json")
         item_list = Items.from_dict(
             {"item": [], "variable": [], "name": os.path.basename(filename)}
@@ -8,7 +8,9 @@ from json import JSONDecodeError
 from typing import Dict
 
 from dothttp.__version__ import __version__ as version
+from dothttp.parse import metamodel_registry
 from .handlers.basic_handlers import (
+    ConnectionStatsHandler,
     ContentExecuteHandler,
     ContentNameReferencesHandler,
     FormatHttpFileHandler,
@@ -19,6 +21,11 @@ from .handlers.basic_handlers import (
     GetHoveredResolvedParamFileHandler
 
 )
+from .handlers.document_handlers import (
+    DocumentChangeHandler,
+    DocumentCloseHandler,
+    DocumentOpenHandler,
+)
 from .handlers.gohandler import TypeFromPos
 from .handlers.har2httphandler import Har2HttpHandler
 from .handlers.http2har import Http2Har
@@ -43,6 +50,7 @@ handlers: Dict[str, BaseHandler] = {
         Har2HttpHandler(),
         Http2Postman(),
         VersionHandler(),
+        ConnectionStatsHandler(),
         GetHoveredResolvedParamContentHandler(),
         GetHoveredResolvedParamFileHandler(),
         CopyHandler(),
@@ -52,7 +60,10 @@ handlers: Dict[str, BaseHandler] = {
         ReadHandler(),
         CreateDirectoryHandler(),
         FileStatHandler(),
-        ReadDirectoryHandler()
+        ReadDirectoryHandler(),
+        DocumentOpenHandler(),
+        DocumentChangeHandler(),
+        DocumentCloseHandler(),
     )
 }
 
@@ -121,6 +132,8 @@ class HttpServer(Base):
 class CmdServer(Base):
     def __init__(self):
         self.pool = concurrent.futures.ThreadPoolExecutor()
+        # metamodel is built lazily, warm it up before first command arrives
+        self.pool.submit(metamodel_registry.get)
 
     def run_forever(self):
         # publish version
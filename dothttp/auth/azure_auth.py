@@ -21,9 +21,16 @@ from ..models.parse_models import (
     AzureAuthWrap,
 )
 
-AZURE_CLI_TOKEN_STORE_PATH = os.path.expanduser("~/.dothttp.azure-cli.pkl")
+AZURE_CLI_TOKEN_STORE = "~/.dothttp.azure-cli.pkl"
+AZURE_CLI_TOKEN_STORE_PATH = os.path.expanduser(AZURE_CLI_TOKEN_STORE)
 
-AZURE_SP_TOKEN_STORE_PATH = os.path.expanduser("~/.dothttp.msal_token_cache.pkl")
+AZURE_SP_TOKEN_STORE = "~/.dothttp.msal_token_cache.pkl"
+AZURE_SP_TOKEN_STORE_PATH = os.path.expanduser(AZURE_SP_TOKEN_STORE)
+
+
+def get_token_store_path(store: str) -> str:
+    """resolved on every use, daemon runs have their caller's `HOME`"""
+    return os.path.expanduser(store)
 
 request_logger = logging.getLogger("request")
 
@@ -73,7 +80,7 @@ class AzureAuth(AuthBase):
         self.token_cache = msal.SerializableTokenCache()
         try:
             # Try to load the token cache from a file
-            with open(AZURE_SP_TOKEN_STORE_PATH, "rb") as token_cache_file:
+            with open(get_token_store_path(AZURE_SP_TOKEN_STORE), "rb") as token_cache_file:
                 self.token_cache.deserialize(json.dumps(pickle.load(token_cache_file)))
         except FileNotFoundError:
             # If the file does not exist, initialize a new token cache
@@ -114,9 +121,9 @@ class AzureAuth(AuthBase):
             else self.azure_auth_wrap.azure_device_code.scope
         )
 
-        if os.path.exists(AZURE_CLI_TOKEN_STORE_PATH):
+        if os.path.exists(get_token_store_path(AZURE_CLI_TOKEN_STORE)):
             request_logger.debug("azure cli token already exists, using")
-            with open(AZURE_CLI_TOKEN_STORE_PATH, "rb") as token_file:
+            with open(get_token_store_path(AZURE_CLI_TOKEN_STORE), "rb") as token_file:
                 data = pickle.load(token_file)
                 scope_wise_store = data.get(scope, {})
                 access_token = scope_wise_store.get("access_token", None)
@@ -145,7 +152,7 @@ class AzureAuth(AuthBase):
                 time.strptime(result_json["expiresOn"], "%Y-%m-%d %H:%M:%S.%f")
             )
             # Save the new access token and its expiry time to the file
-            with open(AZURE_CLI_TOKEN_STORE_PATH, "wb") as token_file:
+            with open(get_token_store_path(AZURE_CLI_TOKEN_STORE), "wb") as token_file:
                 scope_wise_store = dict()
                 scope_wise_store[scope] = {
                     "access_token": access_token,
@@ -191,5 +198,5 @@ class AzureAuth(AuthBase):
         return msal.ConfidentialClientApplication(**kwargs)
 
     def save_token_cache(self):
-        with open(AZURE_SP_TOKEN_STORE_PATH, "wb") as token_cache_file:
+        with open(get_token_store_path(AZURE_SP_TOKEN_STORE), "wb") as token_cache_file:
             pickle.dump(json.loads(self.token_cache.serialize()), token_cache_file)
@@ -0,0 +1,462 @@
+import argparse
+import logging
+import sys
+import textwrap
+import threading
+from typing import List, Optional
+
+from requests.exceptions import RequestException
+
+from .exceptions import DotHttpException
+from .parse.request_base import (
+    Config,
+    CurlCompiler,
+    HttpFileFormatter,
+    RequestCompiler,
+    eprint,
+)
+from .parse import model_cache
+from .parse.model_cache import get_cache_dir
+from .parse.bench import (
+    DEFAULT_BENCH_DURATION,
+    ArrivalProfile,
+    LoadGenerator,
+    MultiProcessLoadGenerator,
+    OpenLoopGenerator,
+    format_bench_progress,
+    format_bench_result,
+    write_bench_report,
+)
+from .parse.session_pool import SESSION_SCOPES
+from .parse.target_runner import MultiTargetRunner, format_result
+from .utils.log_utils import setup_logging
+from .utils.profiling import PROFILE_MODES, Profiler, format_profile_summary
+
+logger = logging.getLogger("dothttp")
+
+
+def run_targets(args: Config):
+    """runs several targets, result of each target is printed as soon as it finishes"""
+    print_lock = threading.Lock()
+
+    def on_result(result):
+        with print_lock:
+            print(format_result(result), flush=True)
+            for test in result.tests:
+                if not test.success:
+                    print(f"    Test: {test.name}  failure!!", flush=True)
+                    if test.error:
+                        print(textwrap.indent(test.error.strip(), "        "), flush=True)
+
+    runner = MultiTargetRunner(args, args.targets, args.parallel or 1, on_result)
+    results = runner.run()
+    failed = sum(1 for result in results if not result.success)
+    print(f"\n{len(results)} targets, {len(results) - failed} succeeded, {failed} failed")
+    return failed == 0
+
+
+def get_arrival_profile(args: Config):
+    if args.bench_steps:
+        return ArrivalProfile.steps(args.bench_steps)
+    duration = args.bench_duration or DEFAULT_BENCH_DURATION
+    if args.bench_ramp_up:
+        return ArrivalProfile.ramp_up(args.bench_rate, args.bench_ramp_up, duration)
+    return ArrivalProfile.constant(args.bench_rate, duration)
+
+
+def run_bench(args: Config):
+    profile = get_arrival_profile(args) if args.bench_rate or args.bench_steps else None
+    if args.bench_processes > 1:
+        generator = MultiProcessLoadGenerator(
+            args,
+            args.bench_processes,
+            workers=args.bench_workers,
+            duration=args.bench_duration,
+            requests=args.bench_requests,
+            profile=profile,
+            on_snapshot=lambda snapshot: eprint(format_bench_progress(snapshot)),
+        )
+    elif profile is not None:
+        generator = OpenLoopGenerator(
+            args,
+            profile,
+            workers=args.bench_workers,
+            requests=args.bench_requests,
+        )
+    else:
+        generator = LoadGenerator(
+            args,
+            workers=args.bench_workers,
+            duration=args.bench_duration,
+            requests=args.bench_requests,
+        )
+    result = generator.run()
+    print(format_bench_result(result))
+    if args.bench_report:
+        write_bench_report(args.bench_report, result, args)
+
+
+def run_batch(args: Config):
+    """jobs as json lines from file or stdin, result of each job is written as json line"""
+    from dotextensions.server.batch import BatchRunner
+
+    defaults = {}
+    if args.property_file:
+        defaults["property-file"] = args.property_file
+    if args.env != ["*"]:
+        defaults["env"] = args.env
+    if args.properties:
+        defaults["properties"] = dict(prop.split("=", 1) for prop in args.properties)
+    if args.no_cookie:
+        defaults["nocookie"] = True
+    if args.target:
+        defaults["target"] = args.target
+    runner = BatchRunner(sys.stdout, args.parallel or 1, defaults)
+    if args.batch == "-":
+        summary = runner.run(sys.stdin)
+    else:
+        with open(args.batch) as jobs:
+            summary = runner.run(jobs)
+    eprint(f"{summary.jobs} jobs, {summary.jobs - summary.errors} succeeded, {summary.errors} failed")
+    return summary.success
+
+
+def apply(args: Config):
+    setup_logging(logging.DEBUG if args.debug else logging.CRITICAL)
+    logger.info(f"command line arguments are {args}")
+    if args.profile is None:
+        return execute(args)
+    profiler = Profiler(args.profile_mode, args.profile or None)
+    try:
+        with profiler:
+            execute(args)
+    finally:
+        # summary goes to stderr, response/results stay on stdout
+        eprint(format_profile_summary(profiler))
+
+
+def execute(args: Config):
+    if args.batch is not None:
+        try:
+            if not run_batch(args):
+                sys.exit(1)
+        except OSError as exc:
+            eprint(f"unable to read jobs: {exc}")
+            sys.exit(1)
+        return
+    if args.bench:
+        try:
+            run_bench(args)
+        except DotHttpException as dotthtppexc:
+            logger.error(f"dothttp exception happened {dotthtppexc}", exc_info=True)
+            eprint(dotthtppexc.message)
+            sys.exit(1)
+        return
+    if args.targets is not None or args.parallel:
+        if args.format or args.curl:
+            eprint("multiple targets can only be executed, not formatted or converted to curl")
+            sys.exit(1)
+        try:
+            if not run_targets(args):
+                sys.exit(1)
+        except DotHttpException as dotthtppexc:
+            logger.error(f"dothttp exception happened {dotthtppexc}", exc_info=True)
+            eprint(dotthtppexc.message)
+            sys.exit(1)
+        return
+    if args.format:
+        if args.experimental:
+            comp_class = HttpFileFormatter
+        else:
+            eprint(
+                "http formatter is still in experimental phase. enable experimental flag to use it (--experimental)"
+            )
+            sys.exit(1)
+    elif args.curl:
+        comp_class = CurlCompiler
+    else:
+        comp_class = RequestCompiler
+    try:
+        comp_class(args).run()
+    except DotHttpException as dotthtppexc:
+        logger.error(f"dothttp exception happened {dotthtppexc}", exc_info=True)
+        eprint(dotthtppexc.message)
+    except RequestException as exc:
+        logger.error(f"exception from requests {exc}", exc_info=True)
+        eprint(exc)
+    except Exception as exc:
+        logger.error(f"unknown error happened {exc}", exc_info=True)
+        eprint(f"unknown exception occurred with message {exc}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="http requests for humans", prog="dothttp"
+    )
+    general_group = parser.add_argument_group("general")
+    general_group.add_argument(
+        "--curl", help="generates curl script", action="store_const", const=True
+    )
+    property_group = parser.add_argument_group("property")
+    property_group.add_argument("--property-file", "-p", help="property file")
+    general_group.add_argument(
+        "--no-cookie",
+        "-nc",
+        help="cookie storage is disabled",
+        action="store_const",
+        const=True,
+    )
+    property_group.add_argument(
+        "--env",
+        "-e",
+        help="environment to select in property file. properties will be enabled on FIFO",
+        nargs="+",
+        default=["*"],
+    )
+    general_group.add_argument(
+        "--debug",
+        "-d",
+        help="debug will enable logs and exceptions",
+        action="store_const",
+        const=True,
+    )
+    general_group.add_argument(
+        "--info", "-i", help="more information", action="store_const", const=True
+    )
+    general_group.add_argument(
+        "--timings",
+        help="print time spent in each phase (parse, properties, dns, connect, tls, ttfb, download, scripts)",
+        action="store_const",
+        const=True,
+    )
+    fmt_group = parser.add_argument_group("format")
+    fmt_group.add_argument(
+        "--format", "-fmt", help="format http file", action="store_const", const=True
+    )
+    property_group.add_argument(
+        "--experimental",
+        "--b",
+        help="enable experimental",
+        action="store_const",
+        const=True,
+    )
+    fmt_group.add_argument(
+        "--stdout", help="print to commandline", action="store_const", const=True
+    )
+    property_group.add_argument(
+        "--property", help="list of property's", nargs="+", default=[]
+    )
+    pool_group = parser.add_argument_group("connection pool")
+    pool_group.add_argument(
+        "--pool-connections",
+        help="number of hosts to keep connection pools for (property file `$pool.connections`)",
+        type=int,
+    )
+    pool_group.add_argument(
+        "--pool-maxsize",
+        help="connections kept per host (property file `$pool.maxsize`)",
+        type=int,
+    )
+    pool_group.add_argument(
+        "--pool-block",
+        help="wait for a free connection when pool of a host is exhausted",
+        action="store_const",
+        const=True,
+    )
+    pool_group.add_argument(
+        "--pool-host",
+        help="connections kept for a particular host, host=maxsize",
+        nargs="+",
+        default=[],
+    )
+    session_group = parser.add_argument_group("session")
+    session_group.add_argument(
+        "--session-scope",
+        help="cookie isolation of requests, only `global` cookies are persisted",
+        choices=SESSION_SCOPES,
+    )
+    session_group.add_argument(
+        "--session-name",
+        help="named session to use for cookies (implies `--session-scope named`)",
+    )
+    general_group.add_argument("file", help="http file (jobs carry their own file in batch mode)", nargs="?")
+    general_group.add_argument(
+        "--target", "-t", help="targets a particular http definition", type=str
+    )
+    multi_group = parser.add_argument_group("multiple targets")
+    multi_group.add_argument(
+        "--targets",
+        help="targets to run in one process (names or positions), all targets when no value is given",
+        nargs="*",
+    )
+    multi_group.add_argument(
+        "--parallel",
+        help="number of targets (or batch jobs) to run at a time (implies --targets), "
+        "targets using properties set by earlier targets' scripts wait for them",
+        type=int,
+    )
+    batch_group = parser.add_argument_group("batch")
+    batch_group.add_argument(
+        "--batch",
+        help="run jobs read as json lines from file (stdin, when no file is given), "
+        "{file, target, env, properties, content}, results are written as json lines as jobs complete",
+        nargs="?",
+        const="-",
+        metavar="JOBS",
+    )
+    bench_group = parser.add_argument_group("bench")
+    bench_group.add_argument(
+        "--bench",
+        help="load test target, reports throughput, errors and latency percentiles",
+        action="store_const",
+        const=True,
+    )
+    bench_group.add_argument(
+        "--workers",
+        help="concurrent workers (closed loop), maximum requests in flight (open loop)",
+        type=int,
+        default=1,
+    )
+    bench_group.add_argument(
+        "--processes",
+        help="processes generating load, each with --workers, load is split across them",
+        type=int,
+        default=1,
+    )
+    bench_group.add_argument(
+        "--duration", help="seconds to run (default 10, when --requests is not given)", type=float
+    )
+    bench_group.add_argument("--requests", help="number of requests to send", type=int)
+    bench_group.add_argument("--report", help="write json report (for comparing runs)")
+    bench_group.add_argument(
+        "--rate",
+        help="open loop, requests per second irrespective of responses, latency is measured from intended start",
+        type=float,
+    )
+    bench_group.add_argument(
+        "--ramp-up", help="open loop, seconds to reach --rate from 0 (part of --duration)", type=float
+    )
+    bench_group.add_argument(
+        "--steps",
+        help="open loop, rate:seconds steps, 10:5 50:5 100:10",
+        nargs="+",
+        default=[],
+    )
+    profile_group = parser.add_argument_group("profile")
+    profile_group.add_argument(
+        "--profile",
+        help="profile run (request, targets or bench), prints top dothttp functions, "
+        "profile is written to given file (pstats for cprofile, collapsed stacks for sample)",
+        nargs="?",
+        const="",
+        metavar="OUTPUT",
+    )
+    profile_group.add_argument(
+        "--profile-mode",
+        help="cprofile (deterministic, main thread) or sample (every thread, low overhead)",
+        choices=PROFILE_MODES,
+        default=PROFILE_MODES[0],
+    )
+    args = parser.parse_args(argv)
+    if args.file is None and args.batch is None:
+        parser.error("the following arguments are required: file")
+    if args.debug and args.info:
+        eprint("info and debug are conflicting options, use debug for more information")
+        sys.exit(1)
+    for one_prop in args.property:
+        if "=" not in one_prop:
+            # FUTURE,
+            # this can be done better by adding validation in add_argument.
+            eprint(f"command line property: `{one_prop}` is invalid, expected prop=val")
+            sys.exit(1)
+    pool_hosts = {}
+    for one_host in args.pool_host:
+        host, _, maxsize = one_host.rpartition("=")
+        if not host or not maxsize.isdigit():
+            eprint(f"pool host: `{one_host}` is invalid, expected host=maxsize")
+            sys.exit(1)
+        pool_hosts[host] = int(maxsize)
+    if args.parallel is not None and args.parallel < 1:
+        eprint(f"parallel: `{args.parallel}` is invalid, expected positive number")
+        sys.exit(1)
+    if args.targets is not None and args.target:
+        eprint("target and targets are conflicting options")
+        sys.exit(1)
+    if args.parallel and args.target and args.batch is None:
+        # parallel runs every target, use targets to pick which
+        eprint("target and parallel are conflicting options, use targets with parallel")
+        sys.exit(1)
+    if args.batch is not None and (args.targets is not None or args.bench or args.curl or args.format):
+        eprint("batch can't be combined with targets, bench, curl or format")
+        sys.exit(1)
+    if args.bench:
+        if args.targets is not None or args.parallel or args.curl or args.format:
+            eprint("bench runs a single target, it can't be combined with targets, parallel, curl or format")
+            sys.exit(1)
+        if args.workers < 1 or args.processes < 1 or (args.duration is not None and args.duration <= 0) or (
+            args.requests is not None and args.requests < 1
+        ):
+            eprint("workers, processes, duration and requests should be positive")
+            sys.exit(1)
+    bench_steps = []
+    for one_step in args.steps:
+        rate, _, seconds = one_step.partition(":")
+        try:
+            bench_steps.append((float(rate), float(seconds)))
+        except ValueError:
+            eprint(f"step: `{one_step}` is invalid, expected rate:seconds")
+            sys.exit(1)
+        if bench_steps[-1][0] <= 0 or bench_steps[-1][1] <= 0:
+            eprint(f"step: `{one_step}` is invalid, rate and seconds should be positive")
+            sys.exit(1)
+    if args.rate is not None and args.rate <= 0:
+        eprint("rate should be positive")
+        sys.exit(1)
+    if args.ramp_up is not None and (args.ramp_up < 0 or args.rate is None):
+        eprint("ramp-up needs --rate, and should not be negative")
+        sys.exit(1)
+    if bench_steps and args.rate is not None:
+        eprint("rate and steps are conflicting options")
+        sys.exit(1)
+    if (bench_steps or args.rate) and not args.bench:
+        eprint("rate and steps are options of --bench")
+        sys.exit(1)
+    config = Config(
+        curl=args.curl,
+        property_file=args.property_file,
+        env=args.env,
+        debug=args.debug,
+        file=args.file,
+        info=args.info,
+        properties=args.property,
+        no_cookie=args.no_cookie,
+        target=args.target,
+        format=args.format,
+        stdout=args.stdout,
+        experimental=args.experimental,
+        pool_connections=args.pool_connections,
+        pool_maxsize=args.pool_maxsize,
+        pool_block=args.pool_block,
+        pool_hosts=pool_hosts,
+        session_scope=args.session_scope,
+        session_name=args.session_name,
+        targets=args.targets,
+        parallel=args.parallel,
+        timings=args.timings or False,
+        profile=args.profile,
+        profile_mode=args.profile_mode,
+        bench=args.bench or False,
+        bench_workers=args.workers,
+        bench_processes=args.processes,
+        bench_duration=args.duration,
+        bench_requests=args.requests,
+        bench_report=args.report,
+        bench_rate=args.rate,
+        bench_ramp_up=args.ramp_up,
+        bench_steps=bench_steps,
+        batch=args.batch,
+    )
+    # parsed models are kept on disk for next runs, only by cli
+    model_cache.set_cache_dir(get_cache_dir())
+    apply(config)
+
@@ -0,0 +1,432 @@
+"""
+daemon which runs dothttp commands for cli, so that each invocation doesn't pay for
+interpreter startup, imports (faker, msal, cryptography, textx ...), metamodel build
+and cold connections.
+
+    dothttp-daemon start      # or python -m dothttp.daemon start
+    dothttp get.http          # run by daemon, same arguments, output and exit code
+    dothttp-daemon stop
+
+cli talks to daemon over unix socket (`DOTHTTP_DAEMON_SOCKET`, default `~/.dothttp.daemon.sock`),
+one json message per line. runs are executed one at a time, in client's working directory and
+environment, state of a run (cookies, session scopes, pool configuration) is dropped once it completes.
+cli runs in-process when daemon is not running, is busy with another run, is of different version,
+`DOTHTTP_NO_DAEMON` is set or run reads stdin (`--batch` without file).
+
+client side of this module uses only standard library, it is imported on every cli invocation.
+"""
+import argparse
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from typing import List, Optional
+
+from .__version__ import __version__
+
+DAEMON_SOCKET_ENV = "DOTHTTP_DAEMON_SOCKET"
+NO_DAEMON_ENV = "DOTHTTP_NO_DAEMON"
+DEFAULT_DAEMON_SOCKET = os.path.expanduser("~/.dothttp.daemon.sock")
+START_TIMEOUT = 30
+
+RUN = "run"
+STATUS = "status"
+STOP = "stop"
+
+
+def get_socket_path() -> str:
+    return os.environ.get(DAEMON_SOCKET_ENV) or DEFAULT_DAEMON_SOCKET
+
+
+def write_message(stream, message: dict):
+    stream.write(json.dumps(message).encode() + b"\n")
+    stream.flush()
+
+
+def read_messages(stream):
+    for line in stream:
+        yield json.loads(line)
+
+
+def connect(path: Optional[str] = None) -> Optional[socket.socket]:
+    """connection to daemon, None when it is not running"""
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    path = path or get_socket_path()
+    if not os.path.exists(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def request(message: dict, path: Optional[str] = None) -> Optional[dict]:
+    """single response commands (status, stop)"""
+    sock = connect(path)
+    if sock is None:
+        return None
+    with sock, sock.makefile("rwb") as stream:
+        write_message(stream, message)
+        for response in read_messages(stream):
+            return response
+    return None
+
+
+def reads_stdin(argv: List[str]) -> bool:
+    """`--batch` without jobs file reads jobs from stdin, which daemon doesn't have"""
+    for index, arg in enumerate(argv):
+        if arg == "--batch=-":
+            return True
+        if arg == "--batch":
+            following = argv[index + 1] if index + 1 < len(argv) else None
+            if following is None or following.startswith("-"):
+                return True
+    return False
+
+
+def run_with_daemon(argv: List[str], path: Optional[str] = None, stdout=None, stderr=None) -> Optional[int]:
+    """
+    runs cli with `argv` in daemon, output is written to `stdout`/`stderr` as it comes.
+    returns exit code, None when daemon didn't take the run (caller runs it in-process)
+    """
+    if os.environ.get(NO_DAEMON_ENV) or reads_stdin(argv):
+        return None
+    sock = connect(path)
+    if sock is None:
+        return None
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    accepted = False
+    with sock, sock.makefile("rwb") as stream:
+        write_message(
+            stream,
+            {
+                "command": RUN,
+                "version": __version__,
+                "argv": argv,
+                "cwd": os.getcwd(),
+                "env": dict(os.environ),
+            },
+        )
+        for message in read_messages(stream):
+            if "accepted" in message:
+                accepted = True
+            elif "busy" in message:
+                # parallel invocations don't queue behind each other
+                return None
+            elif "stdout" in message:
+                stdout.write(message["stdout"])
+                stdout.flush()
+            elif "stderr" in message:
+                stderr.write(message["stderr"])
+                stderr.flush()
+            elif "exit" in message:
+                return message["exit"]
+            elif "error" in message and not accepted:
+                # version mismatch
+                return None
+    if not accepted:
+        return None
+    # run might have had side effects, it is not repeated
+    stderr.write("dothttp daemon closed connection before run completed\n")
+    return 1
+
+
+class Channel:
+    """messages to client of a run, shared by threads of the run"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def send(self, message: dict):
+        if self.closed:
+            return
+        with self._lock:
+            try:
+                write_message(self.stream, message)
+            except OSError:
+                # client went away, run continues
+                self.closed = True
+
+
+# channel of run in progress, runs are one at a time
+_current_channel: Optional[Channel] = None
+
+
+class DaemonStream:
+    """
+    stdout/stderr during daemon runs, writes go to client of current run.
+    logging handlers keep reference to stream they were created with,
+    so writes outside of a run go to `default`.
+    """
+
+    mode = "w"
+    encoding = "utf-8"
+
+    def __init__(self, name: str, fileno: int, default):
+        self.name = name
+        self._fileno = fileno
+        self.default = default
+
+    def write(self, data: str) -> int:
+        channel = _current_channel
+        if channel is None:
+            return self.default.write(data)
+        if data:
+            channel.send({self.name: data})
+        return len(data)
+
+    def flush(self):
+        if _current_channel is None:
+            self.default.flush()
+
+    def fileno(self) -> int:
+        # response written to stdout is not closed (see `RequestCompiler.write_to_output`)
+        return self._fileno
+
+    def isatty(self) -> bool:
+        return False
+
+    def writable(self) -> bool:
+        return True
+
+
+class _Stream:
+    """read from one file, write to another (socketserver keeps them separate)"""
+
+    def __init__(self, rfile, wfile):
+        self.rfile = rfile
+        self.wfile = wfile
+
+    def __iter__(self):
+        return iter(self.rfile)
+
+    def write(self, data):
+        return self.wfile.write(data)
+
+    def flush(self):
+        self.wfile.flush()
+
+
+class Daemon:
+    def __init__(self, path: Optional[str] = None, idle_timeout: float = 0):
+        self.path = path or get_socket_path()
+        self.idle_timeout = idle_timeout
+        self.started = time.time()
+        self.runs = 0
+        self.last_activity = time.monotonic()
+        self.server: Optional[socketserver.UnixStreamServer] = None
+        self._run_lock = threading.Lock()
+
+    def warm_up(self):
+        # everything cli needs is imported once
+        from .cli import main  # noqa: F401
+        from .parse import metamodel_registry
+
+        metamodel_registry.get()
+
+    def get_status(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "version": __version__,
+            "socket": self.path,
+            "started": self.started,
+            "runs": self.runs,
+        }
+
+    def execute(self, argv: List[str]) -> int:
+        from .cli import main
+        from .parse.request_base import RequestBase
+
+        try:
+            main(argv)
+        except SystemExit as exc:
+            if exc.code is None:
+                return 0
+            if isinstance(exc.code, int):
+                return exc.code
+            print(exc.code, file=sys.stderr)
+            return 1
+        except Exception:
+            traceback.print_exc()
+            return 1
+        finally:
+            # next run starts as a fresh process would, pending cookies are saved as on exit
+            RequestBase.reset_global_state()
+        return 0
+
+    def run(self, message: dict, channel: Channel):
+        global _current_channel
+        if message.get("version") != __version__:
+            channel.send({"error": f"daemon runs version {__version__}"})
+            return
+        if not self._run_lock.acquire(blocking=False):
+            channel.send({"busy": True})
+            return
+        try:
+            self.last_activity = time.monotonic()
+            channel.send({"accepted": True})
+            cwd = os.getcwd()
+            environ = dict(os.environ)
+            _current_channel = channel
+            try:
+                os.chdir(message["cwd"])
+                os.environ.clear()
+                os.environ.update(message["env"])
+                with redirect_stdout(DaemonStream("stdout", 1, sys.stdout)), redirect_stderr(
+                    DaemonStream("stderr", 2, sys.stderr)
+                ):
+                    exit_code = self.execute(message["argv"])
+            except OSError as exc:
+                # working directory doesn't exist anymore
+                channel.send({"stderr": f"{exc}\n"})
+                exit_code = 1
+            finally:
+                _current_channel = None
+                os.chdir(cwd)
+                os.environ.clear()
+                os.environ.update(environ)
+                self.runs += 1
+                self.last_activity = time.monotonic()
+        finally:
+            self._run_lock.release()
+        channel.send({"exit": exit_code})
+
+    def handle(self, stream):
+        channel = Channel(stream)
+        for message in read_messages(stream):
+            command = message.get("command")
+            if command == RUN:
+                self.run(message, channel)
+            elif command == STATUS:
+                channel.send(self.get_status())
+            elif command == STOP:
+                channel.send({"stopping": True})
+                threading.Thread(target=self.shutdown, daemon=True).start()
+            else:
+                channel.send({"error": f"unknown command {command}"})
+            return
+
+    def bind(self):
+        if os.path.exists(self.path):
+            if request({"command": STATUS}, self.path) is not None:
+                raise RuntimeError(f"daemon is already running on {self.path}")
+            # left by daemon which didn't stop cleanly
+            os.remove(self.path)
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                daemon.handle(_Stream(self.rfile, self.wfile))
+
+        # socket is accessible only to user, runs have user's environment
+        umask = os.umask(0o177)
+        try:
+            self.server = socketserver.ThreadingUnixStreamServer(self.path, Handler)
+        finally:
+            os.umask(umask)
+        self.server.daemon_threads = True
+
+    def _watch_idle(self):
+        while True:
+            time.sleep(min(self.idle_timeout, 1))
+            if not self._run_lock.locked() and time.monotonic() - self.last_activity > self.idle_timeout:
+                self.shutdown()
+                return
+
+    def serve_forever(self):
+        if self.server is None:
+            self.bind()
+        if self.idle_timeout:
+            threading.Thread(target=self._watch_idle, daemon=True).start()
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def shutdown(self):
+        if self.server is not None:
+            self.server.shutdown()
+
+
+def start(path: str, idle_timeout: float) -> int:
+    status = request({"command": STATUS}, path)
+    if status is not None:
+        print(f"daemon is already running (pid {status['pid']})")
+        return 0
+    env = dict(os.environ)
+    # importable from anywhere, even when running from source
+    package_parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_parent, env.get("PYTHONPATH")]))
+    with open(f"{path}.log", "ab") as log:
+        subprocess.Popen(
+            [sys.executable, "-m", "dothttp.daemon", "run", "--socket", path, "--idle-timeout", str(idle_timeout)],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            cwd=os.path.expanduser("~"),
+            env=env,
+            start_new_session=True,
+        )
+    deadline = time.monotonic() + START_TIMEOUT
+    while time.monotonic() < deadline:
+        status = request({"command": STATUS}, path)
+        if status is not None:
+            print(f"daemon started (pid {status['pid']}) on {path}")
+            return 0
+        time.sleep(0.1)
+    print(f"daemon didn't start, check {path}.log", file=sys.stderr)
+    return 1
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="dothttp daemon, keeps cli warm", prog="dothttp-daemon")
+    parser.add_argument("command", choices=["start", STOP, STATUS, RUN], help="run serves in foreground")
+    parser.add_argument("--socket", help=f"unix socket path (default ${DAEMON_SOCKET_ENV} or {DEFAULT_DAEMON_SOCKET})")
+    parser.add_argument(
+        "--idle-timeout", help="stop after seconds without runs (0 never stops)", type=float, default=0
+    )
+    args = parser.parse_args(argv)
+    if not hasattr(socket, "AF_UNIX"):
+        print("daemon needs unix sockets, not supported on this platform", file=sys.stderr)
+        sys.exit(1)
+    path = args.socket or get_socket_path()
+    if args.command == "start":
+        sys.exit(start(path, args.idle_timeout))
+    if args.command == RUN:
+        daemon = Daemon(path, args.idle_timeout)
+        daemon.warm_up()
+        daemon.bind()
+        print(f"dothttp daemon {__version__} (pid {os.getpid()}) listening on {path}", flush=True)
+        daemon.serve_forever()
+        return
+    response = request({"command": args.command}, path)
+    if response is None:
+        print("daemon is not running")
+        sys.exit(1 if args.command == STATUS else 0)
+    if args.command == STATUS:
+        print(json.dumps(response, indent=4))
+        return
+    # socket is removed once daemon is down
+    deadline = time.monotonic() + START_TIMEOUT
+    while os.path.exists(path) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    print("daemon stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -60,6 +60,11 @@ class HttpFileSyntaxException(HttpFileException):
     pass
 
 
+@exception_wrapper("import cycle detected: `{cycle}`")
+class HttpFileImportCycleException(HttpFileException):
+    pass
+
+
 @exception_wrapper("property json schema validation failed! file `{file}`")
 class PropertyFileException(DotHttpException):
     pass
@@ -80,6 +85,11 @@ class DataFileNotFoundException(HttpFileException):
     message = "data file mentioned is not a valid"
 
 
+@exception_wrapper("Payload file `{datafile}` changed while it was being uploaded")
+class DataFileChangedException(HttpFileException):
+    pass
+
+
 @exception_wrapper(
     "property `{var}` not defined in propertyfile/commandline/httpfile propertyfile:`{propertyfile}`"
 )
@@ -93,6 +103,11 @@ class VariableIndexNotAvailable(PropertyFileException):
     pass
 
 
+@exception_wrapper("variables refer to each other in a cycle: `{cycle}`")
+class PropertyCycleException(HttpFileException):
+    pass
+
+
 @exception_wrapper("error with command line property format, property `{prop}`")
 class CommandLinePropError(DotHttpException):
     pass
@@ -133,3 +148,8 @@ class DothttpAzureAuthException(DotHttpException):
 @exception_wrapper("Certificate error: if you trust server provided certificate and not in cert chain, use `@insecure`")
 class DothttpUnSignedCertException(DotHttpException):
     pass
+
+
+@exception_wrapper("bench process {index} failed: {message}")
+class BenchProcessException(DotHttpException):
+    pass
@@ -1,3 +1,4 @@
+from contextlib import nullcontext
 from dataclasses import dataclass, field
 from io import IOBase
 from typing import BinaryIO, Dict, List, Optional, Tuple, Union
@@ -8,6 +9,7 @@ from requests.auth import AuthBase, HTTPBasicAuth, HTTPDigestAuth
 
 from ..utils.common import APPLICATION_JSON, json_to_urlencoded_array
 from ..utils.constants import *
+from ..utils.multipart import MultipartEncoder
 from .parse_models import Payload as ParsePayload
 from .parse_models import *
 
@@ -27,6 +29,40 @@ class Config:
     experimental: bool = False
     target: str = field(default_factory=lambda: "1")
     content: str = None
+    # connection pool of global session, property file `$pool` section is used
+    # when not specified
+    pool_connections: Optional[int] = None
+    pool_maxsize: Optional[int] = None
+    pool_block: Optional[bool] = None
+    # per host maxsize
+    pool_hosts: Dict[str, int] = field(default_factory=dict)
+    # cookie isolation, `global`, `thread`, `env` or `named` (see `session_pool`)
+    session_scope: Optional[str] = None
+    session_name: Optional[str] = None
+    # run several targets (all, when empty list and `parallel` is given) in one process
+    targets: Optional[List[str]] = None
+    parallel: Optional[int] = None
+    # print time spent in each phase of request (see `RequestTimings`)
+    timings: bool = False
+    # profile output file, "" for summary only (see `Profiler`)
+    profile: Optional[str] = None
+    profile_mode: str = "cprofile"
+    # load test target (see `bench.LoadGenerator`)
+    bench: bool = False
+    bench_workers: int = 1
+    # workers are per process
+    bench_processes: int = 1
+    bench_duration: Optional[float] = None
+    bench_requests: Optional[int] = None
+    # json report of bench run
+    bench_report: Optional[str] = None
+    # open loop, requests per second (plateau after `bench_ramp_up` seconds)
+    bench_rate: Optional[float] = None
+    bench_ramp_up: Optional[float] = None
+    # open loop, (rate, seconds) pairs
+    bench_steps: List[Tuple[float, float]] = field(default_factory=list)
+    # json lines of jobs, "-" for stdin (see `dotextensions.server.batch`)
+    batch: Optional[str] = None
 
 
 @dataclass
@@ -62,6 +98,14 @@ class Payload:
     def set_file_payload(self, file_name):
         self.filename = file_name
 
+    def close(self):
+        """closes file handles opened while loading payload (file input and multipart files)"""
+        if isinstance(self.data, IOBase):
+            self.data.close()
+        for _, (_, content, *_) in self.files or []:
+            if isinstance(content, IOBase):
+                content.close()
+
 
 @dataclass
 class Property:
@@ -129,14 +173,27 @@ class HttpDef:
         }
         return target
 
-    def get_prepared_request(self):
+    def get_prepared_request(self, timings=None):
+        """`timings` (`RequestTimings`), auth signing is recorded as `auth` phase"""
         prep = PreparedRequest()
         prep.prepare_url(self.url, self.query)
         prep.prepare_method(self.method)
         prep.prepare_headers(self.headers)
         payload = self.payload
-        prep.prepare_body(data=payload.data, json=payload.json, files=payload.files)
-        prep.prepare_auth(self.auth, self.url)
+        if (
+            payload.files
+            and any(isinstance(content, IOBase) for _, (_, content, _) in payload.files)
+            and not isinstance(self.auth, (AWS4Auth, RequestsHawkAuth))
+        ):
+            # file parts are streamed, aws and hawk sign whole body, they need it in memory
+            body = MultipartEncoder(payload.files)
+            prep.prepare_body(data=body, files=None)
+            if CONTENT_TYPE not in prep.headers:
+                prep.headers[CONTENT_TYPE] = body.content_type
+        else:
+            prep.prepare_body(data=payload.data, json=payload.json, files=payload.files)
+        with timings.measure("auth") if timings else nullcontext():
+            prep.prepare_auth(self.auth, self.url)
         request_logger.info(f"auth configured is {self.auth}")
         # prep.prepare_hooks({"response": self.save_cookie_call_back})
         if payload.header and CONTENT_TYPE not in prep.headers:
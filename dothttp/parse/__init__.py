@@ -1,10 +1,11 @@
+import copy
 import mimetypes
 import os
 import re
 import sys
 from collections import defaultdict
 from functools import lru_cache
-from typing import Any, DefaultDict, Dict, List, Optional, Union
+from typing import Any, DefaultDict, Dict, List, Optional, Set, Union
 from urllib.parse import (
     urljoin,
     urlparse,
@@ -15,16 +16,9 @@ from urllib.parse import (
     uses_relative,
 )
 
-import toml
-import yaml
 from requests.auth import HTTPBasicAuth, HTTPDigestAuth
 from requests.structures import CaseInsensitiveDict
-from textx import TextXSyntaxError, metamodel_from_file
-
-try:
-    import magic
-except ImportError:
-    magic = None
+from textx import TextXSyntaxError
 
 from ..exceptions import *
 from ..models.computed import *
@@ -45,12 +39,25 @@ from ..models.parse_models import (
     ScriptType,
     TestScript,
 )
-from ..property_schema import property_schema
 from ..script import ScriptExecutionPython
 from ..utils.common import get_real_file_path, triple_or_double_tostring, single_triple_or_double_tostring
 from ..utils.constants import *
+from ..utils.property_template import compile_template
 from ..utils.property_util import PropertyProvider, StringFormatPropertyResolver
-from .dsl_jsonparser import json_or_array_to_json, jsonmodel_to_json
+from ..utils.timing import RequestTimings
+from .adapter_pool import POOL_SECTION
+from .dsl_jsonparser import (
+    get_format_dependencies,
+    get_json_dependencies,
+    json_or_array_to_json,
+    jsonmodel_to_json,
+)
+from .import_graph import ImportGraph, ImportResolver
+from .metamodel import dothttp_model, metamodel_registry
+from .model_cache import ModelCache
+from .name_index import NameIndex, find_duplicate_name
+from .property_file import PropertyFileCache
+from .splitter import TargetModelLoader
 
 
 def install_unix_socket_scheme():
@@ -63,9 +70,13 @@ def install_unix_socket_scheme():
 
 install_unix_socket_scheme()
 
-dothttp_model = metamodel_from_file(
-    get_real_file_path(path="../http.tx", current_file=__file__)
+model_cache = ModelCache(
+    dothttp_model,
+    grammar_path=metamodel_registry.grammar_path,
 )
+import_resolver = ImportResolver(model_cache)
+target_loader = TargetModelLoader(model_cache)
+property_file_cache = PropertyFileCache()
 
 
 def eprint(*args, **kwargs):
@@ -74,6 +85,9 @@ def eprint(*args, **kwargs):
 
 class BaseModelProcessor:
     var_regex = re.compile(r"{{(?P<var>.*?)}}")
+    # when target is selected by name, parse only preamble, target and its bases
+    # processors which need every definition (formatter) should turn it off
+    target_only_parsing = True
 
     def load_properties_n_headers(self):
         """
@@ -107,69 +121,15 @@ class BaseModelProcessor:
         """
         if not self.property_file and self.file:
             base_logger.debug("property file not specified")
-            default_json = os.path.join(os.path.dirname(self.file), ".dothttp.json")
-            default_yaml = os.path.join(os.path.dirname(self.file), ".dothttp.yaml")
-            default_yml = os.path.join(os.path.dirname(self.file), ".dothttp.yml")
-            default_toml = os.path.join(os.path.dirname(self.file), ".dothttp.toml")
-            if os.path.exists(default_json):
-                base_logger.debug(
-                    f"file: {default_json} exists. it will be used for property reference"
-                )
-                self.property_file = default_json
-            elif os.path.exists(default_yaml):
-                base_logger.debug(
-                    f"file: {default_yaml} exists. it will be used for property reference"
-                )
-                self.property_file = default_yaml
-            elif os.path.exists(default_yml):
-                base_logger.debug(
-                    f"file: {default_yaml} exists. it will be used for property reference"
-                )
-                self.property_file = default_yml
-            elif os.path.exists(default_toml):
-                base_logger.debug(
-                    f"file: {default_yaml} exists. it will be used for property reference"
-                )
-                self.property_file = default_toml
-        if self.property_file and not os.path.exists(self.property_file):
-            base_logger.debug(f"file: {self.property_file} not found")
-            raise PropertyFileNotFoundException(propertyfile=self.property_file)
+            self.property_file = property_file_cache.discover(os.path.dirname(self.file))
         if self.property_file:
-            with open(self.property_file, "r") as f:
-                try:
-                    if self.property_file.endswith(".json"):
-                        props = json.load(f)
-                    elif self.property_file.endswith(
-                        ".yaml"
-                    ) or self.property_file.endswith(".yml"):
-                        props = yaml.load(f, yaml.SafeLoader)
-                    elif self.property_file.endswith(".toml"):
-                        props = toml.load(f)
-                    else:
-                        raise Exception("unrecognized property file")
-                    base_logger.debug(f"file: {self.property_file} loaded successfully")
-                except Exception as e:
-                    base_logger.error(
-                        f"exception loading property file ", exc_info=True
-                    )
-                    raise PropertyFileNotJsonException(propertyfile=self.property_file)
-                try:
-                    if validate:
-                        validate(instance=props, schema=property_schema)
-                except Exception as e:
-                    base_logger.error(
-                        f"property json schema validation failed! ", exc_info=True
-                    )
-                    raise PropertyFileException(
-                        message="property file has invalid json schema",
-                        file=self.property_file,
-                    )
-
+            props = property_file_cache.load(self.property_file)
         else:
             props = {}
         self.default_headers.update(props.get("headers", {}))
         self.property_util.add_env_property_from_dict(props.get("*", {}))
         self.property_util.add_system_command_properties(props.get("$commands", {}))
+        self.pool_settings = props.get(POOL_SECTION)
         if self.env:
             for env_name in self.env:
                 self.property_util.add_env_property_from_dict(props.get(env_name, {}))
@@ -182,23 +142,30 @@ class BaseModelProcessor:
         # best syntax would be headers section of property file will define
         # default headers
         self.default_headers = {}
+        # `$pool` section of property file
+        self.pool_settings = None
         self.property_file = args.property_file
         self.env = args.env
         self.content = ""
         self.original_content = self.content = ""
         self.property_util = PropertyProvider(self.property_file)
         self.errors = []
+        self.import_graph: Optional[ImportGraph] = None
+        self._name_index: Optional[NameIndex] = None
+        self.timings = RequestTimings()
         self.load()
 
     def load(self):
-        self.load_content()
-        self.load_model()
-        self.load_imports()
-        self.load_properties_n_headers()
-        self.load_command_line_props()
-        self.validate_names()
-        self.load_props_needed_for_content()
-        self.select_target()
+        with self.timings.measure("parse"):
+            self.load_content()
+            self.load_model()
+            self.load_imports()
+        with self.timings.measure("properties"):
+            self.load_properties_n_headers()
+            self.load_command_line_props()
+            self.validate_names()
+            self.load_props_needed_for_content()
+            self.select_target()
 
     def load_command_line_props(self):
         for prop in self.args.properties:
@@ -218,16 +185,35 @@ class BaseModelProcessor:
     def load_model(self):
         # textx has provided utility to load model metamodel.model_from_file(args.file)
         # but we had variable options, and it has to be dynamically populated
+        model = self.load_target_model()
+        if model is not None:
+            self.model: MultidefHttp = model
+            return
         try:
-            model = dothttp_model.model_from_str(self.content)
+            model = model_cache.model_from_str(self.content)
         except TextXSyntaxError as e:
             raise HttpFileSyntaxException(file=self.file, message=e.args)
         except Exception as e:
             raise HttpFileException(message=e.args)
         self.model: MultidefHttp = model
 
+    def load_target_model(self) -> Optional[MultidefHttp]:
+        target = self.args.target
+        if not (self.target_only_parsing and isinstance(target, str)) or target.isdecimal():
+            # numbered targets depend on every definition in file
+            return None
+        try:
+            return target_loader.load(self.content, target)
+        except Exception:
+            # syntax errors and anything unusual are reported by complete parse
+            base_logger.debug(
+                f"target only parsing failed for {target}, falling back to complete parse",
+                exc_info=True,
+            )
+            return None
+
     def load_imports(self):
-        self._load_imports(
+        self.import_graph = self._load_imports(
             self.model, self.file, self.property_util, self.model.allhttps
         )
 
@@ -237,44 +223,17 @@ class BaseModelProcessor:
         filename: str,
         property_util: PropertyProvider,
         import_list: [],
-    ):
-        for model, content in BaseModelProcessor._get_models_from_import(
-            model, filename
-        ):
+    ) -> ImportGraph:
+        graph = import_resolver.resolve(model, filename)
+        for model, content in graph:
             import_list += model.allhttps
             BaseModelProcessor.load_properties_from_var(model, property_util)
             property_util.add_infile_properties(content)
+        return graph
 
     @staticmethod
     def _get_models_from_import(model: MultidefHttp, filename: str):
-        if not model.import_list:
-            return
-        for filename_string in model.import_list.filename:
-            import_file = filename_string.value
-            if not os.path.isabs(import_file):
-                import_file = os.path.join(
-                    os.path.dirname(os.path.realpath(filename)), import_file
-                )
-            if not os.path.isfile(import_file):
-                if os.path.isfile(import_file + ".http"):
-                    import_file += ".http"
-                else:
-                    raise HttpFileException(
-                        message=f"import file should be a file, current: {import_file}"
-                    )
-            with open(import_file, "r", encoding="utf-8") as f:
-                imported_content = f.read()
-                try:
-                    imported_model = dothttp_model.model_from_str(imported_content)
-                    yield imported_model, imported_content
-                except TextXSyntaxError as e:
-                    raise HttpFileSyntaxException(file=import_file, message=e.args)
-                except Exception as e:
-                    raise HttpFileException(message=e.args)
-            yield from BaseModelProcessor._get_models_from_import(
-                imported_model, import_file
-            )
-        return
+        yield from import_resolver.resolve(model, filename)
 
     def load_content(self):
         if not os.path.exists(self.file):
@@ -292,9 +251,16 @@ class BaseModelProcessor:
     def get_updated_content_object(self, content) -> str:
         return self.property_util.get_updated_content(content, "obj")
 
+    def get_name_index(self) -> NameIndex:
+        # contexts and imports extend `allhttps` after model is loaded
+        if self._name_index is None or self._name_index.is_stale(self.model.allhttps):
+            self._name_index = NameIndex(self.model.allhttps)
+        return self._name_index
+
     def select_target(self):
+        name_index = self.get_name_index()
         if target := self.args.target:
-            self.http = self.get_target(target, self.model.allhttps)
+            self.http = name_index.get(target)
         else:
             self.http = self.model.allhttps[0]
         self.parents_http = []
@@ -306,58 +272,106 @@ class BaseModelProcessor:
                     key=target,
                     value=parent,
                 )
-            try:
-                while parent:
-                    if parent in self.parents_http:
-                        raise ParameterException(
-                            message="Found circular reference",
-                            target=self.http.namewrap.name,
-                        )
-                    grand_http = self.get_target(parent, self.model.allhttps)
-                    self.parents_http.append(grand_http)
-                    parent = grand_http.namewrap.base
-            except Exception:
-                raise UndefinedHttpToExtend(target=self.http.namewrap.name, base=parent)
+            visited = {self.http.namewrap.name}
+            while parent:
+                if parent in visited:
+                    raise ParameterException(
+                        message="Found circular reference",
+                        key=self.http.namewrap.name,
+                        value=parent,
+                    )
+                visited.add(parent)
+                try:
+                    grand_http = name_index.get(parent)
+                    base = grand_http.namewrap.base
+                except Exception:
+                    raise UndefinedHttpToExtend(target=self.http.namewrap.name, base=parent)
+                self.parents_http.append(grand_http)
+                parent = base
 
     @staticmethod
     def get_target(target: Union[str, int], http_def_list: List[Http]):
-        if not isinstance(target, str):
-            target = str(target)
-        if target.isdecimal():
-            if 1 <= int(target) <= len(http_def_list):
-                selected = http_def_list[int(target) - 1]
-            else:
-                raise ParameterException(
-                    message="target startswith 1", key="target", value=target
-                )
+        # for repeated lookups on same list, build `NameIndex` once and reuse it
+        return NameIndex(http_def_list).get(target)
+
+    def get_http_names(self) -> List[Optional[str]]:
+        """names of all http definitions (None if unnamed), including imported ones"""
+        http_blocks = getattr(self.model, "http_blocks", None)
+        https = self.model.allhttps
+        if http_blocks is not None:
+            # target only parse, definitions which are not parsed are known by their blocks
+            imported = sum(len(model.allhttps) for model, _ in self.import_graph or [])
+            https = https[len(https) - imported :] if imported else []
+            names = [block.name for block in http_blocks.blocks]
         else:
-            try:
-                # if multiple names have same value, it will create confusion
-                # if they want to go with that. then pass id
-                selected = next(
-                    filter(
-                        lambda http: http.namewrap.name == target,
-                        (http for http in http_def_list if http.namewrap),
-                    )
-                )
-            except StopIteration:
-                raise ParameterException(
-                    message="target is not spelled correctly",
-                    key="target",
-                    value=target,
-                )
-        return selected
+            names = []
+        return names + [http.namewrap.name if http.namewrap else None for http in https]
 
     def validate_names(self):
-        names = []
-        for index, http in enumerate(self.model.allhttps):
-            name = http.namewrap.name if http.namewrap else str(index + 1)
-            if name in names:
-                raise HttpFileException(
-                    message=f"target: `{name}` appeared twice or more. panicked while processing"
+        if name := find_duplicate_name(self.get_http_names()):
+            raise HttpFileException(
+                message=f"target: `{name}` appeared twice or more. panicked while processing"
+            )
+
+    def get_own_https(self) -> List[Http]:
+        """definitions of file, imported ones are appended to `allhttps` while loading"""
+        imported = sum(len(model.allhttps) for model, _ in self.import_graph or [])
+        return self.model.allhttps[: len(self.model.allhttps) - imported]
+
+    def get_model_copy(self) -> MultidefHttp:
+        """model as parsed, every request compiler appends imports to its own copy"""
+        model = copy.copy(self.model)
+        model.allhttps = list(self.get_own_https())
+        return model
+
+    def get_variable_graph(self) -> Dict[str, Set[str]]:
+        """variable name to property names it refers to, imported variables included"""
+        variables = {}
+        for model in [self.model] + [model for model, _ in self.import_graph or []]:
+            for variable in model.variables:
+                variables.setdefault(variable.name, set()).update(
+                    self.get_variable_dependencies(variable)
                 )
-            names.append(name)
-            names.append(str(index + 1))
+        return variables
+
+    def get_http_text(self, http: Http) -> str:
+        """source of http definition, from file it is defined in"""
+        contents = [self.content] + [content for _, content in self.import_graph or []]
+        models = [self.model] + [model for model, _ in self.import_graph or []]
+        for model, content in zip(models, contents):
+            if any(http is candidate for candidate in model.allhttps):
+                return content[http._tx_position : http._tx_position_end]
+        return ""
+
+    def get_references(self, http: Http, variables: Dict[str, Set[str]]) -> Set[str]:
+        """property names http definition (not its bases) refers to"""
+        names = set(compile_template(self.get_http_text(http)).keys)
+        payload = http.payload
+        if payload and payload.json:
+            names.update(get_json_dependencies(payload.json))
+        if payload and payload.datajson:
+            names.update(get_json_dependencies(payload.datajson))
+        # variables refer to other properties, `var url = $"{host}/get"`
+        pending = list(names)
+        while pending:
+            for name in variables.get(pending.pop(), ()):
+                if name not in names:
+                    names.add(name)
+                    pending.append(name)
+        return names
+
+    def get_http_chain(self, http: Http, name_index: Optional[NameIndex] = None) -> List[Http]:
+        """http definition followed by its bases"""
+        name_index = name_index or self.get_name_index()
+        chain = [http]
+        visited = set()
+        while chain[-1].namewrap and chain[-1].namewrap.base:
+            base = chain[-1].namewrap.base
+            if base in visited:
+                break
+            visited.add(base)
+            chain.append(name_index.get(base))
+        return chain
 
     def load_props_needed_for_content(self):
         self._load_props_from_content(self.content, self.property_util)
@@ -368,51 +382,108 @@ class BaseModelProcessor:
     
     @staticmethod
     def load_properties_from_var(model:MultidefHttp, property_util: PropertyProvider, can_override: bool = True):
-        ## this has to taken care by property util
-        ## but it will complicate the code
+        """
+        variables are evaluated in dependency order (not declaration order),
+        `var a = (b + 1); var b = 2;` works. cycles raise `PropertyCycleException`
+        """
+        graph = property_util.property_graph
+        existing = set(graph.declarations)
+        declared = []
         for variable in model.variables:
-            if variable.value:
-                var_value = jsonmodel_to_json(variable.value, property_util=property_util)
-                property_util.add_infile_property_from_var(variable.name, var_value, can_override)
-            elif variable.func:
-                func_name = f"${variable.func.name}"
-                if func_name in property_util.rand_map:
-                    func = property_util.rand_map[func_name]
-                    if variable.func.args:
-                        args = variable.func.args
-                        var_value = func(args)
-                    else:
-                        var_value = func()
+            if can_override or variable.name not in existing:
+                node = graph.add(
+                    variable.name,
+                    BaseModelProcessor.get_variable_dependencies(variable),
+                    variable,
+                )
+                declared.append(node.key)
+        order = graph.get_resolution_order(
+            declared, BaseModelProcessor.get_external_property_check(property_util)
+        )
+        for node in order:
+            BaseModelProcessor.evaluate_variable(node.payload, property_util, can_override)
+        for variable in model.variables:
+            if variable.name in existing and not can_override:
+                # already declared by file with higher preference (contexts)
+                BaseModelProcessor.evaluate_variable(variable, property_util, can_override)
+
+    def reresolve_properties(self, names):
+        """re-evaluates variables which refer to `names`, after script updated them"""
+        graph = self.property_util.property_graph
+        order = graph.get_resolution_order(
+            graph.get_dependents(names),
+            self.get_external_property_check(self.property_util),
+        )
+        for node in order:
+            base_logger.debug(f"re-evaluating variable {node.name}")
+            self.evaluate_variable(node.payload, self.property_util)
+
+    @staticmethod
+    def get_external_property_check(property_util: PropertyProvider):
+        # command line and env properties take preference over variables,
+        # references to them are not dependencies on variables
+        def is_external(name):
+            return (
+                name in property_util.command_line_properties
+                or name in property_util.env_properties
+            )
+
+        return is_external
+
+    @staticmethod
+    def get_variable_dependencies(variable) -> Set[str]:
+        if variable.value:
+            return get_json_dependencies(variable.value)
+        elif variable.inter:
+            return get_format_dependencies(variable.inter[2:-1])
+        elif variable.index:
+            # index keys can be literal keys as well, only target is a dependency
+            return {variable.index.target}
+        return set()
+
+    @staticmethod
+    def evaluate_variable(variable, property_util: PropertyProvider, can_override: bool = True):
+        if variable.value:
+            var_value = jsonmodel_to_json(variable.value, property_util=property_util)
+            property_util.add_infile_property_from_var(variable.name, var_value, can_override)
+        elif variable.func:
+            func_name = f"${variable.func.name}"
+            if func_name in property_util.rand_map:
+                func = property_util.rand_map[func_name]
+                if variable.func.args:
+                    args = variable.func.args
+                    var_value = func(args)
+                else:
+                    var_value = func()
+            else:
+                var_value = variable.func.name
+            property_util.add_infile_property_from_var(variable.name, var_value, can_override)
+        elif variable.inter:
+            var_value = variable.inter[2:-1].format_map(StringFormatPropertyResolver(property_util))
+            property_util.add_infile_property_from_var(variable.name, var_value, can_override)
+        elif index_sub := variable.index:
+            # index operation applied on target
+            indexed_value = property_util.resolve_property_object(index_sub.target)
+            for key in index_sub.key:
+                # figure out actual_key
+                if key in property_util.command_line_properties:
+                    evaulated_key =  property_util.command_line_properties[key]
+                elif key in property_util.env_properties:
+                    evaulated_key = property_util.env_properties[key]
+                elif key in property_util.infile_properties and property_util.infile_properties[key].value is not None:
+                    evaulated_key = property_util.infile_properties[key].value
                 else:
-                    var_value = variable.func.name
-                property_util.add_infile_property_from_var(variable.name, var_value, can_override)
-            elif variable.inter:
-                var_value = variable.inter[2:-1].format_map(StringFormatPropertyResolver(property_util))
-                property_util.add_infile_property_from_var(variable.name, var_value, can_override)
-            elif index_sub := variable.index:
-                # index operation applied on target
-                indexed_value = property_util.resolve_property_object(index_sub.target)
-                for key in index_sub.key:
-                    # figure out actual_key
-                    if key in property_util.command_line_properties:
-                        evaulated_key =  property_util.command_line_properties[key]
-                    elif key in property_util.env_properties:
-                        evaulated_key = property_util.env_properties[key]
-                    elif key in property_util.infile_properties and property_util.infile_properties[key].value is not None:
-                        evaulated_key = property_util.infile_properties[key].value
-                    else:
-                        evaulated_key = key
-                    # complain if actual_key is not available in indexed_value
-                    if isinstance(indexed_value, list):
-                        if isinstance(evaulated_key, int):
-                            indexed_value = indexed_value[int(evaulated_key)]
-                            continue
-                    elif isinstance(indexed_value, dict) and evaulated_key in indexed_value:
-                        indexed_value = indexed_value[evaulated_key]
+                    evaulated_key = key
+                # complain if actual_key is not available in indexed_value
+                if isinstance(indexed_value, list):
+                    if isinstance(evaulated_key, int):
+                        indexed_value = indexed_value[int(evaulated_key)]
                         continue
-                    raise VariableIndexNotAvailable(actual_key=evaulated_key, indexed_value=indexed_value, target=index_sub.target)
-                property_util.add_infile_property_from_var(variable.name, indexed_value, can_override)
-
+                elif isinstance(indexed_value, dict) and evaulated_key in indexed_value:
+                    indexed_value = indexed_value[evaulated_key]
+                    continue
+                raise VariableIndexNotAvailable(actual_key=evaulated_key, indexed_value=indexed_value, target=index_sub.target)
+            property_util.add_infile_property_from_var(variable.name, indexed_value, can_override)
 
 
 class HttpDefBase(BaseModelProcessor):
@@ -965,36 +1036,47 @@ class HttpDefBase(BaseModelProcessor):
     def load_def(self):
         if self._loaded:
             return
-        self.httpdef.name = self.args.target or "1"
-        self.load_extra_flags()
-        if self.httpdef.allow_insecure:
-            self.property_util.enable_system_command()
-            base_logger.info("allowing running system commands")
-        self.load_test_script()
-        # run prerequest script
-        # as it will set some variables
-        self.run_prerequest_script()
-
-        self.load_method()
-        self.load_url()
-        self.load_headers()
-        self.load_query()
-        self.load_payload()
-        self.load_auth()
-        self.load_proxy()
-        self.load_timeout()
-        self.load_retry()
-        self.load_custom_proxy()
-        self.load_certificate()
-        self.load_output()
-        self._loaded = True
-        self.script_execution.pre_request_script()
+        with self.timings.measure("load_def"):
+            self.httpdef.name = self.args.target or "1"
+            self.load_extra_flags()
+            if self.httpdef.allow_insecure:
+                self.property_util.enable_system_command()
+                base_logger.info("allowing running system commands")
+            self.load_test_script()
+            # run prerequest script
+            # as it will set some variables
+            self.run_prerequest_script()
+
+            self.load_method()
+            self.load_url()
+            self.load_headers()
+            self.load_query()
+            self.load_payload()
+            with self.timings.measure("auth"):
+                self.load_auth()
+            self.load_proxy()
+            self.load_timeout()
+            self.load_retry()
+            self.load_custom_proxy()
+            self.load_certificate()
+            self.load_output()
+            self._loaded = True
+            with self.timings.measure("pre_request_script"):
+                self.script_execution.pre_request_script()
+        # request is resolved, `$commands` run again for next one (bench iteration, rerun)
+        self.property_util.forget_system_command_results()
 
     def run_prerequest_script(self):
-        self.script_execution = ScriptExecutionPython(self.httpdef, self.property_util)
-        self.script_execution.init_request_script()
-        for key, value in self.script_execution.client.properties.updated.items():
-            self.property_util.add_command_line_property(key, value)
+        with self.timings.measure("pre_request_script"):
+            self.script_execution = ScriptExecutionPython(
+                self.httpdef, self.property_util, timings=self.timings
+            )
+            self.script_execution.init_request_script()
+            updated = self.script_execution.client.properties.updated
+            for key, value in updated.items():
+                self.property_util.add_command_line_property(key, value)
+            if updated:
+                self.reresolve_properties(updated)
 
     def load_test_script(self):
         self.httpdef.test_script = ""
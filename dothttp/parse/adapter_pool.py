@@ -0,0 +1,314 @@
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from requests import Session
+from requests.adapters import DEFAULT_POOLBLOCK, DEFAULT_POOLSIZE, HTTPAdapter
+from urllib3 import PoolManager
+from urllib3.util.retry import Retry
+
+from ..exceptions import PropertyFileException
+from .connection_timing import TIMED_POOL_CLASSES
+
+try:
+    from requests_unixsocket.adapters import UnixAdapter, UnixHTTPConnectionPool
+except ImportError:
+    # in wasm phase, it will not be available, and can be ignored
+    UnixAdapter = UnixHTTPConnectionPool = None
+
+request_logger = logging.getLogger("request")
+
+# property file section for pool settings
+# "$pool": {"connections": 20, "maxsize": 20, "block": false, "hosts": {"httpbin.org": 50}}
+POOL_SECTION = "$pool"
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    # number of hosts for which connection pools are kept
+    connections: int = DEFAULT_POOLSIZE
+    # connections kept per host
+    maxsize: int = DEFAULT_POOLSIZE
+    # when pool of a host is exhausted, wait for free connection
+    # instead of opening one which is discarded after use
+    block: bool = DEFAULT_POOLBLOCK
+    # per host `maxsize` overrides, (host, maxsize) pairs
+    hosts: Tuple[Tuple[str, int], ...] = ()
+
+    @staticmethod
+    def from_settings(settings: Optional[dict], args=None, file=None) -> Optional["PoolConfig"]:
+        """
+        pool config from property file section (`$pool`) and command line,
+        command line takes preference. None if pool is not configured anywhere
+        """
+        settings = dict(settings or {})
+        hosts = dict(settings.get("hosts") or {})
+        if args is not None:
+            for key, value in (
+                ("connections", args.pool_connections),
+                ("maxsize", args.pool_maxsize),
+                ("block", args.pool_block),
+            ):
+                if value is not None:
+                    settings[key] = value
+            hosts.update(args.pool_hosts or {})
+        if not settings and not hosts:
+            return None
+        try:
+            config = PoolConfig(
+                connections=int(settings.get("connections", DEFAULT_POOLSIZE)),
+                maxsize=int(settings.get("maxsize", DEFAULT_POOLSIZE)),
+                block=bool(settings.get("block", DEFAULT_POOLBLOCK)),
+                hosts=tuple(sorted((host, int(maxsize)) for host, maxsize in hosts.items())),
+            )
+        except (TypeError, ValueError):
+            raise PropertyFileException(
+                message=f"invalid `{POOL_SECTION}` settings {settings}", file=file
+            )
+        if config.connections < 1 or config.maxsize < 1 or any(
+            maxsize < 1 for _, maxsize in config.hosts
+        ):
+            raise PropertyFileException(
+                message=f"`{POOL_SECTION}` sizes should be positive", file=file
+            )
+        return config
+
+
+DEFAULT_POOL_CONFIG = PoolConfig()
+
+
+class HostLimitPoolManager(PoolManager):
+    """pool manager which allows `maxsize` per host, connections record request timings"""
+
+    def __init__(self, *args, host_maxsize: Optional[Dict[str, int]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.host_maxsize = host_maxsize or {}
+        self.pool_classes_by_scheme = TIMED_POOL_CLASSES
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        maxsize = self.host_maxsize.get(host)
+        if maxsize is not None:
+            request_context = dict(
+                self.connection_pool_kw if request_context is None else request_context
+            )
+            request_context["maxsize"] = maxsize
+        return super()._new_pool(scheme, host, port, request_context)
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    def __init__(self, pool_config: PoolConfig = DEFAULT_POOL_CONFIG, **kwargs):
+        self.pool_config = pool_config
+        super().__init__(
+            pool_connections=pool_config.connections,
+            pool_maxsize=pool_config.maxsize,
+            pool_block=pool_config.block,
+            **kwargs,
+        )
+
+    def init_poolmanager(self, connections, maxsize, block=DEFAULT_POOLBLOCK, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+        self.poolmanager = HostLimitPoolManager(
+            num_pools=connections,
+            maxsize=maxsize,
+            block=block,
+            host_maxsize=dict(self.pool_config.hosts),
+            **pool_kwargs,
+        )
+
+
+if UnixAdapter:
+
+    class PooledUnixConnectionPool(UnixHTTPConnectionPool):
+        def __init__(self, socket_path, timeout=60, maxsize=1, block=False):
+            # UnixHTTPConnectionPool doesn't take pool size
+            super(UnixHTTPConnectionPool, self).__init__(
+                "localhost", timeout=timeout, maxsize=maxsize, block=block
+            )
+            self.socket_path = socket_path
+            self.timeout = timeout
+
+    class PooledUnixAdapter(UnixAdapter):
+        """
+        `UnixAdapter` keeps a pool per url (path and query included) with single
+        connection. pools here are per socket and sized with pool config
+        """
+
+        def __init__(self, pool_config: PoolConfig = DEFAULT_POOL_CONFIG, **kwargs):
+            super().__init__(pool_connections=pool_config.connections, **kwargs)
+            self.pool_config = pool_config
+
+        def get_connection(self, url, proxies=None):
+            proxies = proxies or {}
+            if proxies.get(urlparse(url.lower()).scheme):
+                raise ValueError(f"{self.__class__.__name__} does not support specifying proxies")
+            socket_path = urlparse(url).netloc
+            with self.pools.lock:
+                pool = self.pools.get(socket_path)
+                if pool:
+                    return pool
+                maxsize = dict(self.pool_config.hosts).get(socket_path, self.pool_config.maxsize)
+                pool = PooledUnixConnectionPool(
+                    url, self.timeout, maxsize=maxsize, block=self.pool_config.block
+                )
+                self.pools[socket_path] = pool
+            return pool
+
+else:
+    PooledUnixAdapter = None
+
+
+def mount_pooled_adapters(session: Session, pool_config: PoolConfig = DEFAULT_POOL_CONFIG):
+    """mounts adapters sized with `pool_config`, previously mounted adapters are closed"""
+    previous = set(session.adapters.values())
+    session.mount("https://", PooledHTTPAdapter(pool_config))
+    session.mount("http://", PooledHTTPAdapter(pool_config))
+    if PooledUnixAdapter:
+        session.mount("http+unix://", PooledUnixAdapter(pool_config))
+    session.pool_config = pool_config
+    for adapter in previous:
+        adapter.close()
+    request_logger.debug(f"session connection pool configured with {pool_config}")
+    return session
+
+
+@dataclass
+class PoolStats:
+    # requests sent through connection pools
+    requests: int = 0
+    # connections opened (tcp + tls handshake)
+    connections: int = 0
+    # connections kept in pool, ready for reuse
+    idle: int = 0
+    # connections checked out by requests in flight
+    in_use: int = 0
+    pools: int = 0
+
+    @property
+    def reused(self) -> int:
+        return max(self.requests - self.connections, 0)
+
+    @property
+    def open(self) -> int:
+        return self.idle + self.in_use
+
+    def __add__(self, other: "PoolStats") -> "PoolStats":
+        return PoolStats(
+            self.requests + other.requests,
+            self.connections + other.connections,
+            self.idle + other.idle,
+            self.in_use + other.in_use,
+            self.pools + other.pools,
+        )
+
+    def to_dict(self):
+        return {
+            "requests": self.requests,
+            "connections": self.connections,
+            "reused": self.reused,
+            "open": self.open,
+            "idle": self.idle,
+            "in_use": self.in_use,
+            "pools": self.pools,
+        }
+
+
+def _get_connection_pool_stats(pool) -> PoolStats:
+    stats = PoolStats(requests=pool.num_requests, connections=pool.num_connections, pools=1)
+    queue = pool.pool
+    if queue is not None:
+        # queue is filled with `None` for connections which are not opened yet
+        with queue.mutex:
+            stats.idle = sum(1 for conn in queue.queue if conn is not None)
+            stats.in_use = max(queue.maxsize - len(queue.queue), 0)
+    return stats
+
+
+def get_host_stats(adapter: HTTPAdapter) -> Dict[str, PoolStats]:
+    """connection stats of an adapter per host (`scheme://host:port`, `http+unix://socket`)"""
+    if PooledUnixAdapter and isinstance(adapter, UnixAdapter):
+        container, get_host = adapter.pools, lambda key: f"http+unix://{key}"
+    else:
+        container = adapter.poolmanager.pools
+        get_host = lambda key: f"{key.key_scheme}://{key.key_host}:{key.key_port}"
+    with container.lock:
+        pools = list(container._container.items())
+    return {get_host(key): _get_connection_pool_stats(pool) for key, pool in pools}
+
+
+def get_pool_stats(adapter: HTTPAdapter) -> PoolStats:
+    """connection reuse of an adapter, from urllib3 connection pools it holds"""
+    return sum(get_host_stats(adapter).values(), PoolStats())
+
+
+def get_session_stats(session: Session) -> Dict[str, dict]:
+    """per host connection stats of session"""
+    stats: Dict[str, PoolStats] = {}
+    for adapter in set(session.adapters.values()):
+        for host, host_stats in get_host_stats(adapter).items():
+            stats[host] = stats.get(host, PoolStats()) + host_stats
+    return {host: host_stats.to_dict() for host, host_stats in sorted(stats.items())}
+
+
+@dataclass(frozen=True)
+class RetryConfig:
+    total: int
+    status_forcelist: Optional[Tuple[int, ...]] = None
+    backoff_factor: Optional[float] = None
+
+    def to_retry(self) -> Retry:
+        # Build kwargs for Retry, passing only configured parameters
+        retry_kwargs = {"total": self.total}
+        if self.status_forcelist is not None:
+            retry_kwargs["status_forcelist"] = self.status_forcelist
+        if self.backoff_factor is not None:
+            retry_kwargs["backoff_factor"] = self.backoff_factor
+        # Always set raise_on_status=False for API testing tools
+        # Users want to see the response regardless of status code
+        retry_kwargs["raise_on_status"] = False
+        return Retry(**retry_kwargs)
+
+
+class AdapterPool:
+    """
+    retry adapters, one per retry and pool configuration for the lifetime of process.
+    each adapter holds its own connection pools, creating one per request
+    throws away keep-alive connections (tcp and tls handshake on every call)
+    """
+
+    def __init__(self):
+        self._adapters: Dict[Tuple[RetryConfig, PoolConfig], HTTPAdapter] = {}
+        self._lock = threading.Lock()
+
+    def get_adapter(
+        self, config: RetryConfig, pool_config: Optional[PoolConfig] = None
+    ) -> HTTPAdapter:
+        key = (config, pool_config or DEFAULT_POOL_CONFIG)
+        adapter = self._adapters.get(key)
+        if adapter is not None:
+            return adapter
+        with self._lock:
+            adapter = self._adapters.get(key)
+            if adapter is None:
+                adapter = PooledHTTPAdapter(key[1], max_retries=config.to_retry())
+                self._adapters[key] = adapter
+                request_logger.debug(f"Retry adapter created with: {config}")
+        return adapter
+
+    def get_stats(self) -> Dict[Tuple[RetryConfig, PoolConfig], PoolStats]:
+        with self._lock:
+            adapters = list(self._adapters.items())
+        return {key: get_pool_stats(adapter) for key, adapter in adapters}
+
+    def close(self):
+        with self._lock:
+            adapters = list(self._adapters.values())
+            self._adapters.clear()
+        for adapter in adapters:
+            adapter.close()
+
+
+retry_adapter_pool = AdapterPool()
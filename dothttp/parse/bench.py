@@ -0,0 +1,719 @@
+import dataclasses
+import json
+import logging
+import math
+import multiprocessing
+import queue
+import threading
+import time
+import types
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from requests import PreparedRequest, Session
+
+from ..exceptions import BenchProcessException
+from ..models.computed import Config, HttpDef
+from ..utils.histogram import DEFAULT_PERCENTILES, LatencyHistogram
+from ..utils.multipart import FileBody, FilePart
+from ..utils.property_util import PropertyProvider
+from .target_runner import SharedModelCompiler
+
+request_logger = logging.getLogger("request")
+
+# used when neither duration nor number of requests is given
+DEFAULT_BENCH_DURATION = 10.0
+# open loop, request which starts later than this (after its intended time) is late
+LATE_THRESHOLD = 0.01
+# open loop, requests waiting for a free worker, further arrivals are dropped
+DEFAULT_BACKLOG = 1000
+
+
+class BenchCompiler(SharedModelCompiler):
+    """
+    request compiler which loads httpdef once and hands out requests to send.
+
+    when target refers to nothing dynamic, same prepared request is copied for every iteration.
+    otherwise only dynamic properties (`$randomInt`, `$uuid`, `{{id=$randomStr}}`,
+    `var id = uuid();`, `$commands` and whatever depends on them) are re-evaluated and httpdef is rendered again,
+    file is neither read nor parsed again.
+    """
+
+    def prepare(self):
+        self.load_def()
+        variables = self.get_variable_graph()
+        keys = set()
+        for http in [self.http] + self.parents_http:
+            keys.update(self.get_references(http, variables))
+        self.special_keys = {key for key in keys if PropertyProvider.is_special_keyword(key)}
+        # `{{id=$randomInt}}`, default is random
+        self.random_defaults: Dict[str, List[str]] = {}
+        for key in keys:
+            prop = self.property_util.infile_properties.get(key)
+            if prop is None:
+                continue
+            texts = [text for text in prop.text if "=" in text]
+            if any(
+                PropertyProvider.get_random_match(text.split("=", 1)[1].strip()) for text in texts
+            ):
+                self.random_defaults[key] = texts
+        # `var id = uuid();`
+        self.random_variables = [
+            variable
+            for model in [self.model] + [model for model, _ in self.import_graph or []]
+            for variable in model.variables
+            if variable.func and variable.name in keys
+        ]
+        # `$commands` (timestamps, tokens) run for every iteration, unless a property overrides them
+        self.command_keys = set()
+        if self.property_util.is_running_system_command_enabled:
+            self.command_keys = {
+                key
+                for key in keys
+                if key in self.property_util.system_command_properties
+                and key not in self.property_util.command_line_properties
+                and key not in self.property_util.env_properties
+            }
+        # pre request functions can compute anything (signatures, timestamps)
+        self.has_pre_request_script = any(
+            (key.startswith("pre") or key.startswith("init")) and isinstance(func, types.FunctionType)
+            for key, func in self.script_execution.local.items()
+        )
+        # session is built from (cached) request, before payload file is closed
+        self.session = self.get_session()
+        self.request = self.get_resendable_request()
+        return self
+
+    def get_resendable_request(self) -> PreparedRequest:
+        """
+        prepared request whose body can be sent again. file payload (`< "data.txt"`) is
+        an opened file, which is empty after first send (while content-length stays same),
+        it is replaced by body which opens file for every send
+        """
+        # `get_request` is cached per compiler
+        request = self.get_request.__wrapped__(self)
+        if hasattr(request.body, "read"):
+            part = FilePart.from_file(request.body)
+            if part is not None:
+                request.body = FileBody(part)
+                self.httpdef.payload.close()
+        return request
+
+    @property
+    def is_dynamic(self) -> bool:
+        return bool(
+            self.special_keys
+            or self.random_defaults
+            or self.random_variables
+            or self.command_keys
+            or self.has_pre_request_script
+        )
+
+    def refresh_dynamic_properties(self):
+        # results of previous iteration are forgotten once it is loaded
+        updated = set(self.command_keys)
+        for variable in self.random_variables:
+            self.evaluate_variable(variable, self.property_util)
+            updated.add(variable.name)
+        for key, texts in self.random_defaults.items():
+            cache = {}
+            for text in texts:
+                self.property_util.validate_n_gen(text, cache)
+            self.property_util.infile_properties[key] = cache[key]
+            updated.add(key)
+        if updated:
+            self.reresolve_properties(updated)
+
+    def next_request(self) -> PreparedRequest:
+        if not self.is_dynamic:
+            return self.request.copy()
+        self.refresh_dynamic_properties()
+        self._loaded = False
+        self.httpdef = HttpDef()
+        self.load_def()
+        return self.get_resendable_request()
+
+
+@dataclass
+class BenchResult:
+    target: str
+    workers: int = 1
+    # wall time of run, in seconds
+    duration: float = 0
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    status_codes: Dict[int, int] = field(default_factory=dict)
+    # exception name to count, requests which didn't get response
+    errors: Dict[str, int] = field(default_factory=dict)
+    # `closed` or `open` loop
+    mode: str = "closed"
+    # open loop, arrivals not dispatched as backlog was full
+    dropped: int = 0
+    # open loop, requests which started `LATE_THRESHOLD` after intended time
+    late: int = 0
+    # open loop, latency from actual send (`histogram` is from intended start)
+    service_histogram: Optional[LatencyHistogram] = None
+    # `workers` are per process
+    processes: int = 1
+
+    @property
+    def responses(self) -> int:
+        return sum(self.status_codes.values())
+
+    @property
+    def requests(self) -> int:
+        return self.responses + sum(self.errors.values())
+
+    @property
+    def failures(self) -> int:
+        """responses with 4xx/5xx status"""
+        return sum(count for status, count in self.status_codes.items() if status >= 400)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.requests:
+            return 0.0
+        return (sum(self.errors.values()) + self.failures) / self.requests
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.duration if self.duration else 0.0
+
+    def record(self, latency: float, status: int, service_time: Optional[float] = None):
+        self.histogram.record(latency)
+        if service_time is not None:
+            if self.service_histogram is None:
+                self.service_histogram = LatencyHistogram(self.histogram.precision)
+            self.service_histogram.record(service_time)
+        self.status_codes[status] = self.status_codes.get(status, 0) + 1
+
+    def record_error(self, exc: BaseException):
+        name = type(exc).__name__
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+    def copy(self) -> "BenchResult":
+        """copy of result which workers keep updating"""
+        return BenchResult(
+            self.target,
+            workers=self.workers,
+            duration=self.duration,
+            histogram=self.histogram.copy(),
+            status_codes=self.status_codes.copy(),
+            errors=self.errors.copy(),
+            mode=self.mode,
+            dropped=self.dropped,
+            late=self.late,
+            service_histogram=self.service_histogram.copy() if self.service_histogram else None,
+            processes=self.processes,
+        )
+
+    def merge(self, other: "BenchResult") -> "BenchResult":
+        """adds requests of `other`, which ran at the same time (other workers)"""
+        self.histogram.merge(other.histogram)
+        for status, count in other.status_codes.items():
+            self.status_codes[status] = self.status_codes.get(status, 0) + count
+        for name, count in other.errors.items():
+            self.errors[name] = self.errors.get(name, 0) + count
+        if other.service_histogram is not None:
+            if self.service_histogram is None:
+                self.service_histogram = LatencyHistogram(other.service_histogram.precision)
+            self.service_histogram.merge(other.service_histogram)
+        self.dropped += other.dropped
+        self.late += other.late
+        self.duration = max(self.duration, other.duration)
+        return self
+
+    def get_latency_summary(self, histogram: Optional[LatencyHistogram] = None) -> Dict[str, Optional[float]]:
+        """milliseconds"""
+        histogram = histogram or self.histogram
+        summary = {
+            "min": histogram.min,
+            "mean": histogram.mean,
+            **histogram.percentiles(DEFAULT_PERCENTILES),
+            "max": histogram.max,
+        }
+        return {key: None if value is None else value * 1000 for key, value in summary.items()}
+
+    def to_dict(self) -> dict:
+        data = {
+            "target": self.target,
+            "mode": self.mode,
+            "processes": self.processes,
+            "workers": self.workers,
+            "duration": self.duration,
+            "requests": self.requests,
+            "throughput": self.throughput,
+            "error_rate": self.error_rate,
+            "failures": self.failures,
+            "errors": dict(self.errors),
+            # json keys are strings
+            "status_codes": {str(status): count for status, count in sorted(self.status_codes.items())},
+            "latency_ms": self.get_latency_summary(),
+            "histogram": self.histogram.to_dict(),
+        }
+        if self.mode == "open":
+            data["dropped"] = self.dropped
+            data["late"] = self.late
+            if self.service_histogram is not None:
+                data["service_latency_ms"] = self.get_latency_summary(self.service_histogram)
+                data["service_histogram"] = self.service_histogram.to_dict()
+        return data
+
+    @staticmethod
+    def from_dict(data: dict) -> "BenchResult":
+        return BenchResult(
+            target=data["target"],
+            workers=data.get("workers", 1),
+            duration=data.get("duration", 0),
+            histogram=LatencyHistogram.from_dict(data.get("histogram", {})),
+            status_codes={int(status): count for status, count in data.get("status_codes", {}).items()},
+            errors=dict(data.get("errors", {})),
+            mode=data.get("mode", "closed"),
+            dropped=data.get("dropped", 0),
+            late=data.get("late", 0),
+            service_histogram=LatencyHistogram.from_dict(data["service_histogram"])
+            if "service_histogram" in data
+            else None,
+            processes=data.get("processes", 1),
+        )
+
+
+class LoadGenerator:
+    """
+    closed loop load, every worker sends next request as soon as previous one completes.
+    runs for `duration` seconds or until `requests` are sent, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        args: Config,
+        workers: int = 1,
+        duration: Optional[float] = None,
+        requests: Optional[int] = None,
+    ):
+        self.args = args
+        self.workers = max(workers or 1, 1)
+        if duration is None and requests is None:
+            duration = DEFAULT_BENCH_DURATION
+        self.duration = duration
+        self.requests = requests
+        self._issued = 0
+        self._deadline = None
+        self._lock = threading.Lock()
+        self._start = None
+        self.results: List[BenchResult] = []
+        self.compilers = self.get_compilers()
+
+    def get_compilers(self) -> List[BenchCompiler]:
+        # file is parsed once, other workers work on copies of model
+        first = BenchCompiler(self.args).prepare()
+        args = dataclasses.replace(self.args, content=first.content)
+        compilers = [first]
+        for _ in range(self.workers - 1):
+            compilers.append(BenchCompiler(args, first.get_model_copy()).prepare())
+        request_logger.debug(
+            f"bench target {first.httpdef.name} is {'dynamic' if first.is_dynamic else 'static'}"
+        )
+        return compilers
+
+    def acquire(self) -> bool:
+        """permission to send one more request"""
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            return False
+        if self.requests is None:
+            return True
+        with self._lock:
+            if self._issued >= self.requests:
+                return False
+            self._issued += 1
+            return True
+
+    def send(
+        self, comp: BenchCompiler, session: Session, result: BenchResult, intended: Optional[float] = None
+    ):
+        """`intended`, for open loop, latency is measured from it (includes time spent waiting)"""
+        try:
+            request = comp.next_request()
+            start = time.perf_counter()
+            if intended is not None and start - intended > LATE_THRESHOLD:
+                result.late += 1
+            resp = comp.send_request(request, session)
+            # body is read by session, time to last byte
+            end = time.perf_counter()
+            if intended is None:
+                result.record(end - start, resp.status_code)
+            else:
+                result.record(end - intended, resp.status_code, end - start)
+        except Exception as exc:
+            request_logger.debug("bench request failed", exc_info=True)
+            result.record_error(exc)
+
+    def work(self, comp: BenchCompiler, result: BenchResult):
+        while self.acquire():
+            self.send(comp, comp.session, result)
+
+    @property
+    def target(self) -> str:
+        return self.compilers[0].httpdef.name
+
+    def snapshot(self) -> BenchResult:
+        """results so far, can be called while run is in progress"""
+        duration = time.perf_counter() - self._start if self._start is not None else 0
+        merged = BenchResult(
+            self.target, workers=self.workers, duration=duration, mode=self.get_mode()
+        )
+        for result in list(self.results):
+            merged.merge(result.copy())
+        merged.duration = duration
+        return merged
+
+    def get_mode(self) -> str:
+        return "closed"
+
+    def run(self) -> BenchResult:
+        self.results = [BenchResult(self.target) for _ in self.compilers]
+        threads = [
+            threading.Thread(target=self.work, args=(comp, result), daemon=True)
+            for comp, result in zip(self.compilers, self.results)
+        ]
+        self._start = time.perf_counter()
+        if self.duration is not None:
+            self._deadline = self._start + self.duration
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.snapshot()
+
+
+@dataclass(frozen=True)
+class RateSegment:
+    duration: float
+    # requests per second at start and end of segment, linear in between
+    start_rate: float
+    end_rate: float
+
+    def get_arrivals(self, count: float) -> float:
+        """offset (in segment) at which `count` requests have arrived"""
+        slope = (self.end_rate - self.start_rate) / self.duration
+        if abs(slope) < 1e-12:
+            return count / self.start_rate
+        # start_rate * t + slope * t ** 2 / 2 = count
+        discriminant = self.start_rate ** 2 + 2 * slope * count
+        return 2 * count / (self.start_rate + math.sqrt(max(discriminant, 0)))
+
+    @property
+    def total(self) -> float:
+        """requests arriving in segment"""
+        return (self.start_rate + self.end_rate) / 2 * self.duration
+
+
+class ArrivalProfile:
+    """arrival rate over time, made of linear segments"""
+
+    def __init__(self, segments: Sequence[RateSegment]):
+        self.segments = [segment for segment in segments if segment.duration > 0]
+
+    @staticmethod
+    def constant(rate: float, duration: float) -> "ArrivalProfile":
+        return ArrivalProfile([RateSegment(duration, rate, rate)])
+
+    @staticmethod
+    def ramp_up(rate: float, ramp: float, duration: float) -> "ArrivalProfile":
+        """rate grows from 0 over `ramp` seconds, stays at `rate` (plateau) till `duration`"""
+        ramp = min(ramp, duration)
+        return ArrivalProfile(
+            [RateSegment(ramp, 0, rate), RateSegment(duration - ramp, rate, rate)]
+        )
+
+    @staticmethod
+    def steps(steps: Sequence[Tuple[float, float]]) -> "ArrivalProfile":
+        """(rate, seconds) pairs"""
+        return ArrivalProfile([RateSegment(seconds, rate, rate) for rate, seconds in steps])
+
+    @property
+    def duration(self) -> float:
+        return sum(segment.duration for segment in self.segments)
+
+    def scale(self, factor: float) -> "ArrivalProfile":
+        """same shape, rates multiplied by `factor` (share of one of several processes)"""
+        return ArrivalProfile(
+            [
+                RateSegment(segment.duration, segment.start_rate * factor, segment.end_rate * factor)
+                for segment in self.segments
+            ]
+        )
+
+    def get_arrivals(self) -> Iterator[float]:
+        """intended start of every request, seconds from start of run"""
+        offset = 0.0
+        # arrivals are spread across segment boundaries, fraction is carried over
+        carried = 0.0
+        for segment in self.segments:
+            count = 1 - carried
+            total = segment.total
+            while count <= total + 1e-9:
+                yield offset + segment.get_arrivals(count)
+                count += 1
+            carried = total - (count - 1)
+            offset += segment.duration
+
+
+class OpenLoopGenerator(LoadGenerator):
+    """
+    open loop load, requests are issued as per `profile` irrespective of responses.
+
+    closed loop waits for previous response before sending next request, when server stalls
+    fewer requests are sent and stall shows up in few samples (coordinated omission).
+    here latency is measured from intended start of request, time spent waiting for a
+    free worker counts as well. requests which start late are reported, arrivals which find
+    `backlog` requests waiting are dropped (reported, not sent).
+
+    requests are prepared and sent by `RequestCompiler` same as normal runs
+    (auth, retry and timeout included), `workers` bounds concurrency.
+    """
+
+    def __init__(
+        self,
+        args: Config,
+        profile: ArrivalProfile,
+        workers: int = 1,
+        requests: Optional[int] = None,
+        backlog: int = DEFAULT_BACKLOG,
+    ):
+        self.profile = profile
+        self.backlog = backlog
+        super().__init__(args, workers=workers, duration=profile.duration, requests=requests)
+
+    def dispatch(self, start: float, pending: "queue.Queue", result: BenchResult):
+        issued = 0
+        for offset in self.profile.get_arrivals():
+            if self.requests is not None and issued >= self.requests:
+                break
+            intended = start + offset
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                pending.put_nowait(intended)
+                issued += 1
+            except queue.Full:
+                result.dropped += 1
+
+    def work_queue(self, comp: BenchCompiler, pending: "queue.Queue", result: BenchResult):
+        while True:
+            intended = pending.get()
+            if intended is None:
+                return
+            self.send(comp, comp.session, result, intended)
+
+    def get_mode(self) -> str:
+        return "open"
+
+    def run(self) -> BenchResult:
+        # last one is of dispatcher (dropped arrivals)
+        self.results = [BenchResult(self.target, mode="open") for _ in range(len(self.compilers) + 1)]
+        pending = queue.Queue(maxsize=self.backlog)
+        threads = [
+            threading.Thread(target=self.work_queue, args=(comp, pending, result), daemon=True)
+            for comp, result in zip(self.compilers, self.results)
+        ]
+        for thread in threads:
+            thread.start()
+        self._start = time.perf_counter()
+        self.dispatch(self._start, pending, self.results[-1])
+        for _ in threads:
+            pending.put(None)
+        for thread in threads:
+            thread.join()
+        return self.snapshot()
+
+
+def _run_bench_process(index: int, args: Config, options: dict, events, go, interval: float):
+    """runs in worker process, reports snapshots of results every `interval` seconds"""
+    try:
+        profile = options.pop("profile", None)
+        if profile is not None:
+            generator = OpenLoopGenerator(args, profile, **options)
+        else:
+            generator = LoadGenerator(args, **options)
+    except Exception as exc:
+        message = getattr(exc, "message", None) or str(exc)
+        events.put(("error", index, message))
+        return
+    events.put(("ready", index, None))
+    go.wait()
+    results = []
+    thread = threading.Thread(target=lambda: results.append(generator.run()), daemon=True)
+    thread.start()
+    while True:
+        thread.join(interval)
+        if not thread.is_alive():
+            break
+        events.put(("snapshot", index, generator.snapshot().to_dict()))
+    if results:
+        events.put(("done", index, results[0].to_dict()))
+    else:
+        events.put(("error", index, "bench run failed"))
+
+
+class MultiProcessLoadGenerator:
+    """
+    load from several processes, python process saturates a core well before most services do.
+
+    every process builds httpdef of target once (`BenchCompiler`) and keeps its own session
+    (connection pools) and `workers` threads. load is split across processes (requests, arrival rate),
+    processes start together once all of them are ready and stream snapshots of their
+    results (histograms) every `interval` seconds, which are merged for live report.
+    """
+
+    def __init__(
+        self,
+        args: Config,
+        processes: int,
+        workers: int = 1,
+        duration: Optional[float] = None,
+        requests: Optional[int] = None,
+        profile: Optional[ArrivalProfile] = None,
+        interval: float = 1.0,
+        on_snapshot: Optional[Callable[[BenchResult], None]] = None,
+    ):
+        self.args = args
+        if requests is not None:
+            processes = min(processes, requests)
+        self.processes = max(processes, 1)
+        self.workers = max(workers or 1, 1)
+        self.duration = duration
+        self.requests = requests
+        self.profile = profile
+        self.interval = interval
+        self.on_snapshot = on_snapshot
+
+    def get_process_options(self, index: int) -> dict:
+        options = {"workers": self.workers}
+        if self.requests is not None:
+            share, extra = divmod(self.requests, self.processes)
+            options["requests"] = share + (1 if index < extra else 0)
+        if self.profile is not None:
+            options["profile"] = self.profile.scale(1 / self.processes)
+        else:
+            options["duration"] = self.duration
+        return options
+
+    def merge(self, results: Dict[int, BenchResult], duration: float) -> BenchResult:
+        target = next(iter(results.values())).target if results else self.args.target
+        merged = BenchResult(
+            target,
+            workers=self.workers,
+            mode="open" if self.profile is not None else "closed",
+            processes=self.processes,
+        )
+        for result in results.values():
+            merged.merge(result)
+        merged.duration = duration
+        return merged
+
+    def run(self) -> BenchResult:
+        # fork with threads around (cookie saver, server) is not safe
+        context = multiprocessing.get_context("spawn")
+        events = context.Queue()
+        go = context.Event()
+        processes = [
+            context.Process(
+                target=_run_bench_process,
+                args=(index, self.args, self.get_process_options(index), events, go, self.interval),
+                daemon=True,
+            )
+            for index in range(self.processes)
+        ]
+        for process in processes:
+            process.start()
+        ready = 0
+        start = None
+        latest: Dict[int, BenchResult] = {}
+        finished: Dict[int, BenchResult] = {}
+        reported = set()
+        try:
+            while len(finished) < self.processes:
+                try:
+                    kind, index, payload = events.get(timeout=max(self.interval, 1))
+                except queue.Empty:
+                    for index, process in enumerate(processes):
+                        if index not in finished and process.exitcode is not None:
+                            raise BenchProcessException(
+                                index=index, message=f"exited with code {process.exitcode}"
+                            )
+                    continue
+                if kind == "error":
+                    raise BenchProcessException(index=index, message=payload)
+                if kind == "ready":
+                    ready += 1
+                    if ready == self.processes:
+                        start = time.perf_counter()
+                        go.set()
+                    continue
+                result = BenchResult.from_dict(payload)
+                latest[index] = result
+                if kind == "done":
+                    finished[index] = result
+                    continue
+                # one live report per round of snapshots
+                reported.add(index)
+                if self.on_snapshot and reported.issuperset(set(range(self.processes)) - set(finished)):
+                    reported.clear()
+                    self.on_snapshot(self.merge(latest, time.perf_counter() - start))
+        finally:
+            for process in processes:
+                if process.is_alive() and len(finished) < self.processes:
+                    process.terminate()
+                process.join()
+        return self.merge(finished, max(result.duration for result in finished.values()))
+
+
+def format_bench_progress(result: BenchResult) -> str:
+    latency = result.get_latency_summary()
+
+    def ms(key):
+        return "-" if latency[key] is None else f"{latency[key]:.2f}ms"
+
+    return (
+        f"[{result.duration:.1f}s] {result.requests} requests ({result.throughput:.1f} req/s), "
+        f"error rate {result.error_rate * 100:.2f}%, p50 {ms('p50')}, p99 {ms('p99')}"
+    )
+
+
+def format_bench_result(result: BenchResult) -> str:
+    def ms(value):
+        return "-" if value is None else f"{value:.2f}"
+
+    latency = result.get_latency_summary()
+    lines = [
+        f"target: {result.target}",
+        f"requests: {result.requests} in {result.duration:.2f}s "
+        f"({result.throughput:.1f} req/s) with {result.workers} workers"
+        + (f" in each of {result.processes} processes" if result.processes > 1 else ""),
+        f"errors: {sum(result.errors.values())}, 4xx/5xx: {result.failures} "
+        f"(error rate {result.error_rate * 100:.2f}%)",
+        "status codes: "
+        + (", ".join(f"{status}={count}" for status, count in sorted(result.status_codes.items())) or "-"),
+    ]
+    if result.errors:
+        lines.append(
+            "exceptions: " + ", ".join(f"{name}={count}" for name, count in sorted(result.errors.items()))
+        )
+    lines.append("latency (ms): " + "  ".join(f"{key} {ms(value)}" for key, value in latency.items()))
+    if result.mode == "open":
+        lines.append(f"dropped: {result.dropped}, late: {result.late} (started >{LATE_THRESHOLD * 1000:g}ms late)")
+        if result.service_histogram is not None:
+            service = result.get_latency_summary(result.service_histogram)
+            lines.append(
+                "service time (ms): " + "  ".join(f"{key} {ms(value)}" for key, value in service.items())
+            )
+    return "\n".join(lines)
+
+
+def write_bench_report(path: str, result: BenchResult, args: Optional[Config] = None):
+    report = result.to_dict()
+    if args is not None:
+        report["file"] = args.file
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
@@ -0,0 +1,225 @@
+import hashlib
+import logging
+import os
+import ssl
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Tuple
+
+from requests import Session
+from requests.utils import DEFAULT_CA_BUNDLE_PATH
+from requests_pkcs12 import Pkcs12Adapter
+from urllib3.util.ssl_ import create_urllib3_context
+
+from .adapter_pool import (
+    DEFAULT_POOL_CONFIG,
+    PoolConfig,
+    PooledHTTPAdapter,
+    RetryConfig,
+    mount_pooled_adapters,
+)
+
+request_logger = logging.getLogger("request")
+
+P12 = "p12"
+PEM = "pem"
+
+
+@dataclass(frozen=True)
+class CertIdentity:
+    kind: str
+    # absolute paths of certificate (and key) files
+    files: Tuple[str, ...]
+    # sha256 of password, password itself is not kept around
+    password_hash: Optional[str]
+    verify: bool
+    pool_config: PoolConfig = DEFAULT_POOL_CONFIG
+
+
+def _get_stamps(files) -> Optional[Tuple[Tuple[int, int], ...]]:
+    stamps = []
+    for path in files:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        stamps.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(stamps)
+
+
+def hash_password(password: Optional[str]) -> Optional[str]:
+    if password is None:
+        return None
+    return hashlib.sha256(password.encode("utf-8")).hexdigest()
+
+
+class PooledPkcs12Adapter(Pkcs12Adapter, PooledHTTPAdapter):
+    pass
+
+
+@dataclass
+class CertSessionEntry:
+    # certificate files (mtime, size) when session was created
+    stamps: tuple
+    session: Session
+    # creates https adapter for identity, takes `HTTPAdapter` kwargs (`max_retries`)
+    adapter_factory: Callable[..., PooledHTTPAdapter]
+    retry_adapters: Dict[RetryConfig, PooledHTTPAdapter] = field(default_factory=dict)
+
+
+class PemCertAdapter(PooledHTTPAdapter):
+    """
+    adapter with ssl context built once for a pem client certificate.
+    default adapter loads certificate chain (and ca bundle) into ssl context
+    for every new connection, here it is done once per identity
+    """
+
+    def __init__(self, cert_file, key_file=None, verify=True, **kwargs):
+        self.verify = verify
+        self.ssl_context = create_urllib3_context()
+        if not verify:
+            self.ssl_context.check_hostname = False
+            self.ssl_context.verify_mode = ssl.CERT_NONE
+        else:
+            self.ssl_context.load_verify_locations(DEFAULT_CA_BUNDLE_PATH)
+        self.ssl_context.load_cert_chain(cert_file, key_file)
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["ssl_context"] = self.ssl_context
+        return super().init_poolmanager(*args, **kwargs)
+
+    def cert_verify(self, conn, url, verify, cert):
+        # certificate and ca bundle are already part of ssl context
+        conn.cert_reqs = "CERT_REQUIRED" if self.verify else "CERT_NONE"
+        conn.ca_certs = None
+        conn.ca_cert_dir = None
+        conn.cert_file = None
+        conn.key_file = None
+
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):
+        return super().build_connection_pool_key_attributes(request, self.verify, None)
+
+
+class ClientCertSessions:
+    """
+    one session per client certificate identity (certificate path, password hash,
+    verify and pool config), kept as long as certificate files are unchanged (mtime, size).
+    pkcs12 bundle is decrypted and ssl context is built once per identity,
+    and connections are reused across requests.
+
+    earlier, an adapter was mounted on global session for every request url,
+    mount table kept growing on long running servers.
+    least recently used sessions are dropped when there are more than `max_sessions`.
+    they are not closed, other threads may still be sending through them,
+    their connections are closed once they are garbage collected.
+
+    retry adapters of an identity are built with same certificate (`get_retry_adapter`)
+    """
+
+    def __init__(self, max_sessions=32):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[CertIdentity, CertSessionEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_p12_session(
+        self, p12_file: str, password: Optional[str], verify: bool, pool_config: Optional[PoolConfig] = None
+    ) -> Session:
+        identity = CertIdentity(
+            P12,
+            (os.path.abspath(p12_file),),
+            hash_password(password),
+            verify,
+            pool_config or DEFAULT_POOL_CONFIG,
+        )
+
+        def create_adapter(**kwargs):
+            adapter = PooledPkcs12Adapter(
+                pool_config=identity.pool_config,
+                pkcs12_filename=p12_file,
+                pkcs12_password=password,
+                **kwargs,
+            )
+            if not verify:
+                # `Pkcs12Adapter.send` toggles it per request otherwise,
+                # which races when adapter is shared across threads
+                adapter.ssl_context.check_hostname = False
+            return adapter
+
+        return self._get_session(identity, create_adapter)
+
+    def get_pem_session(
+        self, cert_file: str, key_file: Optional[str], verify: bool, pool_config: Optional[PoolConfig] = None
+    ) -> Optional[Session]:
+        """None if certificate is not available (`requests` reports it)"""
+        files = (cert_file, key_file) if key_file else (cert_file,)
+        if not cert_file or _get_stamps(files) is None:
+            return None
+        identity = CertIdentity(
+            PEM,
+            tuple(os.path.abspath(path) for path in files),
+            None,
+            verify,
+            pool_config or DEFAULT_POOL_CONFIG,
+        )
+        return self._get_session(
+            identity,
+            lambda **kwargs: PemCertAdapter(cert_file, key_file, verify, pool_config=identity.pool_config, **kwargs),
+        )
+
+    def _get_session(self, identity: CertIdentity, adapter_factory) -> Session:
+        stamps = _get_stamps(identity.files)
+        with self._lock:
+            entry = self._sessions.get(identity)
+            if entry and stamps is not None and entry.stamps == stamps:
+                self._sessions.move_to_end(identity)
+                return entry.session
+        # adapter creation (decrypting pkcs12) is done outside of lock,
+        # it raises same errors as before for missing/invalid certificates
+        adapter = adapter_factory()
+        session = mount_pooled_adapters(Session(), identity.pool_config)
+        session.mount("https://", adapter)
+        session.client_cert = identity
+        session.client_cert_entry = entry = CertSessionEntry(stamps, session, adapter_factory)
+        request_logger.debug(f"client certificate session created for {identity.files}")
+        with self._lock:
+            # replaced (certificate changed) or evicted sessions can still be in use by other threads
+            self._sessions.pop(identity, None)
+            self._sessions[identity] = entry
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
+
+    def get_retry_adapter(self, session: Session, config: RetryConfig) -> Optional[PooledHTTPAdapter]:
+        """
+        adapter with client certificate of `session` and retries of `config`,
+        one per session and retry config. None when session isn't a client certificate session
+        """
+        entry: Optional[CertSessionEntry] = getattr(session, "client_cert_entry", None)
+        if entry is None:
+            return None
+        adapter = entry.retry_adapters.get(config)
+        if adapter is not None:
+            return adapter
+        # pkcs12 is decrypted again, outside of lock
+        adapter = entry.adapter_factory(max_retries=config.to_retry())
+        with self._lock:
+            adapter = entry.retry_adapters.setdefault(config, adapter)
+        request_logger.debug(f"client certificate retry adapter created with: {config}")
+        return adapter
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def close(self):
+        with self._lock:
+            entries = list(self._sessions.values())
+            self._sessions.clear()
+        for entry in entries:
+            entry.session.close()
+            for adapter in entry.retry_adapters.values():
+                adapter.close()
+
+
+client_cert_sessions = ClientCertSessions()
@@ -0,0 +1,87 @@
+import socket
+
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+from urllib3.util.ssl_ import is_ipaddress
+
+from ..utils.timing import get_active_timings
+
+
+class TimedConnectionMixin:
+    """
+    records dns, connect, send and time to first byte to timings active on
+    current thread (`RequestTimings.activate`). without active timings, it is plain connection
+    """
+
+    def _new_conn(self):
+        timings = get_active_timings()
+        host = self._dns_host
+        if timings is None or is_ipaddress(host):
+            if timings is None:
+                return super()._new_conn()
+            with timings.measure("connect"):
+                return super()._new_conn()
+        with timings.measure("dns"):
+            try:
+                addresses = socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+            except OSError:
+                # resolution error is reported by urllib3
+                addresses = []
+        if not addresses:
+            return super()._new_conn()
+        with timings.measure("connect"):
+            error = None
+            # every address is tried, same as `urllib3.util.connection.create_connection`
+            for address in dict.fromkeys(sockaddr[0] for *_, sockaddr in addresses):
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except (NewConnectionError, ConnectTimeoutError) as exc:
+                    error = exc
+                finally:
+                    self._dns_host = host
+            raise error
+
+    def request(self, *args, **kwargs):
+        timings = get_active_timings()
+        if timings is None:
+            return super().request(*args, **kwargs)
+        # http connection connects while sending, connect is not counted for send
+        with timings.measure("send"):
+            return super().request(*args, **kwargs)
+
+    def getresponse(self, *args, **kwargs):
+        timings = get_active_timings()
+        if timings is None:
+            return super().getresponse(*args, **kwargs)
+        with timings.measure("ttfb"):
+            response = super().getresponse(*args, **kwargs)
+        timings.mark_response()
+        return response
+
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        timings = get_active_timings()
+        if timings is None:
+            return super().connect()
+        # dns and connect are measured within, rest is handshake
+        with timings.measure("tls"):
+            return super().connect()
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+TIMED_POOL_CLASSES = {"http": TimedHTTPConnectionPool, "https": TimedHTTPSConnectionPool}
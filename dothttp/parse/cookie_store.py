@@ -0,0 +1,231 @@
+import atexit
+import logging
+import os
+import tempfile
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from http.cookiejar import Cookie, LWPCookieJar
+from typing import Set, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+base_logger = logging.getLogger("dothttp")
+
+# seconds to wait for more cookie changes before writing cookie file
+DEFAULT_SAVE_DELAY = 1.0
+# seconds changes can stay unsaved, when cookies keep changing
+DEFAULT_MAX_SAVE_DELAY = 5.0
+
+
+@contextmanager
+def file_lock(path: str):
+    """exclusive lock across processes, `path` is a lock file next to actual file"""
+    with open(path, "a+") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        elif msvcrt:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            elif msvcrt:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _get_key(cookie: Cookie) -> Tuple[str, str, str]:
+    return cookie.domain, cookie.path, cookie.name
+
+
+class CookieStore(LWPCookieJar):
+    """
+    cookie jar kept in memory (cookies are indexed by domain, then path and name),
+    persisted to cookie file in the background.
+
+    1. changes are saved once no change happened for `save_delay` seconds
+        (but at most `max_save_delay` seconds after first unsaved change), and at exit
+    2. save holds a file lock and merges with cookie file, so that
+        cookies set by other dothttp processes are not lost
+    3. cookies changed in this process win over ones in file, cookies cleared in
+        this process are removed from file
+    """
+
+    def __init__(
+        self,
+        filename,
+        save_delay: float = DEFAULT_SAVE_DELAY,
+        max_save_delay: float = DEFAULT_MAX_SAVE_DELAY,
+    ):
+        super().__init__(filename)
+        self.save_delay = save_delay
+        self.max_save_delay = max(max_save_delay, save_delay)
+        self.saves = 0
+        self._changed: Set[Tuple[str, str, str]] = set()
+        self._removed: Set[Tuple[str, str, str]] = set()
+        self._tracking = True
+        self._timer = None
+        # monotonic time of first change not yet saved
+        self._pending_since = None
+        self._save_lock = threading.Lock()
+        _stores.add(self)
+
+    @property
+    def lock_path(self):
+        return self.filename + ".lock"
+
+    @property
+    def is_dirty(self) -> bool:
+        return bool(self._changed or self._removed)
+
+    def set_cookie(self, cookie):
+        with self._cookies_lock:
+            super().set_cookie(cookie)
+            if self._tracking:
+                key = _get_key(cookie)
+                self._changed.add(key)
+                self._removed.discard(key)
+
+    def clear(self, domain=None, path=None, name=None):
+        with self._cookies_lock:
+            if self._tracking:
+                keys = [
+                    _get_key(cookie)
+                    for cookie in self
+                    if (domain is None or cookie.domain == domain)
+                    and (path is None or cookie.path == path)
+                    and (name is None or cookie.name == name)
+                ]
+            super().clear(domain, path, name)
+            if self._tracking:
+                self._removed.update(keys)
+                self._changed.difference_update(keys)
+
+    def load(self, filename=None, ignore_discard=False, ignore_expires=False):
+        """loads cookie file (creates if it doesn't exist), errors are raised"""
+        filename = filename or self.filename
+        with file_lock(self.lock_path):
+            if not os.path.exists(filename):
+                self._write(filename)
+                return
+            with self._cookies_lock:
+                self._tracking = False
+                try:
+                    super().load(filename, ignore_discard, ignore_expires)
+                finally:
+                    self._tracking = True
+
+    def schedule_save(self):
+        """
+        saves changes once no change happened for `save_delay` seconds, every call
+        restarts the timer. changes are not held back more than `max_save_delay` seconds
+        """
+        if not self.is_dirty:
+            return
+        if self.save_delay <= 0:
+            return self.flush()
+        with self._save_lock:
+            now = time.monotonic()
+            if self._pending_since is None:
+                self._pending_since = now
+            delay = min(self.save_delay, self._pending_since + self.max_save_delay - now)
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(max(delay, 0), self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """saves pending changes now"""
+        with self._save_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._pending_since = None
+        if not self.is_dirty:
+            return
+        try:
+            self.sync()
+        except Exception:
+            base_logger.debug("error while saving cookies", exc_info=True)
+
+    def sync(self):
+        """
+        merges with cookie file (under file lock) and writes merged cookies.
+        cookie file is source of truth for every cookie this process didn't change or clear,
+        so values saved by other processes since this one loaded them are kept
+        """
+        with file_lock(self.lock_path):
+            on_disk = LWPCookieJar(self.filename)
+            if os.path.exists(self.filename):
+                try:
+                    on_disk.load()
+                except Exception:
+                    base_logger.debug("cookie file is corrupt, overwriting", exc_info=True)
+            with self._cookies_lock:
+                changed, removed = self._changed, self._removed
+                self._changed, self._removed = set(), set()
+                disk_keys = set()
+                self._tracking = False
+                try:
+                    for cookie in on_disk:
+                        key = _get_key(cookie)
+                        disk_keys.add(key)
+                        if key not in changed and key not in removed:
+                            # set (or updated) by another process
+                            super().set_cookie(cookie)
+                    for cookie in list(self):
+                        key = _get_key(cookie)
+                        if key not in changed and key not in disk_keys and not cookie.discard:
+                            # removed by another process. session cookies are never written
+                            super().clear(*key)
+                finally:
+                    self._tracking = True
+            try:
+                self._write(self.filename)
+            except BaseException:
+                with self._cookies_lock:
+                    # saved with next flush
+                    self._changed.update(changed - self._removed)
+                    self._removed.update(removed - self._changed)
+                raise
+            self.saves += 1
+
+    def _write(self, filename):
+        directory = os.path.dirname(os.path.abspath(filename))
+        fd, temp = tempfile.mkstemp(dir=directory, prefix=".dothttp-cookies")
+        os.close(fd)
+        try:
+            with self._cookies_lock:
+                super().save(temp)
+            os.replace(temp, filename)
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+            raise
+
+    def save(self, filename=None, ignore_discard=False, ignore_expires=False):
+        """schedules save, use `flush` to save right away"""
+        if filename and filename != self.filename:
+            return super().save(filename, ignore_discard, ignore_expires)
+        self.schedule_save()
+
+
+_stores: "weakref.WeakSet[CookieStore]" = weakref.WeakSet()
+
+
+@atexit.register
+def flush_cookie_stores():
+    for store in list(_stores):
+        store.flush()
@@ -1,6 +1,9 @@
 import logging
-from typing import Dict, List, Optional, Union
+import re
+import string
+from typing import Dict, List, Optional, Set, Union
 
+from ..utils.property_template import compile_template
 from ..utils.property_util import PropertyProvider, StringFormatPropertyResolver, get_no_replace_property_provider
 from ..utils.common import triple_or_double_tostring
 from .expression import Token, TokenType
@@ -97,4 +100,59 @@ def jsonmodel_to_json(model, property_util: Optional[PropertyProvider]=None) ->
         # This is a hack to ignore replacement of variables where it is not needed
         property_util = get_no_replace_property_provider()
     parser = JsonParser(property_util)
-    return parser.jsonmodel_to_json(model)
\ No newline at end of file
+    return parser.jsonmodel_to_json(model)
+
+_format_field_regex = re.compile(r"[^.\[]*")
+
+
+def get_format_dependencies(format_string: str) -> Set[str]:
+    """names `StringFormatPropertyResolver` is asked for, while formatting `$"{a} {b.c}"`"""
+    names = set()
+    try:
+        for _literal, field_name, _spec, _conversion in string.Formatter().parse(format_string):
+            if field_name:
+                name = _format_field_regex.match(field_name).group(0)
+                if name and not name.isdecimal():
+                    names.add(name)
+    except ValueError:
+        # malformed format string, fails same way while evaluating
+        pass
+    return names
+
+
+def get_json_dependencies(model) -> Set[str]:
+    """property names referred by json model (same lookups as `JsonParser`), without resolving them"""
+    names = set()
+
+    def add_strings(strings):
+        for item in strings:
+            names.update(compile_template(item.triple[3:-3] if item.triple else item.str).keys)
+
+    def walk(value):
+        if json_object := value.object:
+            for member in json_object.members:
+                if member.key:
+                    add_strings(member.key)
+                elif member.var:
+                    names.update(compile_template(member.var).keys)
+                walk(member.value)
+        elif array := value.array:
+            for item in array.values:
+                walk(item)
+        elif value.id:
+            names.add(value.id)
+        elif value.strs:
+            add_strings(value.strs)
+        elif value.var:
+            names.update(compile_template(value.var).keys)
+        elif value.inter:
+            names.update(get_format_dependencies(value.inter[2:-1]))
+        elif value.expr:
+            names.update(
+                token.value
+                for token in Token.parse_expr(value.expr)
+                if token.token_type == TokenType.VAR
+            )
+
+    walk(model)
+    return names
@@ -0,0 +1,139 @@
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from textx import TextXSyntaxError
+
+from ..exceptions import (
+    HttpFileException,
+    HttpFileImportCycleException,
+    HttpFileSyntaxException,
+)
+from ..models.parse_models import MultidefHttp
+from .model_cache import ModelCache
+
+base_logger = logging.getLogger("dothttp")
+
+
+@dataclass
+class ImportedFile:
+    path: str
+    content: str
+    model: MultidefHttp
+    # real paths of files imported by this file
+    imports: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ImportGraph:
+    """
+    files reachable from root via `import` statements.
+    each file appears once, in the order it was first reached (depth first, pre-order)
+    """
+
+    root: Optional[str]
+    files: Dict[str, ImportedFile] = field(default_factory=dict)
+    # real paths of files imported directly by root
+    imports: List[str] = field(default_factory=list)
+
+    def __iter__(self) -> Iterator[Tuple[MultidefHttp, str]]:
+        for imported in self.files.values():
+            yield imported.model, imported.content
+
+    def __len__(self):
+        return len(self.files)
+
+
+class ImportResolver:
+    """
+    resolves imports of a http file into `ImportGraph`
+    1. file content is cached by real path and (mtime, size); unchanged files are not re-read
+    2. parsing goes through `ModelCache`, so unchanged files are not re-parsed
+    3. file reachable via two import paths (diamond) is loaded once
+    4. import cycle raises `HttpFileImportCycleException` with the offending chain
+    """
+
+    def __init__(self, model_cache: ModelCache):
+        self.model_cache = model_cache
+        self._contents: Dict[str, Tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, model: MultidefHttp, filename: Optional[str]) -> ImportGraph:
+        graph = ImportGraph(root=os.path.realpath(filename) if filename else None)
+        # root is on stack, so that import back to it is reported as cycle right away
+        stack = [graph.root] if graph.root else []
+        graph.imports = self._resolve_imports(model, filename, graph, stack, root_model=True)
+        return graph
+
+    def _resolve_imports(
+        self,
+        model: MultidefHttp,
+        filename: str,
+        graph: ImportGraph,
+        stack: List[str],
+        root_model: bool = False,
+    ) -> List[str]:
+        imports = []
+        for import_file in self.get_import_paths(model, filename):
+            imports.append(import_file)
+            # given model can differ from file on disk (unsaved editor content),
+            # it may import its own file once
+            own_file = root_model and import_file == graph.root
+            if import_file in stack and not own_file:
+                raise HttpFileImportCycleException(cycle=" -> ".join(stack + [import_file]))
+            if import_file in graph.files:
+                # already loaded via another import path
+                continue
+            content = self.read(import_file)
+            try:
+                imported_model = self.model_cache.model_from_str(content)
+            except TextXSyntaxError as e:
+                raise HttpFileSyntaxException(file=import_file, message=e.args)
+            except Exception as e:
+                raise HttpFileException(message=e.args)
+            imported = ImportedFile(path=import_file, content=content, model=imported_model)
+            graph.files[import_file] = imported
+            imported.imports = self._resolve_imports(
+                imported_model, import_file, graph, stack if own_file else stack + [import_file]
+            )
+        return imports
+
+    @staticmethod
+    def get_import_paths(model: MultidefHttp, filename: str) -> List[str]:
+        if not model.import_list:
+            return []
+        paths = []
+        for filename_string in model.import_list.filename:
+            import_file = filename_string.value
+            if not os.path.isabs(import_file):
+                import_file = os.path.join(
+                    os.path.dirname(os.path.realpath(filename)), import_file
+                )
+            if not os.path.isfile(import_file):
+                if os.path.isfile(import_file + ".http"):
+                    import_file += ".http"
+                else:
+                    raise HttpFileException(
+                        message=f"import file should be a file, current: {import_file}"
+                    )
+            paths.append(os.path.realpath(import_file))
+        return paths
+
+    def read(self, path: str) -> str:
+        stat = os.stat(path)
+        with self._lock:
+            cached = self._contents.get(path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+        base_logger.debug(f"reading imported file {path}")
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+        with self._lock:
+            self._contents[path] = (stat.st_mtime_ns, stat.st_size, content)
+        return content
+
+    def clear(self):
+        with self._lock:
+            self._contents.clear()
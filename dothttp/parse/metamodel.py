@@ -0,0 +1,59 @@
+import logging
+import threading
+
+from textx import metamodel_from_file
+
+from ..utils.common import get_real_file_path
+
+base_logger = logging.getLogger("dothttp")
+
+
+class MetamodelRegistry:
+    """
+    builds textx metamodel for `http.tx` once per process, on first use.
+    building metamodel parses grammar itself, which is costly (~100ms),
+    commands like `dothttp --help` or formatter-less paths never pay for it.
+    """
+
+    def __init__(self, grammar_path: str):
+        self.grammar_path = grammar_path
+        self._metamodel = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_built(self) -> bool:
+        return self._metamodel is not None
+
+    def get(self):
+        if self._metamodel is None:
+            with self._lock:
+                if self._metamodel is None:
+                    base_logger.debug(f"building metamodel from {self.grammar_path}")
+                    self._metamodel = metamodel_from_file(self.grammar_path)
+        return self._metamodel
+
+
+class LazyMetamodel:
+    """
+    stands in for textx metamodel (`dothttp_model.model_from_str`,
+    `dothttp_model["HTTP"]`) and builds it only when accessed
+    """
+
+    def __init__(self, registry: MetamodelRegistry):
+        self._registry = registry
+
+    def __getattr__(self, item):
+        return getattr(self._registry.get(), item)
+
+    def __getitem__(self, item):
+        return self._registry.get()[item]
+
+    def __repr__(self):
+        state = "built" if self._registry.is_built else "not built"
+        return f"<LazyMetamodel {self._registry.grammar_path} ({state})>"
+
+
+metamodel_registry = MetamodelRegistry(
+    get_real_file_path(path="../http.tx", current_file=__file__)
+)
+dothttp_model = LazyMetamodel(metamodel_registry)
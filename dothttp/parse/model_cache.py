@@ -0,0 +1,304 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from textx.model_params import ModelParams
+
+from ..models.parse_models import MultidefHttp
+from ..utils.constants import MODEL_CACHE_DIR_ENV
+
+base_logger = logging.getLogger("dothttp")
+
+# next to other dothttp files in home (cookiejar, daemon socket)
+DEFAULT_MODEL_CACHE_DIR = "~/.dothttp.model-cache"
+# on-disk entries are removed, least recently used first, once they go over this size
+DEFAULT_MODEL_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# bump whenever snapshot layout changes, old on-disk entries will be ignored
+SNAPSHOT_VERSION = 2
+
+# key of textx class name in json form of snapshot
+_CLASS_KEY = "__tx_class__"
+
+# textx bookkeeping attributes which are either re-created or dropped while
+# restoring a model from snapshot. `parent` is rebuilt from the tree itself.
+_SKIPPED_ATTRS = {
+    "parent",
+    "_tx_filename",
+    "_tx_metamodel",
+    "_tx_model_params",
+    "_tx_parser",
+}
+
+
+def get_cache_dir() -> Optional[str]:
+    """
+    `DOTHTTP_MODEL_CACHE_DIR` when set (empty value disables disk cache), `DEFAULT_MODEL_CACHE_DIR` otherwise.
+    resolved on every cli run, daemon runs have their caller's environment
+    """
+    cache_dir = os.environ.get(MODEL_CACHE_DIR_ENV)
+    if cache_dir is None:
+        return os.path.expanduser(DEFAULT_MODEL_CACHE_DIR)
+    return cache_dir or None
+
+
+def _is_textx_object(obj) -> bool:
+    return hasattr(type(obj), "_tx_fqn")
+
+
+def dump_model(obj) -> Any:
+    """
+    converts textx model into plain python objects (tuples, dicts, lists and scalars)
+    which can be stored and restored with `load_model`.
+    textx model classes are generated on the fly, so they cannot be pickled directly.
+
+    every textx object is represented as `(class_name, {attribute: value})`
+    """
+    if isinstance(obj, list):
+        return [dump_model(item) for item in obj]
+    if _is_textx_object(obj):
+        return (
+            type(obj).__name__,
+            {
+                key: dump_model(value)
+                for key, value in vars(obj).items()
+                if key not in _SKIPPED_ATTRS
+            },
+        )
+    return obj
+
+
+def load_model(snapshot, metamodel, parent=None) -> Any:
+    """
+    rebuilds textx model from snapshot generated by `dump_model`.
+    `_tx_position`, `_tx_position_end` and `parent` are restored, so
+    position based lookups (names, hover, type) work same as parsed model
+    """
+    if isinstance(snapshot, list):
+        return [load_model(item, metamodel, parent) for item in snapshot]
+    if isinstance(snapshot, tuple):
+        class_name, attrs = snapshot
+        cls = metamodel[class_name]
+        obj = cls.__new__(cls)
+        if parent is not None:
+            obj.parent = parent
+        for key, value in attrs.items():
+            setattr(obj, key, load_model(value, metamodel, obj))
+        return obj
+    return snapshot
+
+
+def snapshot_to_json(snapshot) -> Any:
+    """json form of snapshot, `(class_name, attrs)` tuples become objects"""
+    if isinstance(snapshot, list):
+        return [snapshot_to_json(item) for item in snapshot]
+    if isinstance(snapshot, tuple):
+        class_name, attrs = snapshot
+        return {_CLASS_KEY: class_name, "attrs": {key: snapshot_to_json(value) for key, value in attrs.items()}}
+    return snapshot
+
+
+def snapshot_from_json(data) -> Any:
+    if isinstance(data, list):
+        return [snapshot_from_json(item) for item in data]
+    if isinstance(data, dict):
+        return data[_CLASS_KEY], {key: snapshot_from_json(value) for key, value in data["attrs"].items()}
+    return data
+
+
+class ModelCache:
+    """
+    content addressed cache for parsed http files.
+    parsing with textx dominates load time for large http files; parsed models are
+    stored as snapshots keyed by sha256 of content (and grammar).
+
+    1. in-memory lru is used by long-running processes (server, pytest plugin)
+    2. on-disk store is used when `cache_dir` is given, so cold cli runs can skip parsing.
+        only cli enables it for shared instance (`get_cache_dir()`), server and editor
+        parse many short lived texts which are not worth keeping.
+        entries are json (loading them never executes code), total size is kept under
+        `max_disk_bytes` by removing least recently used entries
+
+    every call returns a fresh model, callers are free to mutate it
+    (ContentBase extends `allhttps`, imports are appended to `allhttps`)
+    """
+
+    def __init__(
+        self,
+        metamodel,
+        maxsize: int = 128,
+        cache_dir: Optional[str] = None,
+        grammar_path: Optional[str] = None,
+        max_disk_bytes: int = DEFAULT_MODEL_CACHE_MAX_BYTES,
+    ):
+        self.metamodel = metamodel
+        self.grammar_path = grammar_path
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        # size of on-disk entries, counted on first write
+        self._disk_bytes: Optional[int] = None
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._grammar_hash = None
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+    def get_key(self, content: str) -> str:
+        if self._grammar_hash is None:
+            # grammar change should invalidate on-disk entries
+            grammar_file = self.grammar_path or getattr(self.metamodel, "file_name", None)
+            digest = hashlib.sha256(str(SNAPSHOT_VERSION).encode())
+            if grammar_file and os.path.exists(grammar_file):
+                with open(grammar_file, "rb") as f:
+                    digest.update(f.read())
+            self._grammar_hash = digest.hexdigest()
+        return hashlib.sha256(
+            (self._grammar_hash + content).encode("utf-8", "surrogatepass")
+        ).hexdigest()
+
+    def model_from_str(self, content: str) -> MultidefHttp:
+        key = self.get_key(content)
+        with self._lock:
+            snapshot = self._entries.get(key)
+            if snapshot is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if snapshot is None:
+            snapshot = self._load_from_disk(key)
+            if snapshot is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self._remember(key, snapshot)
+        if snapshot is not None:
+            base_logger.debug(f"parsed model for {key} served from cache")
+            return self.restore(snapshot)
+        # syntax errors are not cached, they are raised as is
+        model = self.metamodel.model_from_str(content)
+        snapshot = dump_model(model)
+        with self._lock:
+            self.misses += 1
+        self._remember(key, snapshot)
+        self._save_to_disk(key, snapshot)
+        return model
+
+    def restore(self, snapshot) -> MultidefHttp:
+        model = load_model(snapshot, self.metamodel)
+        if not _is_textx_object(model):
+            # textx returns empty string for empty model
+            return model
+        model._tx_filename = None
+        model._tx_metamodel = self.metamodel
+        model._tx_model_params = ModelParams()
+        # parser holds parse tree of complete file, it is not retained
+        model._tx_parser = None
+        return model
+
+    def _remember(self, key, snapshot):
+        with self._lock:
+            self._entries[key] = snapshot
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def set_cache_dir(self, cache_dir: Optional[str]):
+        with self._lock:
+            if cache_dir != self.cache_dir:
+                self.cache_dir = cache_dir
+                self._disk_bytes = None
+
+    def _get_disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load_from_disk(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._get_disk_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                version, data = json.load(f)
+            if version == SNAPSHOT_VERSION:
+                snapshot = snapshot_from_json(data)
+                # recently used entries are removed last
+                os.utime(path)
+                return snapshot
+        except Exception:
+            base_logger.debug(f"ignoring corrupted model cache entry {path}", exc_info=True)
+        return None
+
+    def _save_to_disk(self, key, snapshot):
+        if not self.cache_dir:
+            return
+        path = self._get_disk_path(key)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump([SNAPSHOT_VERSION, snapshot_to_json(snapshot)], f, separators=(",", ":"))
+            # atomic, concurrent cli runs will not see partially written file
+            os.replace(temp_path, path)
+            size = os.path.getsize(path)
+        except Exception:
+            # cache is best effort, mostly permission issues
+            base_logger.debug(f"unable to write model cache entry {path}", exc_info=True)
+            return
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += size
+            over_budget = self._disk_bytes is None or self._disk_bytes > self.max_disk_bytes
+        if over_budget:
+            self.prune_disk()
+
+    def prune_disk(self):
+        """removes least recently used on-disk entries till they fit in `max_disk_bytes`"""
+        cache_dir = self.cache_dir
+        if not cache_dir:
+            return
+        entries = []
+        try:
+            with os.scandir(cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith((".json", ".pkl")) and entry.is_file():
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            base_logger.debug(f"unable to list model cache {cache_dir}", exc_info=True)
+            return
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_disk_bytes:
+            # remove down to 3/4 of budget, so that next few writes don't prune again
+            target = self.max_disk_bytes * 3 // 4
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    # removed by another cli run
+                    pass
+                total -= size
+        with self._lock:
+            if self.cache_dir == cache_dir:
+                self._disk_bytes = total
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.disk_hits = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
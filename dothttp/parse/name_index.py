@@ -0,0 +1,65 @@
+from typing import Dict, Iterable, List, Optional, Union
+
+from ..exceptions import ParameterException
+from ..models.parse_models import Http
+
+
+def find_duplicate_name(names: Iterable[Optional[str]]) -> Optional[str]:
+    """
+    names of http definitions in file order (None if unnamed).
+    every definition can be referred by its name and by its number,
+    returns first name which clashes with an earlier name or number
+    """
+    seen = set()
+    for index, name in enumerate(names):
+        number = str(index + 1)
+        name = name or number
+        if name in seen:
+            return name
+        seen.add(name)
+        seen.add(number)
+    return None
+
+
+class NameIndex:
+    """
+    name -> http definition lookup, built once per list of definitions.
+    replaces linear scans for targets, bases and name references
+    """
+
+    def __init__(self, https: List[Http]):
+        self.https = https
+        self.length = len(https)
+        # name or number (if unnamed) of each definition, in file order
+        self.names: List[str] = []
+        self.by_name: Dict[str, Http] = {}
+        for index, http in enumerate(https):
+            if http.namewrap:
+                name = http.namewrap.name
+                # if multiple definitions have same name, first one is picked
+                self.by_name.setdefault(name, http)
+            else:
+                name = str(index + 1)
+            self.names.append(name)
+
+    def is_stale(self, https: List[Http]) -> bool:
+        # definitions are appended (imports, contexts) or list is replaced
+        return self.https is not https or self.length != len(https)
+
+    def get(self, target: Union[str, int]) -> Http:
+        if not isinstance(target, str):
+            target = str(target)
+        if target.isdecimal():
+            if 1 <= int(target) <= self.length:
+                return self.https[int(target) - 1]
+            raise ParameterException(
+                message="target startswith 1", key="target", value=target
+            )
+        try:
+            return self.by_name[target]
+        except KeyError:
+            raise ParameterException(
+                message="target is not spelled correctly",
+                key="target",
+                value=target,
+            )
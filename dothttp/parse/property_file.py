@@ -0,0 +1,153 @@
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from ..exceptions import (
+    DotHttpException,
+    PropertyFileException,
+    PropertyFileNotFoundException,
+    PropertyFileNotJsonException,
+)
+from ..property_schema import property_schema
+from ..utils.constants import json
+from ..utils.lazy import LazyAttribute, LazyModule
+
+# loaded only for yaml/toml property files
+toml = LazyModule("toml")
+yaml = LazyModule("yaml")
+# dothttp-wasm, property file is not validated (falsy when jsonschema is missing)
+validator_for = LazyAttribute("jsonschema.validators", "validator_for")
+
+base_logger = logging.getLogger("dothttp")
+
+# looked up in directory of http file, when property file is not specified
+DEFAULT_PROPERTY_FILES = (
+    ".dothttp.json",
+    ".dothttp.yaml",
+    ".dothttp.yml",
+    ".dothttp.toml",
+)
+
+
+@lru_cache(maxsize=None)
+def get_property_validator():
+    """schema is compiled once, `jsonschema.validate` re-checks and re-compiles schema on every call"""
+    if not validator_for:
+        return None
+    cls = validator_for(property_schema)
+    cls.check_schema(property_schema)
+    return cls(property_schema)
+
+
+def parse_property_file(path: str) -> Dict[str, Any]:
+    with open(path, "r") as f:
+        try:
+            if path.endswith(".json"):
+                props = json.load(f)
+            elif path.endswith(".yaml") or path.endswith(".yml"):
+                props = yaml.load(f, yaml.SafeLoader)
+            elif path.endswith(".toml"):
+                props = toml.load(f)
+            else:
+                raise Exception("unrecognized property file")
+            base_logger.debug(f"file: {path} loaded successfully")
+        except Exception:
+            base_logger.error(f"exception loading property file ", exc_info=True)
+            raise PropertyFileNotJsonException(propertyfile=path)
+    validator = get_property_validator()
+    try:
+        if validator:
+            validator.validate(props)
+    except Exception:
+        base_logger.error(f"property json schema validation failed! ", exc_info=True)
+        raise PropertyFileException(
+            message="property file has invalid json schema",
+            file=path,
+        )
+    return props
+
+
+def _get_stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@dataclass
+class PropertySource:
+    path: str
+    # (mtime, size) of file when it was parsed
+    stamp: Tuple[int, int]
+    props: Optional[Dict[str, Any]] = None
+    # parse or validation error, raised every time source is used
+    error: Optional[DotHttpException] = None
+
+
+class PropertyFileCache:
+    """
+    parsed and validated property files keyed by path, reused as long as
+    file's mtime and size are unchanged.
+    default property file discovery is done once per directory and redone
+    only when directory is modified (file added, removed or renamed).
+
+    parsed properties are shared across loads, they must not be modified
+    """
+
+    def __init__(self):
+        self._sources: Dict[str, PropertySource] = {}
+        self._discovered: Dict[str, Tuple[Optional[Tuple[int, int]], Optional[str]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def discover(self, directory: str) -> Optional[str]:
+        """default property file in `directory`, if any"""
+        directory = os.path.abspath(directory)
+        stamp = _get_stamp(directory)
+        with self._lock:
+            cached = self._discovered.get(directory)
+        if cached and stamp is not None and cached[0] == stamp:
+            return cached[1]
+        found = None
+        for name in DEFAULT_PROPERTY_FILES:
+            path = os.path.join(directory, name)
+            if os.path.exists(path):
+                base_logger.debug(f"file: {path} exists. it will be used for property reference")
+                found = path
+                break
+        with self._lock:
+            self._discovered[directory] = (stamp, found)
+        return found
+
+    def load(self, path: str) -> Dict[str, Any]:
+        stamp = _get_stamp(path)
+        if stamp is None:
+            base_logger.debug(f"file: {path} not found")
+            raise PropertyFileNotFoundException(propertyfile=path)
+        key = os.path.abspath(path)
+        with self._lock:
+            source = self._sources.get(key)
+        if source and source.stamp == stamp:
+            self.hits += 1
+        else:
+            self.misses += 1
+            source = PropertySource(path, stamp)
+            try:
+                source.props = parse_property_file(path)
+            except DotHttpException as e:
+                source.error = e
+            with self._lock:
+                self._sources[key] = source
+        if source.error:
+            raise source.error.with_traceback(None)
+        return source.props
+
+    def clear(self):
+        with self._lock:
+            self._sources.clear()
+            self._discovered.clear()
@@ -1,22 +1,21 @@
 import functools
 import logging
 import os
-from http.cookiejar import LWPCookieJar
+import threading
+import time
 from pprint import pprint
 from typing import Optional, Union
 from urllib.parse import unquote, urlparse, urlunparse
 
 import jstyleson as json
 from requests import PreparedRequest, Response, Session
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from requests.cookies import cookiejar_from_dict
 
 # this is bad, loading private stuff. find a better way
 from requests.exceptions import SSLError
 from requests.auth import CONTENT_TYPE_FORM_URLENCODED, HTTPBasicAuth, HTTPDigestAuth
 from requests.status_codes import _codes as status_code
 from requests_pkcs12 import Pkcs12Adapter
-from textx import metamodel_from_file
 
 from ..utils.property_util import PropertyProvider, Property
 
@@ -31,20 +30,30 @@ from ..parse import (
     AWS4Auth,
     Config,
     HttpDefBase,
+    dothttp_model,
     eprint,
 )
 from ..script import ScriptResult
 from ..utils.common import apply_quote_or_unquote, quote_or_unquote, single_triple_or_double_tostring
 from ..utils.curl_utils import to_curl
 from ..utils.json_utils import JSONEncoder
+from ..utils.timing import format_timings
+from .adapter_pool import (
+    DEFAULT_POOL_CONFIG,
+    PoolConfig,
+    RetryConfig,
+    get_pool_stats,
+    get_session_stats,
+    mount_pooled_adapters,
+    retry_adapter_pool,
+)
+from .client_cert import client_cert_sessions
+from .cookie_store import CookieStore
 from .dsl_jsonparser import json_or_array_to_json
+from .session_pool import GLOBAL_SCOPE, get_scope_key, session_pool
 
 JSON_ENCODER = JSONEncoder(indent=4)
 
-try:
-    import magic
-except ImportError:
-    magic = None
 try:
     import requests_unixsocket
 
@@ -55,41 +64,32 @@ except ImportError:
     pass
 
 DOTHTTP_COOKIEJAR = os.path.expanduser("~/.dothttp.cookiejar")
+
+
+def get_cookiejar_path() -> str:
+    """resolved on every use, daemon runs have their caller's `HOME`"""
+    return os.path.expanduser("~/.dothttp.cookiejar")
 base_logger = logging.getLogger("dothttp")
 request_logger = logging.getLogger("request")
 curl_logger = logging.getLogger("curl")
 
-if os.path.exists(__file__):
-    dir_path = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "http.tx"
-    )
-else:
-    dir_path = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
-        "http.tx",
-    )
-dothttp_model = metamodel_from_file(dir_path)
-
 
 # noinspection PyPackageRequirements
 
 
-def get_new_session():
+def get_new_session(pool_config: Optional[PoolConfig] = None):
     session = Session()
-    if requests_unixsocket:
-        from requests_unixsocket.adapters import UnixAdapter
-
-        session.mount("http+unix://", UnixAdapter())
-    return session
+    return mount_pooled_adapters(session, pool_config or DEFAULT_POOL_CONFIG)
 
 
 class RequestBase(HttpDefBase):
     global_session = get_new_session()
     global_cookie_jar = None
+    _session_lock = threading.Lock()
 
     def __init__(self, args: Config):
         super().__init__(args)
-        self._cookie: Union[LWPCookieJar, None] = None
+        self._cookie: Union[CookieStore, None] = None
 
     def get_cookie(self):
         """
@@ -101,15 +101,15 @@ class RequestBase(HttpDefBase):
             cookie = None
             request_logger.debug(f"cookies set to `{self.args.no_cookie}`")
         else:
-            if RequestBase.global_cookie_jar:
+            # empty jar is falsy
+            if RequestBase.global_cookie_jar is not None:
                 return RequestBase.global_cookie_jar
-            cookie = LWPCookieJar(DOTHTTP_COOKIEJAR)
-            request_logger.debug(f"cookie {cookie} loaded from {DOTHTTP_COOKIEJAR}")
+            # kept in memory, saved in background (merged with other processes' cookies)
+            cookiejar_path = get_cookiejar_path()
+            cookie = CookieStore(cookiejar_path)
+            request_logger.debug(f"cookie {cookie} loaded from {cookiejar_path}")
             try:
-                if not os.path.exists(DOTHTTP_COOKIEJAR):
-                    cookie.save()
-                else:
-                    cookie.load()
+                cookie.load()
             except Exception as e:
                 # mostly permission exception
                 # traceback.print_exc()
@@ -121,28 +121,100 @@ class RequestBase(HttpDefBase):
                 # logic error)
                 self.args.no_cookie = True
         RequestBase.global_cookie_jar = self._cookie = cookie
+        if cookie is not None:
+            # global scope cookies
+            RequestBase.global_session.cookies = cookie
         return self._cookie
 
+    @staticmethod
+    def reset_global_state():
+        """
+        drops state a fresh process wouldn't have: cookies of global session (pending
+        changes are saved, saved ones are loaded again from cookie file), session scopes
+        and connection pool configuration. warm connections are kept.
+        used by daemon after every run
+        """
+        with RequestBase._session_lock:
+            cookie_jar, RequestBase.global_cookie_jar = RequestBase.global_cookie_jar, None
+            session = RequestBase.global_session
+            session.cookies = cookiejar_from_dict({})
+            if session.pool_config != DEFAULT_POOL_CONFIG:
+                mount_pooled_adapters(session, DEFAULT_POOL_CONFIG)
+        if cookie_jar is not None:
+            cookie_jar.flush()
+        session_pool.clear()
+
     def get_session(self):
+        """
+        session for request's isolation scope (`session_pool`). connections are
+        shared with global session (or client certificate session)
+        """
+        request = self.get_request()
         if self.httpdef.session_clear:
             # caller should close session
             # TODO
-            return get_new_session()
+            session = get_new_session(self.get_pool_config())
+            if self.httpdef.p12:
+                session.mount(
+                    "https://",
+                    Pkcs12Adapter(
+                        pkcs12_filename=self.httpdef.p12[0],
+                        pkcs12_password=self.httpdef.p12[1],
+                    ),
+                )
+            session.cookies = request._cookies
+            return session
+        return session_pool.get_session(
+            self.get_session_scope_key(), self.get_connection_session(), request._cookies
+        )
+
+    def get_connection_session(self) -> Session:
+        """session whose adapters (connection pools) are used to send request"""
+        pool_config = self.get_pool_config()
+        verify = not self.httpdef.allow_insecure
+        if self.httpdef.p12:
+            return client_cert_sessions.get_p12_session(
+                self.httpdef.p12[0], self.httpdef.p12[1], verify, pool_config
+            )
+        if self.httpdef.certificate:
+            session = client_cert_sessions.get_pem_session(
+                self.httpdef.certificate[0], self.httpdef.certificate[1], verify, pool_config
+            )
+            if session:
+                return session
         session = self.global_session
-        # if not self.args.no_cookie:
-        #     session.cookies = self.get_cookie()
-        # session.hooks['response'] = self.save_cookie_call_back
+        if pool_config and session.pool_config != pool_config:
+            # pools are resized only when configured, requests without
+            # pool settings keep using whatever is configured
+            with RequestBase._session_lock:
+                if session.pool_config != pool_config:
+                    mount_pooled_adapters(session, pool_config)
         return session
 
+    def get_session_scope_key(self):
+        return get_scope_key(
+            self.args.session_scope, self.args.session_name, self.env, self.property_file
+        )
+
+    def get_scope_cookies(self):
+        """cookie jar of session scope, only global scope's cookies are persisted"""
+        key = self.get_session_scope_key()
+        if key[0] == GLOBAL_SCOPE:
+            return self.get_cookie()
+        return session_pool.get_cookie_jar(key)
+
+    def get_pool_config(self) -> Optional[PoolConfig]:
+        return PoolConfig.from_settings(self.pool_settings, self.args, self.property_file)
+
     @functools.lru_cache
     def get_request(self):
         # httpdef has to be loaded
         # according to httpdef, prepared_request is built
         self.load_def()
-        prep = self.httpdef.get_prepared_request()
+        prep = self.httpdef.get_prepared_request(self.timings)
         # cookie is separately prepared
         if not self.httpdef.session_clear:
-            prep.prepare_cookies(self.get_cookie())
+            prep.prepare_cookies(self.get_scope_cookies())
         else:
             prep.prepare_cookies({})
         return prep
@@ -257,6 +329,8 @@ class CurlCompiler(RequestBase):
 # this is just to record history or finalized version of http file (not to
 # be used for any other purpose)
 class HttpFileFormatter(RequestBase):
+    target_only_parsing = False
+
     def get_updated_content(self, content):
         return content
 
@@ -531,6 +605,9 @@ class RequestCompiler(RequestBase):
         request_logger.debug(f"request executed completely")
         script_result = self.script_execution.execute_test_script(resp=resp)
         self.print_script_result(script_result)
+        if self.args.timings:
+            print("\n##TIMINGS:")
+            print(format_timings(self.timings))
         return resp
 
     def print_script_result(self, script_result: ScriptResult):
@@ -581,44 +658,32 @@ class RequestCompiler(RequestBase):
             )
             eprint("output file close failed")
 
-    def _create_retry_adapter(self):
+    def _create_retry_adapter(self, pool_config: Optional[PoolConfig] = None):
         """
-        Create a retry adapter based on httpdef retry settings.
+        Get retry adapter based on httpdef retry settings.
 
         Returns HTTPAdapter with retry configuration, or None if no retry is configured.
         This adapter can be used directly with adapter.send() without mounting on session.
 
-        Passes parameters directly to urllib3.Retry without additional processing.
+        Adapters are shared per retry and pool configuration (see `AdapterPool`), so
+        retried endpoints reuse keep-alive connections across requests.
+        Requests with client certificate get adapter built with same certificate.
         """
         # Check if any retry configuration exists
         if self.httpdef.retry_total is None:
             return None  # No retry configuration
 
-        # Build kwargs for Retry, passing only configured parameters
-        retry_kwargs = {}
-
-        if self.httpdef.retry_total is not None:
-            retry_kwargs['total'] = self.httpdef.retry_total
-
-        if self.httpdef.retry_status_forcelist is not None:
-            retry_kwargs['status_forcelist'] = self.httpdef.retry_status_forcelist
-
-        if self.httpdef.retry_backoff_factor is not None:
-            retry_kwargs['backoff_factor'] = self.httpdef.retry_backoff_factor
-
-        # Always set raise_on_status=False for API testing tools
-        # Users want to see the response regardless of status code
-        retry_kwargs['raise_on_status'] = False
-
-        # Create retry strategy with configured parameters
-        retry_strategy = Retry(**retry_kwargs)
-
-        # Create adapter with retry strategy
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-
-        request_logger.debug(f"Retry adapter created with: {retry_kwargs}")
-
-        return adapter
+        status_forcelist = self.httpdef.retry_status_forcelist
+        config = RetryConfig(
+            total=self.httpdef.retry_total,
+            status_forcelist=tuple(status_forcelist) if status_forcelist is not None else None,
+            backoff_factor=self.httpdef.retry_backoff_factor,
+        )
+        if self.httpdef.certificate or self.httpdef.p12:
+            adapter = client_cert_sessions.get_retry_adapter(self.get_connection_session(), config)
+            if adapter is not None:
+                return adapter
+        return retry_adapter_pool.get_adapter(config, pool_config)
 
     def get_response(self):
         """
@@ -627,23 +692,36 @@ class RequestCompiler(RequestBase):
         Uses adapter.send() directly if retry is configured, avoiding session
         state modification and ensuring thread-safety in concurrent environments.
         """
-        session = self.get_session()
+        # request first, session depends on httpdef (certificates, @clear)
         request = self.get_request()
-        session.cookies = request._cookies
+        try:
+            session = self.get_session()
+            return self.send_request(request, session)
+        finally:
+            # payload is sent, file handles are not left for garbage collector
+            if self.httpdef.payload:
+                self.httpdef.payload.close()
+
+    def send_request(self, request: PreparedRequest, session: Session) -> Response:
+        """
+        sends prepared request of loaded httpdef through `session` (or retry adapter),
+        network phases are recorded to `timings`
+        """
+        self.timings.response_started = None
+        with self.timings.activate():
+            resp = self._send_request(request, session)
+        if self.timings.response_started is not None:
+            # body is read by session (or below for retry adapter)
+            self.timings.add("download", time.perf_counter() - self.timings.response_started)
+        return resp
 
+    def _send_request(self, request: PreparedRequest, session: Session) -> Response:
         # Create retry adapter if configured (doesn't modify session)
-        retry_adapter = self._create_retry_adapter()
+        retry_adapter = self._create_retry_adapter(self.get_pool_config())
 
-        if self.httpdef.p12:
-            session.mount(
-                request.url,
-                Pkcs12Adapter(
-                    pkcs12_filename=self.httpdef.p12[0],
-                    pkcs12_password=self.httpdef.p12[1],
-                ),
-            )
         try:
-            if self.httpdef.certificate:
+            if self.httpdef.certificate and getattr(session, "client_cert", None) is None:
+                # certificate is part of adapter for client certificate sessions
                 cert = tuple(self.httpdef.certificate)
             else:
                 cert = None
@@ -674,9 +752,17 @@ class RequestCompiler(RequestBase):
                 # Call adapter.send() directly - no need to mount on session!
                 # This keeps session state clean and is thread-safe
                 resp: Response = retry_adapter.send(request, **send_kwargs)
+                # same as session.send, body is read so that connection goes back to pool
+                resp.content
+                if request_logger.isEnabledFor(logging.DEBUG):
+                    request_logger.debug(
+                        f"retry adapter pool: {get_pool_stats(retry_adapter).to_dict()}"
+                    )
             else:
                 # Normal request without retry
                 resp: Response = session.send(request, **send_kwargs)
+                if request_logger.isEnabledFor(logging.DEBUG):
+                    request_logger.debug(f"session connection pools: {get_session_stats(session)}")
         except UnicodeEncodeError:
             # for Chinese, smiley all other default encode converts into latin-1
             # as latin-1 didn't consist of those characters it will fail
@@ -686,7 +772,7 @@ class RequestCompiler(RequestBase):
             request.prepare_body(request.body.encode("utf-8"), files=None)
 
             send_kwargs = {
-                'cert': self.httpdef.certificate,
+                'cert': cert,
                 'verify': not self.httpdef.allow_insecure,
             }
             if self.httpdef.timeout:
@@ -712,11 +798,9 @@ class RequestCompiler(RequestBase):
                     "self signed certificate error, to ignore use --allow-insecure flag"
                 )
                 raise DothttpUnSignedCertException()
-        if not self.args.no_cookie and isinstance(session.cookies, LWPCookieJar):
-            try:
-                session.cookies.save()  # lwpCookie has .save method
-            except BaseException:
-                pass
+        if not self.args.no_cookie and isinstance(session.cookies, CookieStore):
+            # written once requests settle down, not after every request
+            session.cookies.schedule_save()
         if self.httpdef.session_clear:
             session.close()
         return resp
@@ -0,0 +1,104 @@
+import logging
+import threading
+from collections import OrderedDict
+from http.cookiejar import CookieJar
+from typing import Dict, Hashable, Optional, Sequence, Tuple
+
+from requests import Session
+from requests.cookies import RequestsCookieJar
+
+request_logger = logging.getLogger("request")
+
+# one session (cookie jar) for the whole process, cookies are persisted
+GLOBAL_SCOPE = "global"
+# one session per thread (server handler threads)
+THREAD_SCOPE = "thread"
+# one session per property file and selected environments
+ENV_SCOPE = "env"
+# one session per name
+NAMED_SCOPE = "named"
+SESSION_SCOPES = (GLOBAL_SCOPE, THREAD_SCOPE, ENV_SCOPE, NAMED_SCOPE)
+
+
+def get_scope_key(
+    scope: Optional[str] = GLOBAL_SCOPE,
+    name: Optional[str] = None,
+    env: Sequence[str] = (),
+    property_file: Optional[str] = None,
+) -> Tuple[Hashable, ...]:
+    """key which identifies isolation scope of a request, name implies named scope"""
+    if name and scope in (None, GLOBAL_SCOPE, NAMED_SCOPE):
+        return (NAMED_SCOPE, name)
+    if scope == THREAD_SCOPE:
+        return (THREAD_SCOPE, threading.get_ident())
+    if scope == ENV_SCOPE:
+        return (ENV_SCOPE, property_file, tuple(env or ()))
+    if scope not in (None, GLOBAL_SCOPE):
+        request_logger.warning(f"unknown session scope `{scope}`, using `{GLOBAL_SCOPE}`")
+    return (GLOBAL_SCOPE,)
+
+
+class SessionPool:
+    """
+    sessions per isolation scope (`get_scope_key`).
+
+    every scope has its own cookie jar, and session's cookie jar is fixed
+    when session is created. earlier, cookie jar of single shared session was
+    re-assigned for every request, concurrent requests (server runs handlers in
+    a thread pool) ended up sending and storing cookies in each other's jar.
+
+    connection pools are not per scope, sessions borrow adapters (and so keep-alive
+    connections) of a connection session (global session or client certificate session).
+    urllib3 pools are thread safe, cookie jars lock on their own.
+    """
+
+    def __init__(self, max_sessions=256):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[tuple, Tuple[Session, Session]]" = OrderedDict()
+        self._jars: "OrderedDict[tuple, CookieJar]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_cookie_jar(self, key: tuple) -> CookieJar:
+        """in memory cookie jar of scope"""
+        with self._lock:
+            jar = self._jars.get(key)
+            if jar is None:
+                jar = self._jars[key] = RequestsCookieJar()
+            self._jars.move_to_end(key)
+            while len(self._jars) > self.max_sessions:
+                self._jars.popitem(last=False)
+            return jar
+
+    def get_session(self, key: tuple, connections: Session, cookies: CookieJar) -> Session:
+        """
+        session of scope `key`, sending through adapters of `connections`
+        and storing cookies in `cookies`
+        """
+        cache_key = (key, id(connections))
+        with self._lock:
+            entry = self._sessions.get(cache_key)
+            if entry and entry[0] is connections and entry[1].cookies is cookies:
+                self._sessions.move_to_end(cache_key)
+                return entry[1]
+            session = Session()
+            # same (mutable) mapping, remounts on connection session are visible here as well
+            session.adapters = connections.adapters
+            session.cookies = cookies
+            self._sessions[cache_key] = (connections, session)
+            while len(self._sessions) > self.max_sessions:
+                # adapters belong to connection session, nothing to close
+                self._sessions.popitem(last=False)
+        return session
+
+    def get_scopes(self) -> Dict[tuple, int]:
+        """scopes with number of cookies in them"""
+        with self._lock:
+            return {key: len(jar) for key, jar in self._jars.items()}
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+            self._jars.clear()
+
+
+session_pool = SessionPool()
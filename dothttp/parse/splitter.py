@@ -0,0 +1,193 @@
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from ..models.parse_models import MultidefHttp
+from .model_cache import ModelCache
+
+base_logger = logging.getLogger("dothttp")
+
+# tokens which can hide `@name` from the splitter. order matters, triple
+# quoted strings have to be tried before regular strings
+_SKIP_OR_NAME_REGEX = re.compile(
+    r"""
+      (?P<script>>\ \{%[\s\S]*?%\})
+    | (?P<triple>\"\"\"[\s\S]*?\"\"\"|'''[\s\S]*?''')
+    | (?P<string>"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')
+    | (?P<comment>\#[^\n]*|//[^\n]*|/\*[\s\S]*?\*/)
+    | (?P<name>^[ \t]*@name\b)
+    """,
+    re.MULTILINE | re.VERBOSE,
+)
+
+_DOT_STRING = r"""(?:"(?P<{0}_dq>[^"\\]*)"|'(?P<{0}_sq>[^'\\]*)'|(?P<{0}_id>\w+))"""
+_NAMEWRAP_REGEX = re.compile(
+    r"[ \t]*@name\s*\(\s*"
+    + _DOT_STRING.format("name")
+    + r"\s*\)(?:\s*:\s*"
+    + _DOT_STRING.format("base")
+    + r")?"
+)
+
+
+def _get_dot_string(match, group) -> Optional[str]:
+    for suffix in ("dq", "sq", "id"):
+        value = match.group(f"{group}_{suffix}")
+        if value is not None:
+            return value
+    return None
+
+
+@dataclass
+class HttpBlock:
+    start: int
+    end: int
+    name: str
+    base: Optional[str] = None
+
+
+@dataclass
+class HttpBlocks:
+    """
+    http file split into preamble (imports, variables) and one block per http definition
+    """
+
+    preamble_end: int
+    blocks: List[HttpBlock] = field(default_factory=list)
+
+    def get_block_index(self) -> Dict[str, HttpBlock]:
+        index = {}
+        for block in self.blocks:
+            # first definition wins, same as `BaseModelProcessor.get_target`
+            index.setdefault(block.name, block)
+        return index
+
+    def get_target_chain(self, target: str) -> Optional[List[HttpBlock]]:
+        """
+        returns target block followed by its bases (as long as they are defined in
+        same file). None if target is not defined in file
+        """
+        index = self.get_block_index()
+        block = index.get(target)
+        if not block:
+            return None
+        chain = [block]
+        while block.base and block.base in index:
+            block = index[block.base]
+            if block in chain:
+                # circular reference, let complete parse report it
+                return None
+            chain.append(block)
+        return chain
+
+
+def split_http_blocks(content: str) -> Optional[HttpBlocks]:
+    """
+    cheap pre-pass over http file, without textx.
+    splits at every `@name` which starts a line and is not part of string,
+    comment or script.
+
+    returns None when file can't be split safely (no `@name`, name which is
+    not a plain string/identifier, ..). callers should fall back to complete parse.
+    """
+    starts = [
+        match.start()
+        for match in _SKIP_OR_NAME_REGEX.finditer(content)
+        if match.lastgroup == "name"
+    ]
+    if not starts:
+        return None
+    blocks = HttpBlocks(preamble_end=starts[0])
+    for index, start in enumerate(starts):
+        end = starts[index + 1] if index + 1 < len(starts) else len(content)
+        match = _NAMEWRAP_REGEX.match(content, start, end)
+        if not match:
+            return None
+        blocks.blocks.append(
+            HttpBlock(
+                start=start,
+                end=end,
+                name=_get_dot_string(match, "name"),
+                base=_get_dot_string(match, "base"),
+            )
+        )
+    return blocks
+
+
+def shift_positions(obj, offset: int):
+    """moves `_tx_position` and `_tx_position_end` of textx model (recursively) by offset"""
+    if isinstance(obj, list):
+        for item in obj:
+            shift_positions(item, offset)
+        return
+    if not hasattr(type(obj), "_tx_fqn"):
+        return
+    obj._tx_position += offset
+    obj._tx_position_end += offset
+    for key, value in vars(obj).items():
+        if key != "parent" and not key.startswith("_tx"):
+            shift_positions(value, offset)
+
+
+class TargetModelLoader:
+    """
+    parses only what is needed to run one target: preamble (imports, variables),
+    target and its base chain. every block goes through `ModelCache` on its own,
+    so editing one request doesn't invalidate others.
+
+    other blocks are not parsed, their syntax errors are reported when they are run.
+    any failure while parsing target chain raises, callers fall back to complete parse
+    which reports it same as before.
+
+    positions are shifted back to offsets in complete file, so resulting
+    http definitions are same as complete parse
+    """
+
+    def __init__(self, model_cache: ModelCache):
+        self.model_cache = model_cache
+
+    def load(self, content: str, target: str) -> Optional[MultidefHttp]:
+        blocks = split_http_blocks(content)
+        if not blocks:
+            return None
+        chain = blocks.get_target_chain(target)
+        if not chain:
+            return None
+        root = self._load_preamble(content[: blocks.preamble_end])
+        if root is None:
+            return None
+        # keep file order, `get_target` picks first definition of a name
+        for block in sorted(chain, key=lambda block: block.start):
+            block_model = self.model_cache.model_from_str(content[block.start : block.end])
+            if (
+                not hasattr(block_model, "allhttps")
+                or len(block_model.allhttps) != 1
+                or block_model.import_list
+                or block_model.variables
+            ):
+                # one `@name` block yielded more than one definition
+                # (unnamed definitions in between), can't be handled here
+                return None
+            http = block_model.allhttps[0]
+            shift_positions(http, block.start)
+            http.parent = root
+            root.allhttps.append(http)
+        root.http_blocks = blocks
+        return root
+
+    def _load_preamble(self, preamble: str):
+        root = self.model_cache.model_from_str(preamble) if preamble.strip() else ""
+        if hasattr(root, "allhttps"):
+            if root.allhttps:
+                # unnamed definitions before first `@name`
+                return None
+            return root
+        # textx returns empty string for empty model (only whitespace or comments)
+        cls = self.model_cache.metamodel["MULTISET"]
+        root = cls.__new__(cls)
+        root.import_list = None
+        root.variables = []
+        root.allhttps = []
+        root._tx_position = root._tx_position_end = 0
+        return root
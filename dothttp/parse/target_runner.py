@@ -0,0 +1,266 @@
+import dataclasses
+import logging
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set
+
+from ..exceptions import DotHttpException
+from ..models.computed import Config
+from ..models.parse_models import Http, MultidefHttp
+from . import BaseModelProcessor
+from .request_base import RequestCompiler
+
+request_logger = logging.getLogger("request")
+
+# `client.properties.set("token", ...)`, names set by test script
+_property_set_regex = re.compile(r"properties\s*\.\s*set\s*\(\s*(?P<quote>['\"])(?P<name>[^'\"]+)(?P=quote)")
+_any_property_set_regex = re.compile(r"properties\s*\.\s*set\s*\(")
+# `client.properties.get("token")` or `client.properties["token"]`, names read by test script
+_property_get_regex = re.compile(
+    r"properties\s*(?:\.\s*get\s*\(|\[)\s*(?P<quote>['\"])(?P<name>[^'\"]+)(?P=quote)"
+)
+
+
+@dataclass
+class TargetNode:
+    target: str
+    # index in run order
+    index: int
+    # property names referred by target (and its base), variables expanded
+    references: Set[str] = field(default_factory=set)
+    # property names set by its test script
+    produces: Set[str] = field(default_factory=set)
+    # test script sets properties which are not known upfront
+    produces_unknown: bool = False
+    # indexes of targets which have to finish first
+    depends_on: Set[int] = field(default_factory=set)
+    # `depends_on`, transitively. properties set by them are visible to target
+    ancestors: Set[int] = field(default_factory=set)
+
+
+@dataclass
+class TargetResult:
+    target: str
+    status: Optional[int] = None
+    # time until response headers (`Response.elapsed`)
+    elapsed: float = 0
+    # time taken for complete target (load, request, test script)
+    duration: float = 0
+    tests: list = field(default_factory=list)
+    properties: dict = field(default_factory=dict)
+    error: Optional[str] = None
+    skipped: bool = False
+
+    @property
+    def failed_tests(self) -> int:
+        return sum(1 for test in self.tests if not test.success)
+
+    @property
+    def success(self) -> bool:
+        return (
+            self.error is None
+            and not self.skipped
+            and self.status is not None
+            and self.status < 400
+            and self.failed_tests == 0
+        )
+
+
+class TargetPlanner(BaseModelProcessor):
+    """
+    loads model once and figures out order between targets.
+
+    target `b` runs after target `a` when `a` is before `b` and
+    test script of `a` sets a property `b` refers to (directly, through variables
+    or from its test script).
+    a test script which sets properties with computed names is a barrier,
+    every target after it waits for it.
+    """
+
+    target_only_parsing = False
+
+    def select_target(self):
+        # no target is selected, every definition is planned
+        pass
+
+    def get_targets(self) -> List[str]:
+        """targets defined in file (imported ones are not included), names or positions"""
+        https = self.get_own_https()
+        return [
+            http.namewrap.name if http.namewrap else str(index + 1)
+            for index, http in enumerate(https)
+        ]
+
+    def plan(self, targets: Optional[List[str]] = None) -> List[TargetNode]:
+        targets = targets or self.get_targets()
+        name_index = self.get_name_index()
+        variables = self.get_variable_graph()
+        nodes = []
+        for index, target in enumerate(targets):
+            http = name_index.get(target)
+            node = TargetNode(target, index)
+            for one in self.get_http_chain(http, name_index):
+                node.references.update(self.get_references(one, variables))
+                script = one.script_wrap.script if one.script_wrap else ""
+                if script:
+                    node.references.update(match.group("name") for match in _property_get_regex.finditer(script))
+                    found = {match.group("name") for match in _property_set_regex.finditer(script)}
+                    node.produces.update(found)
+                    if len(_any_property_set_regex.findall(script)) > len(found):
+                        node.produces_unknown = True
+            for previous in nodes:
+                if previous.produces_unknown or previous.produces & node.references:
+                    node.depends_on.add(previous.index)
+                    node.ancestors.add(previous.index)
+                    node.ancestors.update(previous.ancestors)
+            nodes.append(node)
+        return nodes
+
+
+class MultiTargetRunner:
+    """
+    runs several targets of a file in one process, upto `parallel` at a time.
+    file is read and parsed once, targets share global session (connections and cookies).
+    properties set by test script of a target are fed to targets depending on it
+    (see `TargetPlanner`), without reading or parsing file again.
+    independent targets don't see each other's properties, whatever order they finish in.
+    """
+
+    def __init__(
+        self,
+        args: Config,
+        targets: Optional[List[str]] = None,
+        parallel: int = 1,
+        on_result: Optional[Callable[[TargetResult], None]] = None,
+    ):
+        self.args = args
+        self.parallel = max(parallel or 1, 1)
+        self.on_result = on_result
+        self.planner = TargetPlanner(dataclasses.replace(args, target=None))
+        self.nodes = self.planner.plan(targets)
+        # properties set by all targets
+        self.properties: Dict[str, object] = {}
+        # index of target to properties set by its test script
+        self.produced: Dict[int, Dict[str, object]] = {}
+        self._lock = threading.Lock()
+
+    def get_compiler(self, node: TargetNode) -> RequestCompiler:
+        config = dataclasses.replace(self.args, target=node.target, content=self.planner.content)
+        comp = SharedModelCompiler(config, self.planner.get_model_copy())
+        properties = {}
+        with self._lock:
+            # in run order, later targets override earlier ones as in sequential run
+            for index in sorted(node.ancestors):
+                properties.update(self.produced.get(index, {}))
+        for key, value in properties.items():
+            comp.property_util.add_command_line_property(key, value)
+        if properties:
+            comp.reresolve_properties(properties)
+        return comp
+
+    def run_target(self, node: TargetNode) -> TargetResult:
+        result = TargetResult(node.target)
+        start = time.perf_counter()
+        try:
+            comp = self.get_compiler(node)
+            comp.load_def()
+            if comp.property_util.errors:
+                raise comp.property_util.errors[0]
+            resp = comp.get_response()
+            result.status = resp.status_code
+            result.elapsed = resp.elapsed.total_seconds()
+            if comp.httpdef.output:
+                comp.write_to_output(resp)
+            script_result = comp.script_execution.execute_test_script(resp=resp)
+            result.tests = script_result.tests
+            result.properties = dict(script_result.properties)
+            if script_result.error:
+                result.error = script_result.error
+            with self._lock:
+                self.produced[node.index] = result.properties
+                self.properties.update(result.properties)
+        except DotHttpException as exc:
+            request_logger.debug(f"target {node.target} failed", exc_info=True)
+            result.error = exc.message
+        except Exception as exc:
+            request_logger.debug(f"target {node.target} failed", exc_info=True)
+            result.error = str(exc)
+        result.duration = time.perf_counter() - start
+        return result
+
+    def _report(self, result: TargetResult):
+        if self.on_result:
+            self.on_result(result)
+
+    def run(self) -> List[TargetResult]:
+        """results in order of targets, `on_result` is called as soon as each finishes"""
+        results: Dict[int, TargetResult] = {}
+        pending = {node.index: node for node in self.nodes}
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.parallel) as executor:
+            while pending or running:
+                for index, node in list(pending.items()):
+                    if len(running) >= self.parallel:
+                        break
+                    if any(dep not in results for dep in node.depends_on):
+                        continue
+                    del pending[index]
+                    failed = [
+                        self.nodes[dep].target for dep in sorted(node.depends_on) if not results[dep].success
+                    ]
+                    if failed:
+                        result = TargetResult(
+                            node.target,
+                            skipped=True,
+                            error=f"skipped, depends on failed target `{failed[0]}`",
+                        )
+                        results[index] = result
+                        self._report(result)
+                        continue
+                    running[executor.submit(self.run_target, node)] = index
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    results[index] = future.result()
+                    self._report(results[index])
+        return [results[node.index] for node in self.nodes]
+
+
+class SharedModelCompiler(RequestCompiler):
+    """request compiler over already read content (`args.content`) and parsed model"""
+
+    def __init__(self, args: Config, model: Optional[MultidefHttp] = None):
+        self.shared_model = model
+        super().__init__(args)
+
+    def load_content(self):
+        if self.args.content is None:
+            return super().load_content()
+        self.original_content = self.content = self.args.content
+
+    def load_model(self):
+        if self.shared_model is None:
+            return super().load_model()
+        self.model = self.shared_model
+
+
+def format_result(result: TargetResult) -> str:
+    if result.skipped:
+        return f"{result.target}  SKIPPED  {result.error}"
+    if result.status is None:
+        return f"{result.target}  ERROR  {result.duration * 1000:.1f}ms  {result.error}"
+    line = (
+        f"{result.target}  {result.status}  {result.elapsed * 1000:.1f}ms"
+        f" (total {result.duration * 1000:.1f}ms)"
+    )
+    if result.tests:
+        passed = len(result.tests) - result.failed_tests
+        line += f"  tests: {passed} passed, {result.failed_tests} failed"
+    if result.error:
+        line += f"  script error: {result.error}"
+    return line
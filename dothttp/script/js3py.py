@@ -14,13 +14,7 @@ import uuid
 from dataclasses import dataclass, field
 from operator import getitem
 
-import cryptography
-import xmltodict
-import jsonschema
 import requests
-import yaml
-from cryptography import *
-from faker import Faker
 from requests import Response
 from RestrictedPython import compile_restricted, safe_globals
 from RestrictedPython.Eval import default_guarded_getiter
@@ -30,7 +24,9 @@ from RestrictedPython.PrintCollector import PrintCollector
 from ..exceptions import DotHttpException, PreRequestScriptException, ScriptException
 from ..parse import MIME_TYPE_JSON, HttpDef, request_logger
 from ..utils.common import get_real_file_path
+from ..utils.lazy import LazyAttribute, LazyModule, LazyObject
 from ..utils.property_util import PropertyProvider
+from ..utils.timing import RequestTimings
 
 
 
@@ -45,6 +41,7 @@ def write_guard(x):
 #     return getattr(x, attr)
 
 
+# libraries (and faker instance) are loaded when a script uses them
 allowed_global = {
     "_print_": PrintCollector,
     "__metaclass__": type,
@@ -52,7 +49,7 @@ allowed_global = {
     "math": math,
     "type": type,
     "hashlib": hashlib,
-    "faker": Faker(),
+    "faker": LazyObject(LazyAttribute("faker", "Faker")),
     "unittest": unittest,
     "datetime": datetime,
     "_write_": write_guard,
@@ -65,11 +62,11 @@ allowed_global = {
     "urllib": urllib,
     "open": open,
     "json": json,
-    "yaml": yaml,
-    "cryptography": cryptography,
-    "jsonschema": jsonschema,
+    "yaml": LazyModule("yaml"),
+    "cryptography": LazyModule("cryptography"),
+    "jsonschema": LazyModule("jsonschema"),
     "requests": requests,
-    "xmltodict": xmltodict,
+    "xmltodict": LazyModule("xmltodict"),
 }
 allowed_global.update(safe_globals)
 
@@ -161,7 +158,9 @@ class Client:
 
 
 class ScriptExecutionEnvironmentBase:
-    def __init__(self, httpdef: HttpDef, prop: PropertyProvider) -> None:
+    def __init__(self, httpdef: HttpDef, prop: PropertyProvider, timings: typing.Optional[RequestTimings] = None) -> None:
+        # test script run is recorded as `test_script` phase
+        self.timings = timings
         self.client = Client(
             request=httpdef,
             properties=Properties(prop.get_all_properties_variables()),
@@ -199,6 +198,12 @@ class ScriptExecutionEnvironmentBase:
     def execute_test_script(self, resp) -> ScriptResult:
         if not self.client.request.test_script:
             return ScriptResult(stdout="", error="", properties={}, tests=[])
+        if self.timings is None:
+            return self._run_test_script(resp)
+        with self.timings.measure("test_script"):
+            return self._run_test_script(resp)
+
+    def _run_test_script(self, resp) -> ScriptResult:
         try:
             return self._execute_test_script(resp)
         except DotHttpException as exc:
@@ -218,8 +223,8 @@ class ScriptExecutionEnvironmentBase:
 
 
 class ScriptExecutionPython(ScriptExecutionEnvironmentBase):
-    def __init__(self, httpdef: HttpDef, prop: PropertyProvider) -> None:
-        super().__init__(httpdef, prop)
+    def __init__(self, httpdef: HttpDef, prop: PropertyProvider, timings: typing.Optional[RequestTimings] = None) -> None:
+        super().__init__(httpdef, prop, timings)
         self.log_func = PrintFunc()
         self.local = {}
         script_gloabal = dict(log=self.log_func, client=self.client, **allowed_global)
@@ -1,5 +1,7 @@
 import logging
 
+from .lazy import LazyAttribute, LazyModule
+
 MIME_TYPE_JSON = "application/json"
 FORM_URLENCODED = "application/x-www-form-urlencoded"
 MULTIPART_FORM_INPUT = "multipart/form-data"
@@ -10,41 +12,30 @@ UNIX_SOCKET_SCHEME = "http+unix"
 
 BASEIC_AUTHORIZATION_HEADER = "Authorization"
 
+# overrides directory parsed http models are cached in, empty value disables disk cache
+MODEL_CACHE_DIR_ENV = "DOTHTTP_MODEL_CACHE_DIR"
+
 
 base_logger = logging.getLogger("dothttp")
 request_logger = logging.getLogger("request")
 curl_logger = logging.getLogger("curl")
 
 
-try:
-    from requests_aws4auth import AWS4Auth
-except ImportError:
-    AWS4Auth = None
-try:
-    from requests_ntlm import HttpNtlmAuth
-except ImportError:
-    HttpNtlmAuth = None
+# optional auth backends and libraries are imported on first use (a request without
+# aws/ntlm/azure/hawk auth never loads them), falsy when they are not installed
+AWS4Auth = LazyAttribute("requests_aws4auth", "AWS4Auth")
+HttpNtlmAuth = LazyAttribute("requests_ntlm", "HttpNtlmAuth")
 
 try:
     import jstyleson as json
-    from jsonschema import validate
 except ImportError:
     import json
 
-    validate = None
+validate = LazyAttribute("jsonschema", "validate")
 
-try:
-    from ..auth.azure_auth import AzureAuth
-except:
-    # this is for dothttp-wasm, where msal most likely not installed
-    AzureAuth = None
+# msal is not available for dothttp-wasm
+AzureAuth = LazyAttribute("dothttp.auth.azure_auth", "AzureAuth")
 
-try:
-    import magic
-except ImportError:
-    magic = None
+magic = LazyModule("magic")
 
-try:
-    from requests_hawk import HawkAuth as RequestsHawkAuth
-except BaseException:
-    RequestsHawkAuth = None
+RequestsHawkAuth = LazyAttribute("requests_hawk", "HawkAuth")
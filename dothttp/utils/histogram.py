@@ -0,0 +1,112 @@
+import math
+from typing import Dict, Iterable, Optional
+
+DEFAULT_PERCENTILES = (50, 75, 90, 95, 99, 99.9)
+
+
+class LatencyHistogram:
+    """
+    log-linear histogram of latencies (seconds), recorded in microseconds.
+
+    bucket `i` holds values in `[growth ** i, growth ** (i + 1))`, so every percentile
+    is within `precision` (relative) of actual value, memory is bounded by range of values
+    (about 1600 buckets from 1us to 1 hour with 1% precision) instead of number of samples.
+
+    histograms with same precision can be merged (workers, processes, runs),
+    `to_dict`/`from_dict` keep every bucket so that merged percentiles are exact as well.
+    """
+
+    def __init__(self, precision: float = 0.01):
+        self.precision = precision
+        self._log_growth = math.log1p(precision)
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _get_index(self, micros: float) -> int:
+        if micros < 1:
+            return 0
+        return int(math.log(micros) / self._log_growth)
+
+    def _get_value(self, index: int) -> float:
+        # middle of bucket, in seconds
+        if index == 0:
+            return 1e-6
+        low = math.exp(index * self._log_growth)
+        high = math.exp((index + 1) * self._log_growth)
+        return (low + high) / 2 / 1e6
+
+    def record(self, seconds: float, count: int = 1):
+        index = self._get_index(seconds * 1e6)
+        self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += count
+        self.total += seconds * count
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        if other.precision != self.precision:
+            raise ValueError(
+                f"histograms with different precision can't be merged ({self.precision}, {other.precision})"
+            )
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        if other.max is not None:
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def copy(self) -> "LatencyHistogram":
+        histogram = LatencyHistogram(self.precision)
+        histogram.buckets = self.buckets.copy()
+        histogram.count = self.count
+        histogram.total = self.total
+        histogram.min = self.min
+        histogram.max = self.max
+        return histogram
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def percentile(self, percent: float) -> Optional[float]:
+        if not self.count:
+            return None
+        # nearest rank
+        rank = max(math.ceil(percent / 100 * self.count), 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                # bucket estimate never goes outside of observed range
+                return min(max(self._get_value(index), self.min), self.max)
+        return self.max
+
+    def percentiles(self, percents: Iterable[float] = DEFAULT_PERCENTILES) -> Dict[str, Optional[float]]:
+        return {f"p{percent:g}": self.percentile(percent) for percent in percents}
+
+    def to_dict(self) -> dict:
+        return {
+            "precision": self.precision,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            # json keys are strings
+            "buckets": {str(index): count for index, count in sorted(self.buckets.items())},
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> "LatencyHistogram":
+        histogram = LatencyHistogram(data.get("precision", 0.01))
+        histogram.buckets = {int(index): count for index, count in data.get("buckets", {}).items()}
+        histogram.count = data.get("count", sum(histogram.buckets.values()))
+        histogram.total = data.get("total", 0.0)
+        histogram.min = data.get("min")
+        histogram.max = data.get("max")
+        return histogram
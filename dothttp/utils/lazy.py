@@ -0,0 +1,144 @@
+import importlib
+import sys
+import threading
+import types
+from typing import Any, Callable, Optional
+
+
+class LazyModule:
+    """
+    stands in for a module, imports it on first attribute access.
+    falsy when module is not installed (optional dependencies), without raising.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, item):
+        if item in ("_name", "_module", "_lock"):
+            raise AttributeError(item)
+        module = self._load()
+        try:
+            value = getattr(module, item)
+        except AttributeError:
+            # submodule which is not imported yet (`cryptography.x509`)
+            try:
+                importlib.import_module(f"{self._name}.{item}")
+            except ImportError:
+                raise AttributeError(f"module '{self._name}' has no attribute '{item}'") from None
+            value = getattr(module, item)
+        if isinstance(value, types.ModuleType):
+            # its submodules are imported on access as well
+            return LazyModule(value.__name__)
+        return value
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __bool__(self):
+        try:
+            self._load()
+        except ImportError:
+            return False
+        return True
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+class LazyAttribute:
+    """
+    stands in for a class or function of a module (`AWS4Auth`, `HttpNtlmAuth`),
+    imported on first call or attribute access. falsy when module is not installed.
+
+    `isinstance(auth, AWS4Auth)` doesn't import module, nothing can be an
+    instance of a class whose module was never imported.
+    """
+
+    def __init__(self, module: str, name: str):
+        self._module_name = module
+        self._name = name
+        self._value = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._value is None:
+            with self._lock:
+                if self._value is None:
+                    self._value = getattr(importlib.import_module(self._module_name), self._name)
+        return self._value
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def __getattr__(self, item):
+        if item in ("_module_name", "_name", "_value", "_lock"):
+            raise AttributeError(item)
+        return getattr(self._load(), item)
+
+    def __instancecheck__(self, instance) -> bool:
+        if self._value is None and self._module_name not in sys.modules:
+            return False
+        try:
+            return isinstance(instance, self._load())
+        except ImportError:
+            return False
+
+    def __subclasscheck__(self, subclass) -> bool:
+        if self._value is None and self._module_name not in sys.modules:
+            return False
+        try:
+            return issubclass(subclass, self._load())
+        except ImportError:
+            return False
+
+    def __bool__(self):
+        try:
+            self._load()
+        except ImportError:
+            return False
+        return True
+
+    def __repr__(self):
+        return f"<LazyAttribute {self._module_name}.{self._name}>"
+
+
+class LazyObject:
+    """object built by `factory` on first attribute access (`Faker()` for scripts)"""
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._value: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._value is None:
+            with self._lock:
+                if self._value is None:
+                    self._value = self._factory()
+        return self._value
+
+    def __getattr__(self, item):
+        if item in ("_factory", "_value", "_lock"):
+            raise AttributeError(item)
+        return getattr(self._load(), item)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        return repr(self._load())
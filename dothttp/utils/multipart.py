@@ -0,0 +1,158 @@
+import os
+from dataclasses import dataclass
+from typing import IO, Iterator, List, Optional, Tuple, Union
+
+from urllib3.fields import RequestField
+from urllib3.filepost import choose_boundary
+
+from ..exceptions import DataFileChangedException
+
+# bytes read from a file (and sent) at a time
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class FilePart:
+    """content of a part, `size` bytes of file at `path` from `offset`"""
+
+    path: str
+    offset: int
+    size: int
+
+    @staticmethod
+    def from_file(file) -> Optional["FilePart"]:
+        """rest of opened file (from its current position), None when it isn't a regular file"""
+        path = getattr(file, "name", None)
+        if not isinstance(path, str) or not os.path.isfile(path):
+            return None
+        try:
+            offset = file.tell()
+        except (AttributeError, OSError):
+            offset = 0
+        return FilePart(path, offset, max(os.path.getsize(path) - offset, 0))
+
+    def read(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        """opens file for every read, handle is closed once part is read"""
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            remaining = self.size
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    # content-length is already sent
+                    raise DataFileChangedException(datafile=self.path)
+                remaining -= len(chunk)
+                yield chunk
+
+
+class FileBody:
+    """
+    file payload (`< "data.txt"`) which can be sent more than once (bench iterations),
+    opened file handle can be read only once, this opens file by path every time it is iterated
+    """
+
+    def __init__(self, part: FilePart, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.part = part
+        self.chunk_size = chunk_size
+        self.len = part.size
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self.part.read(self.chunk_size)
+
+    def __repr__(self):
+        return f"<FileBody {self.part.path} len={self.len}>"
+
+
+class MultipartEncoder:
+    """
+    multipart/form-data body, which is generated while it is sent.
+    file parts are read `chunk_size` bytes at a time, they are never held in memory.
+
+    `fields` are in same format as `files` of requests (`Payload.files`),
+    encoded body is same as requests would have generated with same boundary.
+
+    `len` is size of body (`Content-Length`), None when size of a part is not known
+    upfront (pipes, sockets). requests sends body with chunked transfer then.
+
+    files are opened by path, every time body is iterated (redirects, retries and
+    bench copies of request send same body), and are closed once their part is sent.
+    """
+
+    def __init__(
+        self,
+        fields: List[Tuple[str, tuple]],
+        boundary: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        self.boundary = boundary or choose_boundary()
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self.chunk_size = chunk_size
+        self.parts: List[Tuple[bytes, Union[bytes, FilePart, IO]]] = []
+        for name, (filename, content, mimetype) in fields:
+            if content is None:
+                continue
+            field = RequestField(name=name, data=b"", filename=filename)
+            field.make_multipart(content_type=mimetype)
+            header = f"--{self.boundary}\r\n".encode("latin-1") + field.render_headers().encode("utf-8")
+            self.parts.append((header, self.get_content(content)))
+        self.closing = f"--{self.boundary}--\r\n".encode("latin-1")
+        self.len = self.get_length()
+
+    @staticmethod
+    def get_content(content) -> Union[bytes, FilePart, IO]:
+        if isinstance(content, int):
+            content = str(content)
+        if isinstance(content, str):
+            return content.encode("utf-8")
+        if isinstance(content, (bytes, bytearray)):
+            return bytes(content)
+        part = FilePart.from_file(content)
+        if part is not None:
+            return part
+        # size is not known, read from it as it is
+        return content
+
+    def get_length(self) -> Optional[int]:
+        length = len(self.closing)
+        for header, content in self.parts:
+            if isinstance(content, bytes):
+                length += len(content)
+            elif isinstance(content, FilePart):
+                length += content.size
+            else:
+                return None
+            length += len(header) + 2
+        return length
+
+    def read_stream(self, stream: IO) -> Iterator[bytes]:
+        while chunk := stream.read(self.chunk_size):
+            yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+
+    def iter_pieces(self) -> Iterator[bytes]:
+        for header, content in self.parts:
+            yield header
+            if isinstance(content, bytes):
+                yield content
+            elif isinstance(content, FilePart):
+                yield from content.read(self.chunk_size)
+            else:
+                yield from self.read_stream(content)
+            yield b"\r\n"
+        yield self.closing
+
+    def __iter__(self) -> Iterator[bytes]:
+        # headers and small parts are sent together, not as separate writes
+        buffer = bytearray()
+        for piece in self.iter_pieces():
+            buffer += piece
+            if len(buffer) >= self.chunk_size:
+                yield bytes(buffer)
+                buffer.clear()
+        if buffer:
+            yield bytes(buffer)
+
+    def to_bytes(self) -> bytes:
+        return b"".join(self)
+
+    def __repr__(self):
+        return f"<MultipartEncoder parts={len(self.parts)} len={self.len}>"
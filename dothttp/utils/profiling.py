@@ -0,0 +1,175 @@
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+CPROFILE = "cprofile"
+SAMPLE = "sample"
+PROFILE_MODES = (CPROFILE, SAMPLE)
+SAMPLE_INTERVAL = 0.005
+DEFAULT_TOP = 15
+
+# functions of this package are listed in summary
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class FunctionStat:
+    function: str
+    # seconds, including callees
+    cumulative: float
+    # seconds, excluding callees
+    own: float
+    # calls for cProfile, samples for sampling profiler
+    calls: int
+
+    def to_dict(self):
+        return {
+            "function": self.function,
+            "cumulative": round(self.cumulative, 6),
+            "own": round(self.own, 6),
+            "calls": self.calls,
+        }
+
+
+def get_function_label(filename: str, line: int, name: str) -> str:
+    if filename.startswith(PACKAGE_DIR):
+        filename = os.path.relpath(filename, os.path.dirname(PACKAGE_DIR))
+    return f"{filename}:{line}({name})"
+
+
+def is_own(filename: str) -> bool:
+    return filename.startswith(PACKAGE_DIR + os.sep)
+
+
+class Profiler:
+    """
+    profiles code run within (`with Profiler(...)`).
+
+    `cprofile` is deterministic, profiles only thread it is started on, written as pstats.
+    `sample` samples stacks of every thread each `interval`, cheaper on long runs
+    (bench, many targets), written as collapsed stacks (`a;b;c count`, flamegraph input).
+    """
+
+    def __init__(self, mode: str = CPROFILE, output: Optional[str] = None, interval: float = SAMPLE_INTERVAL):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"profile mode should be one of {PROFILE_MODES}, not `{mode}`")
+        self.mode = mode
+        self.output = output
+        self.interval = interval
+        self.duration = 0.0
+        self._profile: Optional[cProfile.Profile] = None
+        # stack (root first) of (filename, line, function) -> samples
+        self.samples: Counter = Counter()
+        # stack -> seconds, sampler can't run while a thread holds gil,
+        # so a sample stands for time since previous one, not `interval`
+        self.sampled_time: Counter = Counter()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._start = 0.0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        self._start = time.perf_counter()
+        if self.mode == CPROFILE:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample, name="dothttp-profiler", daemon=True)
+            self._sampler.start()
+
+    def stop(self):
+        if self.mode == CPROFILE:
+            self._profile.disable()
+        else:
+            self._stop.set()
+            self._sampler.join()
+        self.duration = time.perf_counter() - self._start
+        if self.output:
+            self.write(self.output)
+
+    def _sample(self):
+        own_ident = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                stack.reverse()
+                self.samples[tuple(stack)] += 1
+                self.sampled_time[tuple(stack)] += elapsed
+
+    def write(self, path: str):
+        if self.mode == CPROFILE:
+            self._profile.dump_stats(path)
+            return
+        with open(path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(";".join(get_function_label(*frame) for frame in stack))
+                f.write(f" {count}\n")
+
+    def get_stats(self) -> Dict[Tuple[str, int, str], FunctionStat]:
+        if self.mode == CPROFILE:
+            stats = pstats.Stats(self._profile).stats
+            return {
+                key: FunctionStat(get_function_label(*key), cumulative, own, calls)
+                for key, (_, calls, own, cumulative, _) in stats.items()
+            }
+        result: Dict[Tuple[str, int, str], FunctionStat] = {}
+        for stack, count in self.samples.items():
+            seconds = self.sampled_time[stack]
+            # recursive functions are counted once per sample
+            for key in set(stack):
+                stat = result.get(key)
+                if stat is None:
+                    stat = result[key] = FunctionStat(get_function_label(*key), 0.0, 0.0, 0)
+                stat.cumulative += seconds
+                stat.calls += count
+            result[stack[-1]].own += seconds
+        return result
+
+    def get_top(self, limit: int = DEFAULT_TOP, own_only: bool = True) -> List[FunctionStat]:
+        """functions by cumulative time, only functions of dothttp when `own_only`"""
+        stats = [stat for key, stat in self.get_stats().items() if not own_only or is_own(key[0])]
+        stats.sort(key=lambda stat: stat.cumulative, reverse=True)
+        return stats[:limit]
+
+    def to_dict(self, limit: int = DEFAULT_TOP) -> dict:
+        return {
+            "mode": self.mode,
+            "output": self.output,
+            "duration": round(self.duration, 6),
+            "top": [stat.to_dict() for stat in self.get_top(limit)],
+        }
+
+
+def format_profile_summary(profiler: Profiler, limit: int = DEFAULT_TOP) -> str:
+    unit = "calls" if profiler.mode == CPROFILE else "samples"
+    lines = [
+        f"profile ({profiler.mode}) of {profiler.duration * 1000:.1f}ms"
+        + (f", written to {profiler.output}" if profiler.output else ""),
+        "top dothttp functions by cumulative time:",
+        f"{'cumulative':>12}{'own':>12}{unit:>10}  function",
+    ]
+    for stat in profiler.get_top(limit):
+        lines.append(f"{stat.cumulative * 1000:>10.2f}ms{stat.own * 1000:>10.2f}ms{stat.calls:>10}  {stat.function}")
+    return "\n".join(lines)
@@ -0,0 +1,134 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from ..exceptions import PropertyCycleException
+
+
+@dataclass
+class PropertyNode:
+    # unique per declaration, `name` for first declaration, `name#2` for second ...
+    key: str
+    name: str
+    # position in declaration order
+    index: int
+    # names this property refers to
+    references: Set[str] = field(default_factory=set)
+    # whatever is needed to evaluate it (`var` declaration)
+    payload: Any = None
+
+
+class PropertyGraph:
+    """
+    dependency graph of properties declared in http file (`var`).
+    command line, env and `$commands` properties have no dependencies,
+    they are leaves and are not part of graph.
+
+    1. `get_resolution_order` orders properties so that every property is evaluated
+        after properties it refers to, irrespective of declaration order
+    2. cycles are reported with complete chain (`a -> b -> a`)
+    3. `get_dependents` tells what has to be re-evaluated when a property changes
+        (`client.properties.set` from script)
+
+    a property can be declared more than once. a reference points to latest
+    declaration before it (as it was when variables were evaluated top to bottom),
+    if there is none, to last declaration (forward reference).
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, PropertyNode] = {}
+        # property name to keys of its declarations, in declaration order
+        self.declarations: Dict[str, List[str]] = {}
+
+    def add(self, name: str, references: Set[str], payload: Any = None) -> PropertyNode:
+        keys = self.declarations.setdefault(name, [])
+        key = name if not keys else f"{name}#{len(keys) + 1}"
+        node = PropertyNode(key, name, len(self.nodes), set(references), payload)
+        self.nodes[key] = node
+        keys.append(key)
+        return node
+
+    def get_declaration(self, name: str, index: int) -> Optional[PropertyNode]:
+        """declaration of `name` a reference at `index` points to"""
+        keys = self.declarations.get(name)
+        if not keys:
+            return None
+        declaration = None
+        for key in keys:
+            if self.nodes[key].index >= index:
+                break
+            declaration = key
+        return self.nodes[declaration or keys[-1]]
+
+    def get_resolution_order(
+        self,
+        keys: Iterable[str],
+        is_external: Callable[[str], bool] = lambda name: False,
+    ) -> List[PropertyNode]:
+        """
+        nodes for `keys`, dependencies first. `is_external` tells if a name is
+        resolved outside of graph (command line, env), such references are not followed
+        """
+        keys = [key for key in keys if key in self.nodes]
+        pending = set(keys)
+        dependencies = self._get_dependencies(is_external)
+        order: List[PropertyNode] = []
+        visited: Set[str] = set()
+        path: List[str] = []
+
+        def visit(key):
+            if key in visited:
+                return
+            if key in path:
+                cycle = path[path.index(key) :] + [key]
+                raise PropertyCycleException(
+                    cycle=" -> ".join(self.nodes[item].name for item in cycle)
+                )
+            path.append(key)
+            for dependency in dependencies[key]:
+                visit(dependency)
+            path.pop()
+            visited.add(key)
+            if key in pending:
+                order.append(self.nodes[key])
+
+        for key in keys:
+            visit(key)
+        return order
+
+    def _get_dependencies(self, is_external) -> Dict[str, List[str]]:
+        dependencies: Dict[str, List[str]] = {key: [] for key in self.nodes}
+        readers: Dict[str, List[str]] = {key: [] for key in self.nodes}
+        for node in self.nodes.values():
+            for name in sorted(node.references):
+                if is_external(name):
+                    continue
+                declaration = self.get_declaration(name, node.index)
+                if declaration:
+                    dependencies[node.key].append(declaration.key)
+                    readers[declaration.key].append(node.key)
+        for keys in self.declarations.values():
+            # redeclaration is evaluated after previous one and
+            # after everything that has read previous value
+            for previous, key in zip(keys, keys[1:]):
+                dependencies[key].append(previous)
+                dependencies[key].extend(reader for reader in readers[previous] if reader != key)
+        return dependencies
+
+    def get_dependents(self, names: Iterable[str]) -> List[str]:
+        """declarations which (transitively) refer to any of `names`"""
+        changed = set(names)
+        dependents = set()
+        queue = list(changed)
+        while queue:
+            current = queue.pop()
+            for node in self.nodes.values():
+                if current in node.references and node.key not in dependents:
+                    # later declarations have to be evaluated again, they override it
+                    for key in self.declarations[node.name]:
+                        if self.nodes[key].index >= node.index:
+                            dependents.add(key)
+                    if node.name not in changed:
+                        changed.add(node.name)
+                        queue.append(node.name)
+        # keep declaration order, resolution order is figured out later
+        return [key for key in self.nodes if key in dependents]
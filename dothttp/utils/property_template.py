@@ -0,0 +1,90 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Tuple
+
+property_regex = re.compile(r"{{(?P<var>.*?)}}", re.DOTALL)
+
+
+@dataclass(frozen=True)
+class PropertyReference:
+    # text between `{{` and `}}`, as written (`a`, `a=10`, `$randomStr:10`)
+    text: str
+    # property name, default (if any) is removed
+    key: str
+
+
+@dataclass(frozen=True)
+class PropertyTemplate:
+    """
+    string split into literal chunks and property references.
+    `segments` alternate, starting and ending with literal chunk
+    (`"a{{b}}c"` -> `("a", ref(b), "c")`)
+    """
+
+    segments: Tuple
+    # property names, in order of first appearance
+    keys: Tuple[str, ...]
+
+    @property
+    def has_properties(self) -> bool:
+        return bool(self.keys)
+
+    def render(self, values) -> str:
+        """values: mapping of property name to its string value"""
+        if not self.keys:
+            return self.segments[0]
+        return "".join(
+            segment if index % 2 == 0 else values[segment.key]
+            for index, segment in enumerate(self.segments)
+        )
+
+
+def get_property_key(text: str) -> str:
+    # same as `PropertyProvider.validate_n_gen`, key is stripped only if default is given
+    if "=" in text:
+        return text.split("=", 1)[0].strip()
+    return text
+
+
+# large strings (payloads) are compiled on every call,
+# caching them would pin them in memory for the lifetime of the server
+MAX_CACHED_TEMPLATE_LENGTH = 16 * 1024
+
+
+def compile_template(content: str) -> PropertyTemplate:
+    """
+    compiled template is cached per string, header/url/payload strings of a http
+    file are compiled once per process (server, pytest plugin)
+    """
+    if len(content) > MAX_CACHED_TEMPLATE_LENGTH:
+        return parse_template(content)
+    return _compile_template(content)
+
+
+@lru_cache(maxsize=4096)
+def _compile_template(content: str) -> PropertyTemplate:
+    return parse_template(content)
+
+
+def parse_template(content: str) -> PropertyTemplate:
+    segments = []
+    keys = {}
+    literal = []
+    position = 0
+    for match in property_regex.finditer(content):
+        text = match.group("var")
+        literal.append(content[position : match.start()])
+        position = match.end()
+        if not text:
+            # `{{}}` is left as is
+            literal.append(match.group(0))
+            continue
+        segments.append("".join(literal))
+        literal = []
+        key = get_property_key(text)
+        keys.setdefault(key, None)
+        segments.append(PropertyReference(text, key))
+    literal.append(content[position:])
+    segments.append("".join(literal))
+    return PropertyTemplate(tuple(segments), tuple(keys))
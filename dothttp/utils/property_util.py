@@ -14,6 +14,8 @@ from types import FunctionType
 from typing import Dict, List, Union
 
 from ..exceptions import HttpFileException, PropertyNotFoundException
+from .property_graph import PropertyGraph
+from .property_template import compile_template, property_regex
 import ast
 import operator
 
@@ -110,8 +112,6 @@ def evaluate_expression(expression: str) -> str:
         base_logger.error(f"Error evaluating expression `{expression}`: {e}")
         return expression
 
-property_regex = re.compile(r"{{(?P<var>.*?)}}", re.DOTALL)
-
 class PropertyProvider:
     """
         1. properties defined in file itself ({{a=10}})
@@ -158,12 +158,22 @@ class PropertyProvider:
         self.property_file = property_file
         self.is_running_system_command_enabled = False
         self.errors = []
+        # `var` declarations and their references
+        self.property_graph = PropertyGraph()
+        # `$commands` are run once while a request is resolved, not for every reference.
+        # forgotten once request is loaded, next resolution (bench iteration, rerun) runs them again
+        self.system_command_results: Dict[str, str] = {}
 
     def enable_system_command(self):
         self.is_running_system_command_enabled = True
 
     def add_system_command_properties(self, system_command_dict: dict):
         self.system_command_properties.update(system_command_dict)
+        for key in system_command_dict:
+            self.system_command_results.pop(key, None)
+
+    def forget_system_command_results(self):
+        self.system_command_results.clear()
 
     def add_command_line_property(self, key: str, value: str):
         self.command_line_properties[key] = value
@@ -196,8 +206,16 @@ class PropertyProvider:
     def check_properties_for_content(self, content):
         content_prop_needed = self.get_properties_for_content(content)
         props_needed = set(content_prop_needed.keys())
-        available_properties = self.available_properties_list()
-        missing_props = props_needed - available_properties
+        self.check_properties_available(props_needed)
+        return content_prop_needed, props_needed
+
+    def check_properties_available(self, props_needed):
+        missing_props = {
+            key for key in props_needed if not self.is_property_defined(key)
+        }
+        if missing_props:
+            # environment variables and stripped in-file names
+            missing_props -= self.available_properties_list()
         if len(missing_props) != 0:
             raise PropertyNotFoundException(
                 var=missing_props,
@@ -205,7 +223,6 @@ class PropertyProvider:
                     self.property_file if self.property_file else "not specified"
                 ),
             )
-        return content_prop_needed, props_needed
 
     def available_properties_list(self):
         return (
@@ -223,6 +240,24 @@ class PropertyProvider:
             )
         )
 
+    def is_property_defined(self, key):
+        """
+        cheap check for most common case, key defined in command line, env or file.
+        `available_properties_list` is complete but scans environment variables
+        """
+        if (
+            key in self.command_line_properties
+            or key in self.env_properties
+            or key in self.system_command_properties
+        ):
+            return True
+        prop = self.infile_properties.get(key)
+        return (
+            prop is not None
+            and key == key.strip()
+            and (prop.value is not None or PropertyProvider.is_special_keyword(key))
+        )
+
     def get_all_properties_variables(self):
         # TODO
         d = dict()
@@ -239,24 +274,26 @@ class PropertyProvider:
         return ret or key.startswith("$expr:")
 
     def get_updated_content(self, content, type="str"):
-        try:
-            content_prop_needed, props_needed = self.check_properties_for_content(
-                content)
-            for var in props_needed:
-                if type == "str":
-                    value = self.resolve_property_string(var)
-                    for text_to_replace in content_prop_needed[var].text:
-                        content = content.replace(
-                            "{{" + text_to_replace + "}}", str(value)
-                        )
-                else:
-                    content = self.resolve_property_object(var)
-                base_logger.debug(f"using `{content}` for property {var}")
+        # template is compiled once per string, rendering is a single join
+        template = compile_template(content)
+        if not template.has_properties:
             return content
+        try:
+            self.check_properties_available(template.keys)
         except PropertyNotFoundException as e:
             self.errors.append(e)
             return content
-    
+        if type == "str":
+            values = {}
+            for var in template.keys:
+                values[var] = str(self.resolve_property_string(var))
+                base_logger.debug(f"using `{values[var]}` for property {var}")
+            return template.render(values)
+        for var in template.keys:
+            content = self.resolve_property_object(var)
+            base_logger.debug(f"using `{content}` for property {var}")
+        return content
+
     def get_updated_obj_content(self, content):
         return self.get_updated_content(content, "obj")
 
@@ -361,14 +398,18 @@ class PropertyProvider:
                 base_logger.error(
                     f"system command is disabled, by adding '@insecure'")
                 return 'running system command is disabled, enable it by adding @insecure'
+            if key in self.system_command_results:
+                return self.system_command_results[key]
             try:
                 result = subprocess.run(
                     command, shell=True, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-                return result.stdout
+                output = result.stdout
             except subprocess.CalledProcessError as e:
                 base_logger.error(
                     f"Error while executing system command: {command} with error: {e}")
-                return ''
+                output = ''
+            self.system_command_results[key] = output
+            return output
 
     def resolve_property_string(self, key: str):
         if PropertyProvider.is_special_keyword(key):
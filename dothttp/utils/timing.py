@@ -0,0 +1,119 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# in execution order
+LOCAL_PHASES = ("parse", "properties", "load_def", "auth", "pre_request_script")
+NETWORK_PHASES = ("dns", "connect", "tls", "send", "ttfb", "download")
+PHASES = LOCAL_PHASES + NETWORK_PHASES + ("test_script",)
+
+_active = threading.local()
+
+
+class RequestTimings:
+    """
+    time spent (seconds) in each phase of a request.
+
+    phases are exclusive, time of a phase measured inside another phase
+    (auth signing while loading definition, connect while sending) is
+    not counted for outer phase, so phases add up to total.
+    network phases are recorded by connections (see `connection_timing`)
+    for timings activated on current thread, a reused connection has no dns/connect/tls.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        # perf_counter when response headers were received, download is measured from there
+        self.response_started: Optional[float] = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _get_stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def add(self, phase: str, seconds: float):
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def measure(self, phase: str):
+        stack = self._get_stack()
+        start = time.perf_counter()
+        if stack:
+            # outer phase is paused
+            outer = stack[-1]
+            self.add(outer[0], start - outer[1])
+        frame = [phase, start]
+        stack.append(frame)
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            stack.pop()
+            self.add(phase, end - frame[1])
+            if stack:
+                stack[-1][1] = end
+
+    @contextmanager
+    def activate(self):
+        """network phases of requests sent on current thread are recorded to these timings"""
+        previous = getattr(_active, "timings", None)
+        _active.timings = self
+        try:
+            yield self
+        finally:
+            _active.timings = previous
+
+    def mark_response(self):
+        self.response_started = time.perf_counter()
+
+    def get(self, phase: str) -> float:
+        return self.phases.get(phase, 0.0)
+
+    @property
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+    def to_dict(self) -> Dict[str, float]:
+        """milliseconds of every phase (0 when it didn't happen) and total"""
+        data = {phase: round(self.get(phase) * 1000, 3) for phase in PHASES}
+        data["total"] = round(self.total * 1000, 3)
+        return data
+
+    def to_har(self) -> Dict[str, float]:
+        """
+        har `timings` (milliseconds), -1 for phases which didn't happen
+        (reused connection), local phases are kept as custom (`_`) fields
+        """
+        def optional(*phases):
+            if not any(phase in self.phases for phase in phases):
+                return -1
+            return round(sum(self.get(phase) for phase in phases) * 1000, 3)
+
+        har = {
+            "blocked": -1,
+            "dns": optional("dns"),
+            # har's connect includes ssl
+            "connect": optional("connect", "tls"),
+            "ssl": optional("tls"),
+            "send": round(self.get("send") * 1000, 3),
+            "wait": round(self.get("ttfb") * 1000, 3),
+            "receive": round(self.get("download") * 1000, 3),
+        }
+        for phase in LOCAL_PHASES + ("test_script",):
+            har[f"_{phase}"] = round(self.get(phase) * 1000, 3)
+        return har
+
+
+def get_active_timings() -> Optional[RequestTimings]:
+    return getattr(_active, "timings", None)
+
+
+def format_timings(timings: RequestTimings) -> str:
+    lines = [f"{phase:<20}{timings.get(phase) * 1000:>10.2f}ms" for phase in PHASES if phase in timings.phases]
+    lines.append(f"{'total':<20}{timings.total * 1000:>10.2f}ms")
+    return "\n".join(lines)
@@ -4,10 +4,10 @@ import logging
 
 from dothttp.parse import (
     Config,
+    model_cache,
 )
 from dothttp.parse.request_base import (
     RequestCompiler,
-    dothttp_model,
 )
 from dotextensions.server.handlers.basic_handlers import RunHttpFileHandler
 
@@ -48,7 +48,7 @@ def extrct_tests_to_run(metafunc, prefix, filename):
         with open(os.path.join(filename)) as f:
             httpdef = f.read()
         try:
-            model = dothttp_model.model_from_str(httpdef)
+            model = model_cache.model_from_str(httpdef)
             for http in model.allhttps:
                 if prefix is not None:
                     if prefix == "*":
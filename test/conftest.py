@@ -1,3 +1,4 @@
+import os
 import pytest
 import subprocess
 import time
@@ -9,6 +10,17 @@ def is_port_in_use(port):
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         return s.connect_ex(('localhost', port)) == 0
 
+@pytest.fixture(scope='session', autouse=True)
+def model_cache_dir(tmp_path_factory):
+    """cli runs (in-process and subprocesses) cache parsed models in tmp dir, not in home"""
+    previous = os.environ.get("DOTHTTP_MODEL_CACHE_DIR")
+    os.environ["DOTHTTP_MODEL_CACHE_DIR"] = str(tmp_path_factory.mktemp("model-cache"))
+    yield
+    if previous is None:
+        os.environ.pop("DOTHTTP_MODEL_CACHE_DIR", None)
+    else:
+        os.environ["DOTHTTP_MODEL_CACHE_DIR"] = previous
+
 @pytest.fixture(scope='session', autouse=True)
 def start_httpbin_server():
     """Start httpbin server using gunicorn for tests."""
@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+import unittest
+
+from dothttp.exceptions import PropertyFileException
+from dothttp.models.computed import Config
+from dothttp.parse.adapter_pool import (
+    AdapterPool,
+    PooledHTTPAdapter,
+    PoolConfig,
+    RetryConfig,
+    get_pool_stats,
+    get_session_stats,
+    mount_pooled_adapters,
+    retry_adapter_pool,
+)
+from dothttp.parse.request_base import RequestBase
+from test import TestBase
+
+
+class AdapterPoolTest(unittest.TestCase):
+    def test_adapter_per_config(self):
+        pool = AdapterPool()
+        self.addCleanup(pool.close)
+        adapter = pool.get_adapter(RetryConfig(3, (500,), 0.1))
+        self.assertIs(adapter, pool.get_adapter(RetryConfig(3, (500,), 0.1)))
+        self.assertIsNot(adapter, pool.get_adapter(RetryConfig(3)))
+        self.assertEqual(3, adapter.max_retries.total)
+        self.assertFalse(adapter.max_retries.raise_on_status)
+        self.assertEqual(2, len(pool.get_stats()))
+
+
+class RetryConnectionReuseTest(TestBase):
+    def test_keep_alive_reused(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".http", delete=False) as f:
+            f.write('GET "http://localhost:8000/get"\nretry(total=2)\n')
+        self.addCleanup(os.remove, f.name)
+        for _ in range(3):
+            resp = self.get_request_comp(f.name).get_response()
+            self.assertEqual(200, resp.status_code)
+        adapter = retry_adapter_pool.get_adapter(RetryConfig(2))
+        stats = get_pool_stats(adapter)
+        self.assertGreaterEqual(stats.requests, 3)
+        self.assertEqual(1, stats.connections)
+        self.assertEqual(stats.requests - 1, stats.reused)
+
+
+class PoolConfigTest(TestBase):
+    def test_from_settings(self):
+        self.assertIsNone(PoolConfig.from_settings(None, None))
+        args = Config(
+            curl=False, property_file=None, properties=[], env=[], debug=False,
+            file="", info=False, no_cookie=True, format=False,
+            pool_maxsize=30, pool_hosts={"b.com": 5},
+        )
+        config = PoolConfig.from_settings(
+            {"connections": 4, "maxsize": 2, "hosts": {"a.com": 3}}, args
+        )
+        self.assertEqual(PoolConfig(4, 30, False, (("a.com", 3), ("b.com", 5))), config)
+        with self.assertRaises(PropertyFileException):
+            PoolConfig.from_settings({"maxsize": 0})
+        with self.assertRaises(PropertyFileException):
+            PoolConfig.from_settings({"maxsize": "many"})
+
+    def test_host_maxsize(self):
+        adapter = PooledHTTPAdapter(PoolConfig(maxsize=2, hosts=(("localhost", 7),)))
+        self.addCleanup(adapter.close)
+        self.assertEqual(7, adapter.poolmanager.connection_from_host("localhost", 8000).pool.maxsize)
+        self.assertEqual(2, adapter.poolmanager.connection_from_host("127.0.0.1", 8000).pool.maxsize)
+
+    def test_session_pool_from_property_file(self):
+        self.addCleanup(mount_pooled_adapters, RequestBase.global_session)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with open(os.path.join(directory.name, ".dothttp.json"), "w") as f:
+            json.dump({"$pool": {"maxsize": 3, "hosts": {"localhost": 4}}}, f)
+        http_file = os.path.join(directory.name, "get.http")
+        with open(http_file, "w") as f:
+            f.write('GET "http://localhost:8000/get"\n')
+        for _ in range(2):
+            self.assertEqual(200, self.get_request_comp(http_file).get_response().status_code)
+        session = RequestBase.global_session
+        self.assertEqual(PoolConfig(maxsize=3, hosts=(("localhost", 4),)), session.pool_config)
+        stats = get_session_stats(session)["http://localhost:8000"]
+        self.assertEqual(2, stats["requests"])
+        self.assertEqual(1, stats["reused"])
+        self.assertEqual(1, stats["idle"])
+        self.assertEqual(0, stats["in_use"])
@@ -0,0 +1,226 @@
+import json
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from dothttp.exceptions import BenchProcessException
+from dothttp.models.computed import Config
+from dothttp.parse.bench import (
+    ArrivalProfile,
+    BenchCompiler,
+    BenchResult,
+    LoadGenerator,
+    MultiProcessLoadGenerator,
+    OpenLoopGenerator,
+)
+from dothttp.utils.histogram import LatencyHistogram
+
+
+def get_config(file, target=None):
+    return Config(
+        file=file,
+        curl=False,
+        debug=False,
+        property_file=None,
+        env=[],
+        properties=[],
+        no_cookie=True,
+        format=False,
+        info=False,
+        target=target,
+    )
+
+
+class LatencyHistogramTest(unittest.TestCase):
+    def test_percentiles_within_precision(self):
+        rng = random.Random(7)
+        samples = [rng.expovariate(1 / 0.05) for _ in range(10000)]
+        histogram = LatencyHistogram()
+        for sample in samples:
+            histogram.record(sample)
+        samples.sort()
+        for percent in (50, 90, 99, 99.9):
+            exact = samples[int(percent / 100 * len(samples)) - 1]
+            self.assertAlmostEqual(exact, histogram.percentile(percent), delta=exact * 0.02)
+        self.assertEqual(samples[0], histogram.min)
+        self.assertEqual(samples[-1], histogram.max)
+        self.assertEqual(samples[-1], histogram.percentile(100))
+
+    def test_merge(self):
+        first, second, both = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for index in range(1, 1001):
+            (first if index % 2 else second).record(index / 1000)
+            both.record(index / 1000)
+        merged = LatencyHistogram.from_dict(first.to_dict()).merge(second)
+        self.assertEqual(both.buckets, merged.buckets)
+        self.assertEqual((1000, 0.001, 1.0), (merged.count, merged.min, merged.max))
+        self.assertAlmostEqual(both.total, merged.total)
+        self.assertEqual(both.percentile(99), merged.percentile(99))
+        with self.assertRaises(ValueError):
+            merged.merge(LatencyHistogram(precision=0.1))
+
+    def test_empty(self):
+        histogram = LatencyHistogram()
+        self.assertIsNone(histogram.percentile(50))
+        self.assertIsNone(histogram.mean)
+
+
+class HttpFileTestCase(unittest.TestCase):
+    def write_http(self, content):
+        with tempfile.NamedTemporaryFile("w", suffix=".http", delete=False) as f:
+            f.write(content)
+        self.addCleanup(os.remove, f.name)
+        return f.name
+
+
+class BenchTest(HttpFileTestCase):
+    def test_static_request_reused(self):
+        filename = self.write_http('var host = "localhost:8000";\nGET "http://{{host}}/get"\n')
+        comp = BenchCompiler(get_config(filename)).prepare()
+        self.assertFalse(comp.is_dynamic)
+        self.assertEqual("http://localhost:8000/get", comp.next_request().url)
+        self.assertIsNot(comp.next_request(), comp.next_request())
+
+    def test_dynamic_properties_rendered_again(self):
+        filename = self.write_http(
+            "var id = uuid();\n"
+            'var path = $"/anything/{id}";\n'
+            '@name("dynamic")\n'
+            'GET "http://localhost:8000{{path}}"\n'
+            '? "n", "{{$randomInt}}"\n'
+            '? "d", "{{d=$randomStr:10}}"\n'
+        )
+        comp = BenchCompiler(get_config(filename, "dynamic")).prepare()
+        self.assertTrue(comp.is_dynamic)
+        urls = {comp.next_request().url for _ in range(5)}
+        self.assertEqual(5, len(urls))
+        self.assertEqual(5, len({url.split("?")[0] for url in urls}))
+        self.assertEqual(5, len({url.split("d=")[1] for url in urls}))
+
+    def test_commands_run_every_iteration(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        counter = os.path.join(directory, "counter")
+        with open(os.path.join(directory, ".dothttp.json"), "w") as f:
+            json.dump({"$commands": {"stamp": f"echo x >> {counter}; printf %s $(wc -l < {counter})"}}, f)
+        filename = os.path.join(directory, "stamp.http")
+        with open(filename, "w") as f:
+            f.write('@insecure\nGET "http://localhost:8000/get"\n"x-stamp": "{{stamp}}"\n? "stamp", "{{stamp}}"\n')
+        comp = BenchCompiler(get_config(filename)).prepare()
+        self.assertTrue(comp.is_dynamic)
+        requests = [comp.next_request() for _ in range(3)]
+        # first run is while preparing
+        self.assertEqual(["2", "3", "4"], [request.headers["x-stamp"] for request in requests])
+        # command runs once per request, even though it is referenced twice
+        self.assertEqual([f"http://localhost:8000/get?stamp={index}" for index in "234"], [r.url for r in requests])
+
+    def test_request_budget(self):
+        filename = self.write_http("GET http://localhost:8000/status/200\n\nGET http://localhost:8000/status/503\n")
+        result = LoadGenerator(get_config(filename), workers=3, requests=30).run()
+        self.assertEqual(30, result.requests)
+        self.assertEqual({200: 30}, result.status_codes)
+        self.assertEqual(30, result.histogram.count)
+        self.assertEqual(0, result.error_rate)
+        failing = LoadGenerator(get_config(filename, "2"), workers=2, requests=10).run()
+        self.assertEqual(1.0, failing.error_rate)
+        # report round trip
+        restored = BenchResult.from_dict(failing.to_dict())
+        self.assertEqual(failing.to_dict(), restored.to_dict())
+
+    def test_duration(self):
+        filename = self.write_http("GET http://localhost:8000/get\n")
+        result = LoadGenerator(get_config(filename), workers=2, duration=0.3).run()
+        self.assertGreater(result.requests, 0)
+        self.assertLess(result.duration, 2)
+
+    def test_file_payload_sent_every_time(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as data:
+            data.write("bench payload")
+        self.addCleanup(os.remove, data.name)
+        filename = self.write_http(f'POST http://localhost:8000/post\n< "{data.name}"\n')
+        comp = BenchCompiler(get_config(filename)).prepare()
+        self.assertFalse(comp.is_dynamic)
+        for _ in range(3):
+            request = comp.next_request()
+            self.assertEqual("13", request.headers["Content-Length"])
+            response = comp.send_request(request, comp.session)
+            self.assertEqual("bench payload", response.json()["data"])
+        # handle opened while loading payload is not left open
+        self.assertTrue(comp.httpdef.payload.data.closed)
+        result = LoadGenerator(get_config(filename), workers=2, requests=6).run()
+        self.assertEqual({200: 6}, result.status_codes)
+
+    def test_connection_errors_counted(self):
+        filename = self.write_http("GET http://localhost:1/get\n")
+        result = LoadGenerator(get_config(filename), requests=3).run()
+        self.assertEqual(3, result.requests)
+        self.assertEqual({"ConnectionError": 3}, result.errors)
+        self.assertEqual(1.0, result.error_rate)
+
+
+class OpenLoopTest(HttpFileTestCase):
+    def test_arrivals(self):
+        self.assertEqual([0.25, 0.5, 0.75, 1.0], list(ArrivalProfile.constant(4, 1).get_arrivals()))
+        # fraction of a request is carried to next step
+        self.assertEqual(
+            [2 / 3, 1 + 1 / 3, 2.0], list(ArrivalProfile.steps([(1.5, 1), (1.5, 1)]).get_arrivals())
+        )
+        ramp = list(ArrivalProfile.ramp_up(10, 2, 4).get_arrivals())
+        # 10 while ramping up (half of plateau rate), 20 in plateau
+        self.assertEqual(30, len(ramp))
+        self.assertEqual(10, sum(1 for offset in ramp if offset <= 2 + 1e-9))
+        self.assertEqual(ramp, sorted(ramp))
+        self.assertAlmostEqual(4.0, ramp[-1])
+
+    def test_latency_from_intended_start(self):
+        filename = self.write_http("GET http://localhost:8000/delay/0.1\n")
+        generator = OpenLoopGenerator(
+            get_config(filename), ArrivalProfile.constant(40, 0.5), workers=1, backlog=5
+        )
+        result = generator.run()
+        self.assertEqual("open", result.mode)
+        # single worker can send ~10 requests per second, rest wait or are dropped
+        self.assertGreater(result.dropped, 0)
+        self.assertGreater(result.late, 0)
+        self.assertEqual(20, result.requests + result.dropped)
+        # waiting time is part of latency, not of service time
+        self.assertGreater(result.histogram.max, result.service_histogram.max * 2)
+        data = result.to_dict()
+        self.assertEqual(result.dropped, data["dropped"])
+        self.assertEqual(data, BenchResult.from_dict(data).to_dict())
+
+
+class MultiProcessTest(HttpFileTestCase):
+    def test_results_merged_across_processes(self):
+        filename = self.write_http("GET http://localhost:8000/get\n")
+        snapshots = []
+        generator = MultiProcessLoadGenerator(
+            get_config(filename), 2, workers=2, duration=1, interval=0.2, on_snapshot=snapshots.append
+        )
+        self.assertEqual([{"workers": 2, "duration": 1}] * 2, [generator.get_process_options(i) for i in range(2)])
+        result = generator.run()
+        self.assertEqual(2, result.processes)
+        self.assertGreater(result.requests, 0)
+        self.assertEqual(result.requests, result.histogram.count)
+        self.assertTrue(snapshots)
+        # snapshots are cumulative
+        self.assertLessEqual(snapshots[-1].requests, result.requests)
+
+    def test_load_split(self):
+        filename = self.write_http("GET http://localhost:8000/get\n")
+        generator = MultiProcessLoadGenerator(
+            get_config(filename), 3, requests=10, profile=ArrivalProfile.constant(30, 1)
+        )
+        options = [generator.get_process_options(i) for i in range(3)]
+        self.assertEqual([4, 3, 3], [option["requests"] for option in options])
+        self.assertEqual([10.0] * 3, [option["profile"].segments[0].start_rate for option in options])
+        result = generator.run()
+        self.assertEqual(10, result.requests)
+        self.assertEqual("open", result.mode)
+
+    def test_process_failure(self):
+        generator = MultiProcessLoadGenerator(get_config("/tmp/missing-bench.http"), 2, requests=2)
+        with self.assertRaises(BenchProcessException):
+            generator.run()
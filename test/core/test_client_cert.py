@@ -0,0 +1,206 @@
+import os
+import ssl
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import requests_pkcs12
+
+from dothttp.parse.adapter_pool import get_session_stats
+from dothttp.parse.client_cert import ClientCertSessions, PemCertAdapter, hash_password
+from dothttp.parse.request_base import RequestBase
+from test import TestBase
+from test.core.test_certs import cert_base
+
+cert_file = f"{cert_base}/cert.crt"
+key_file = f"{cert_base}/key.key"
+p12_file = f"{cert_base}/badssl.com-client.p12"
+
+
+class OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+class ClientCertSessionsTest(unittest.TestCase):
+    def setUp(self):
+        self.sessions = ClientCertSessions(max_sessions=2)
+        self.addCleanup(self.sessions.close)
+
+    def test_p12_decrypted_once(self):
+        with mock.patch.object(
+            requests_pkcs12, "_create_sslcontext", wraps=requests_pkcs12._create_sslcontext
+        ) as create:
+            session = self.sessions.get_p12_session(p12_file, "badssl.com", True)
+            self.assertIs(session, self.sessions.get_p12_session(p12_file, "badssl.com", True))
+            self.assertEqual(1, create.call_count)
+            # different password is a different identity
+            with self.assertRaises(ValueError):
+                self.sessions.get_p12_session(p12_file, "wrong", True)
+        # password itself is not kept
+        self.assertEqual(hash_password("badssl.com"), session.client_cert.password_hash)
+
+    def test_reloaded_when_modified(self):
+        with tempfile.TemporaryDirectory() as directory:
+            copy = os.path.join(directory, "cert.crt")
+            with open(cert_file) as src, open(copy, "w") as dest:
+                dest.write(src.read())
+            session = self.sessions.get_pem_session(copy, key_file, True)
+            os.utime(copy, ns=(1, 1))
+            self.assertIsNot(session, self.sessions.get_pem_session(copy, key_file, True))
+            self.assertEqual(1, len(self.sessions))
+
+    def test_bounded(self):
+        first = self.sessions.get_pem_session(cert_file, key_file, True)
+        self.sessions.get_pem_session(cert_file, key_file, False)
+        with mock.patch.object(first, "close") as close:
+            self.sessions.get_p12_session(p12_file, "badssl.com", True)
+        # evicted session can still be in use by other threads
+        close.assert_not_called()
+        self.assertEqual(2, len(self.sessions))
+        self.assertIsNot(first, self.sessions.get_pem_session(cert_file, key_file, True))
+
+    def test_missing_certificate(self):
+        self.assertIsNone(self.sessions.get_pem_session("", None, True))
+        with self.assertRaises(FileNotFoundError):
+            self.sessions.get_p12_session("missing.p12", None, True)
+
+
+class ClientCertRequestTest(TestBase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("localhost", 0), OkHandler)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert_file, key_file)
+        cls.server.socket = context.wrap_socket(cls.server.socket, server_side=True)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_connection_reused(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".http", delete=False) as f:
+            f.write(
+                "@insecure\n"
+                f'GET "https://localhost:{self.server.server_port}/"\n'
+                f'certificate(cert="{cert_file}", key="{key_file}")\n'
+            )
+        self.addCleanup(os.remove, f.name)
+        mounts = len(RequestBase.global_session.adapters)
+        sessions = set()
+        for _ in range(3):
+            comp = self.get_req_comp(f.name)
+            self.assertEqual(200, comp.get_response().status_code)
+            sessions.add(id(comp.get_session()))
+        self.assertEqual(1, len(sessions))
+        self.assertEqual(mounts, len(RequestBase.global_session.adapters))
+        stats = get_session_stats(comp.get_session())[f"https://localhost:{self.server.server_port}"]
+        self.assertEqual(3, stats["requests"])
+        self.assertEqual(1, stats["connections"])
+
+
+def write_self_signed(directory):
+    """certificate (and key) for localhost, used by server and as client certificate"""
+    import datetime
+
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName("localhost")]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "client.crt")
+    key_path = os.path.join(directory, "client.key")
+    with open(cert_path, "wb") as f:
+        f.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            )
+        )
+    return cert_path, key_path
+
+
+class FailOnceHandler(OkHandler):
+    requests = 0
+
+    def do_GET(self):
+        FailOnceHandler.requests += 1
+        if FailOnceHandler.requests == 1:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        super().do_GET()
+
+
+class ClientCertRetryTest(TestBase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.cert_file, cls.key_file = write_self_signed(cls.directory.name)
+        cls.server = ThreadingHTTPServer(("localhost", 0), FailOnceHandler)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cls.cert_file, cls.key_file)
+        # handshake fails without client certificate
+        context.verify_mode = ssl.CERT_REQUIRED
+        context.load_verify_locations(cls.cert_file)
+        cls.server.socket = context.wrap_socket(cls.server.socket, server_side=True)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.directory.cleanup()
+
+    def test_certificate_with_retry(self):
+        FailOnceHandler.requests = 0
+        with tempfile.NamedTemporaryFile("w", suffix=".http", delete=False) as f:
+            f.write(
+                "@insecure\n"
+                f'GET "https://localhost:{self.server.server_port}/"\n'
+                f'certificate(cert="{self.cert_file}", key="{self.key_file}")\n'
+                "retry(total=2, status_forcelist=[503])\n"
+            )
+        self.addCleanup(os.remove, f.name)
+        for _ in range(2):
+            comp = self.get_req_comp(f.name)
+            self.assertEqual(200, comp.get_response().status_code)
+        # first response is retried
+        self.assertEqual(3, FailOnceHandler.requests)
+        adapter = comp._create_retry_adapter()
+        # built with client certificate, same adapter for every request
+        self.assertIsInstance(adapter, PemCertAdapter)
+        self.assertIs(adapter, comp._create_retry_adapter())
+        self.assertIsNotNone(adapter.max_retries.status_forcelist)
@@ -0,0 +1,150 @@
+import os
+import tempfile
+import time
+import unittest
+from http.cookiejar import Cookie, LWPCookieJar
+from unittest import mock
+
+from dothttp.parse.cookie_store import CookieStore
+
+
+def make_cookie(name, value, domain="example.com", path="/"):
+    return Cookie(
+        version=0,
+        name=name,
+        value=value,
+        port=None,
+        port_specified=False,
+        domain=domain,
+        domain_specified=False,
+        domain_initial_dot=False,
+        path=path,
+        path_specified=True,
+        secure=False,
+        expires=int(time.time()) + 3600,
+        discard=False,
+        comment=None,
+        comment_url=None,
+        rest={},
+    )
+
+
+def read_cookies(path):
+    jar = LWPCookieJar(path)
+    jar.load()
+    return {cookie.name: cookie.value for cookie in jar}
+
+
+class CookieStoreTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "cookiejar")
+
+    def get_store(self, save_delay=0):
+        store = CookieStore(self.path, save_delay=save_delay)
+        store.load()
+        self.addCleanup(store.flush)
+        return store
+
+    def test_created_on_load(self):
+        self.get_store()
+        self.assertTrue(os.path.exists(self.path))
+        self.assertEqual({}, read_cookies(self.path))
+
+    def test_saves_debounced(self):
+        store = self.get_store(save_delay=60)
+        with mock.patch.object(store, "sync", wraps=store.sync) as sync:
+            for index in range(10):
+                store.set_cookie(make_cookie(f"c{index}", "v"))
+                store.schedule_save()
+            self.assertEqual(0, sync.call_count)
+            store.flush()
+            self.assertEqual(1, sync.call_count)
+            # nothing changed since
+            store.flush()
+            store.schedule_save()
+            self.assertEqual(1, sync.call_count)
+        self.assertEqual(10, len(read_cookies(self.path)))
+
+    def test_saved_after_delay(self):
+        store = self.get_store(save_delay=0.05)
+        store.set_cookie(make_cookie("a", "1"))
+        store.schedule_save()
+        for _ in range(100):
+            if store.saves:
+                break
+            time.sleep(0.05)
+        self.assertEqual({"a": "1"}, read_cookies(self.path))
+
+    def test_timer_restarted_on_change(self):
+        store = CookieStore(self.path, save_delay=1, max_save_delay=3)
+        store.load()
+        self.addCleanup(store.flush)
+        with mock.patch("dothttp.parse.cookie_store.threading.Timer") as timer, mock.patch(
+            "dothttp.parse.cookie_store.time.monotonic"
+        ) as monotonic:
+            for now in [10, 10.5, 11, 12.5]:
+                monotonic.return_value = now
+                store.set_cookie(make_cookie("a", str(now)))
+                store.schedule_save()
+            # every change restarts timer, but save is not delayed past 3 seconds
+            self.assertEqual([1, 1, 1, 0.5], [call.args[0] for call in timer.call_args_list])
+            self.assertEqual(3, timer.return_value.cancel.call_count)
+            store.flush()
+            monotonic.return_value = 20
+            store.set_cookie(make_cookie("a", "20"))
+            store.schedule_save()
+            self.assertEqual(1, timer.call_args.args[0])
+        self.assertEqual({"a": "12.5"}, read_cookies(self.path))
+
+    def test_load_not_tracked(self):
+        first = self.get_store()
+        first.set_cookie(make_cookie("a", "1"))
+        first.flush()
+        second = self.get_store()
+        self.assertFalse(second.is_dirty)
+        self.assertEqual(["a"], [cookie.name for cookie in second])
+
+    def test_merged_across_stores(self):
+        first = self.get_store()
+        second = self.get_store()
+        first.set_cookie(make_cookie("a", "1"))
+        first.set_cookie(make_cookie("shared", "first"))
+        first.flush()
+        second.set_cookie(make_cookie("b", "2"))
+        second.set_cookie(make_cookie("shared", "second"))
+        second.flush()
+        # cookies of first process are not lost, latest change wins
+        self.assertEqual({"a": "1", "b": "2", "shared": "second"}, read_cookies(self.path))
+        self.assertEqual("1", {c.name: c.value for c in second}["a"])
+
+    def test_unchanged_cookie_does_not_overwrite_newer_value(self):
+        first = self.get_store()
+        first.set_cookie(make_cookie("session", "1"))
+        first.set_cookie(make_cookie("stale", "1"))
+        first.flush()
+        second = self.get_store()
+        third = self.get_store()
+        second.set_cookie(make_cookie("session", "2"))
+        second.clear("example.com", "/", "stale")
+        second.flush()
+        # third loaded `session` and `stale` before second changed them, but never touched them
+        third.set_cookie(make_cookie("other", "x"))
+        third.flush()
+        self.assertEqual({"session": "2", "other": "x"}, read_cookies(self.path))
+        self.assertEqual({"session": "2", "other": "x"}, {c.name: c.value for c in third})
+
+    def test_removed_cookie_not_resurrected(self):
+        first = self.get_store()
+        first.set_cookie(make_cookie("a", "1"))
+        first.set_cookie(make_cookie("b", "2"))
+        first.flush()
+        second = self.get_store()
+        second.clear("example.com", "/", "a")
+        second.flush()
+        self.assertEqual({"b": "2"}, read_cookies(self.path))
+        # set again, after removal
+        second.set_cookie(make_cookie("a", "3"))
+        second.flush()
+        self.assertEqual({"a": "3", "b": "2"}, read_cookies(self.path))
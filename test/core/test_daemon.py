@@ -0,0 +1,123 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from dothttp import daemon
+from dothttp.daemon import Daemon, request, run_with_daemon
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+http_file = f"{dir_path}/requests/defaultget.http"
+
+
+@unittest.skipUnless(hasattr(daemon.socket, "AF_UNIX"), "unix sockets are not supported")
+class DaemonTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "daemon.sock")
+        self.daemon = Daemon(self.path)
+        self.daemon.bind()
+        thread = threading.Thread(target=self.daemon.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(self.daemon.shutdown)
+
+    def run_cli(self, argv):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        exit_code = run_with_daemon(argv, self.path, stdout, stderr)
+        return exit_code, stdout.getvalue(), stderr.getvalue()
+
+    def test_same_output_as_in_process(self):
+        exit_code, stdout, _ = self.run_cli([http_file, "--curl"])
+        self.assertEqual(0, exit_code)
+        in_process = subprocess.run(
+            [sys.executable, "-m", "dothttp", http_file, "--curl"],
+            env={**os.environ, daemon.NO_DAEMON_ENV: "1"},
+            capture_output=True,
+            text=True,
+        )
+        self.assertEqual(in_process.stdout, stdout)
+        self.assertIn("curl -X GET", stdout)
+
+    def test_client_working_directory(self):
+        cwd = os.getcwd()
+        os.chdir(os.path.dirname(http_file))
+        self.addCleanup(os.chdir, cwd)
+        exit_code, stdout, _ = self.run_cli([os.path.basename(http_file), "--curl"])
+        self.assertEqual(0, exit_code)
+        self.assertIn("https://dothttp.azurewebsites.net", stdout)
+        # daemon's own directory is restored
+        self.assertEqual(os.path.dirname(http_file), os.getcwd())
+
+    def test_exit_code(self):
+        exit_code, _, stderr = self.run_cli([])
+        self.assertEqual(2, exit_code)
+        self.assertIn("usage: dothttp", stderr)
+
+    def test_status(self):
+        self.run_cli([http_file, "--curl"])
+        status = request({"command": daemon.STATUS}, self.path)
+        self.assertEqual(os.getpid(), status["pid"])
+        self.assertEqual(1, status["runs"])
+
+    def test_version_mismatch(self):
+        response = request({"command": daemon.RUN, "version": "other", "argv": []}, self.path)
+        self.assertIn("error", response)
+        self.assertEqual(0, self.daemon.runs)
+
+    def test_not_running(self):
+        self.assertIsNone(run_with_daemon([http_file], self.path + ".missing"))
+        with mock.patch.dict(os.environ, {daemon.NO_DAEMON_ENV: "1"}):
+            self.assertIsNone(run_with_daemon([http_file], self.path))
+
+    def test_stdin_batch_in_process(self):
+        # daemon doesn't have client's stdin
+        for argv in (["--batch"], ["--batch", "--parallel", "2"], ["--batch=-"]):
+            self.assertTrue(daemon.reads_stdin(argv))
+            self.assertIsNone(run_with_daemon(argv, self.path))
+        self.assertFalse(daemon.reads_stdin(["--batch", "jobs.jsonl"]))
+        self.assertEqual(0, self.daemon.runs)
+
+    def write_http(self, content):
+        with tempfile.NamedTemporaryFile("w", suffix=".http", delete=False) as f:
+            f.write(content)
+        self.addCleanup(os.remove, f.name)
+        return f.name
+
+    def test_runs_are_like_fresh_processes(self):
+        home = tempfile.TemporaryDirectory()
+        self.addCleanup(home.cleanup)
+        cache_dir = os.path.join(home.name, "models")
+        set_cookie = self.write_http('GET "http://localhost:8000/cookies/set?session=1"')
+        get_cookies = self.write_http('GET "http://localhost:8000/cookies"')
+        with mock.patch.dict(os.environ, {"HOME": home.name, "DOTHTTP_MODEL_CACHE_DIR": cache_dir}):
+            exit_code, stdout, _ = self.run_cli([set_cookie])
+            self.assertEqual(0, exit_code)
+            self.assertIn('"session": "1"', stdout)
+            # session cookie is not written to cookie file, new process doesn't have it
+            exit_code, stdout, _ = self.run_cli([get_cookies])
+            self.assertEqual(0, exit_code)
+            self.assertNotIn("session", stdout)
+        # paths are resolved from environment of run
+        self.assertTrue(os.path.exists(os.path.join(home.name, ".dothttp.cookiejar")))
+        self.assertTrue(os.listdir(cache_dir))
+
+    def test_busy_daemon_runs_in_process(self):
+        self.daemon._run_lock.acquire()
+        self.addCleanup(self.daemon._run_lock.release)
+        self.assertIsNone(run_with_daemon([http_file, "--curl"], self.path))
+        self.assertEqual(0, self.daemon.runs)
+
+    def test_stop(self):
+        self.assertEqual({"stopping": True}, request({"command": daemon.STOP}, self.path))
+        for _ in range(100):
+            if not os.path.exists(self.path):
+                break
+            threading.Event().wait(0.05)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertIsNone(run_with_daemon([http_file], self.path))
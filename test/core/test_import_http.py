@@ -2,9 +2,14 @@ import os
 import tempfile
 import unittest
 
-from dothttp.exceptions import HttpFileException, HttpFileSyntaxException
+from dothttp.exceptions import (
+    HttpFileException,
+    HttpFileImportCycleException,
+    HttpFileSyntaxException,
+)
 from dothttp.models.parse_models import FileName, ImportStmt, MultidefHttp
-from dothttp.parse import BaseModelProcessor, PropertyProvider, dothttp_model
+from dothttp.parse import BaseModelProcessor, PropertyProvider, dothttp_model, model_cache
+from dothttp.parse.import_graph import ImportResolver
 
 
 class TestBaseModelProcessor(unittest.TestCase):
@@ -102,3 +107,67 @@ class TestBaseModelProcessor(unittest.TestCase):
         self.assertEqual(import_list[0].urlwrap.url, "https://httpbin.org/1")
         self.assertEqual(import_list[1].urlwrap.url, "https://httpbin.org/2")
         self.assertEqual(import_list[2].urlwrap.url, "https://httpbin.org/3")
+
+
+class ImportGraphTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.dir.name, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_diamond_import_loaded_once(self):
+        self.write("d.http", "@name('d') GET 'https://httpbin.org/d'")
+        self.write("b.http", "import 'd.http'; @name('b') GET 'https://httpbin.org/b'")
+        self.write("c.http", "import 'd.http'; @name('c') GET 'https://httpbin.org/c'")
+        root = self.write(
+            "a.http",
+            "import 'b.http'; import 'c.http'; @name('a') GET 'https://httpbin.org/a'",
+        )
+        model = dothttp_model.model_from_str(open(root).read())
+        import_list = []
+        graph = BaseModelProcessor._load_imports(
+            model, root, PropertyProvider(), import_list
+        )
+        self.assertEqual(["b", "d", "c"], [http.namewrap.name for http in import_list])
+        self.assertEqual(3, len(graph))
+        d_path = os.path.realpath(os.path.join(self.dir.name, "d.http"))
+        self.assertEqual([d_path], graph.files[os.path.realpath(os.path.join(self.dir.name, "c.http"))].imports)
+
+    def test_import_cycle(self):
+        self.write("b.http", "import 'c.http'; GET 'https://httpbin.org/b'")
+        self.write("c.http", "import 'b.http'; GET 'https://httpbin.org/c'")
+        root = self.write("a.http", "import 'b.http'; GET 'https://httpbin.org/a'")
+        model = dothttp_model.model_from_str(open(root).read())
+        with self.assertRaises(HttpFileImportCycleException) as context:
+            BaseModelProcessor._load_imports(model, root, PropertyProvider(), [])
+        a, b, c = (os.path.realpath(os.path.join(self.dir.name, name)) for name in ["a.http", "b.http", "c.http"])
+        self.assertEqual(f"import cycle detected: `{a} -> {b} -> {c} -> {b}`", context.exception.message)
+
+    def test_import_cycle_to_root(self):
+        self.write("b.http", "import 'a.http'; GET 'https://httpbin.org/b'")
+        root = self.write("a.http", "import 'b.http'; GET 'https://httpbin.org/a'")
+        model = dothttp_model.model_from_str(open(root).read())
+        with self.assertRaises(HttpFileImportCycleException) as context:
+            BaseModelProcessor._load_imports(model, root, PropertyProvider(), [])
+        a, b = (os.path.realpath(os.path.join(self.dir.name, name)) for name in ["a.http", "b.http"])
+        self.assertEqual(f"import cycle detected: `{a} -> {b} -> {a}`", context.exception.message)
+
+    def test_modified_import_is_reloaded(self):
+        resolver = ImportResolver(model_cache)
+        imported = self.write("b.http", "GET 'https://httpbin.org/b'")
+        root = self.write("a.http", "import 'b.http'; GET 'https://httpbin.org/a'")
+        model = dothttp_model.model_from_str(open(root).read())
+        graph = resolver.resolve(model, root)
+        self.assertEqual("https://httpbin.org/b", list(graph)[0][0].allhttps[0].urlwrap.url)
+        with open(imported, "w") as f:
+            f.write("GET 'https://httpbin.org/changed'")
+        os.utime(imported, ns=(0, 0))
+        graph = resolver.resolve(model, root)
+        self.assertEqual("https://httpbin.org/changed", list(graph)[0][0].allhttps[0].urlwrap.url)
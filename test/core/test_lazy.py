@@ -0,0 +1,60 @@
+import os
+import sys
+import tempfile
+import unittest
+
+from dothttp.utils.lazy import LazyAttribute, LazyModule, LazyObject
+
+
+class LazyTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        package = os.path.join(directory.name, "lazy_probe")
+        os.mkdir(package)
+        with open(os.path.join(package, "__init__.py"), "w") as f:
+            f.write("class Probe:\n    pass\n")
+        with open(os.path.join(package, "sub.py"), "w") as f:
+            f.write("VALUE = 1\n")
+        sys.path.insert(0, directory.name)
+        self.addCleanup(sys.path.remove, directory.name)
+        self.addCleanup(lambda: [sys.modules.pop(name, None) for name in ("lazy_probe", "lazy_probe.sub")])
+
+    def test_module_loaded_on_access(self):
+        module = LazyModule("lazy_probe")
+        self.assertNotIn("lazy_probe", sys.modules)
+        self.assertFalse(module.is_loaded)
+        self.assertTrue(module.Probe)
+        self.assertIn("lazy_probe", sys.modules)
+        # submodule is imported on access
+        self.assertEqual(1, module.sub.VALUE)
+
+    def test_missing_module_falsy(self):
+        self.assertFalse(LazyModule("lazy_probe_missing"))
+        self.assertFalse(LazyAttribute("lazy_probe_missing", "Probe"))
+        with self.assertRaises(ImportError):
+            LazyAttribute("lazy_probe_missing", "Probe")()
+
+    def test_isinstance_without_import(self):
+        probe = LazyAttribute("lazy_probe", "Probe")
+        self.assertFalse(isinstance(object(), probe))
+        self.assertFalse(isinstance(object(), (int, probe)))
+        self.assertNotIn("lazy_probe", sys.modules)
+        instance = probe()
+        self.assertTrue(isinstance(instance, probe))
+        self.assertFalse(isinstance(object(), probe))
+        self.assertTrue(issubclass(type(instance), probe))
+        self.assertFalse(isinstance(object(), LazyAttribute("lazy_probe_missing", "Probe")))
+
+    def test_object_built_once(self):
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return "value"
+
+        lazy = LazyObject(factory)
+        self.assertEqual([], calls)
+        self.assertEqual("VALUE", lazy.upper())
+        self.assertEqual("value", lazy.lower())
+        self.assertEqual([1], calls)
@@ -0,0 +1,32 @@
+import subprocess
+import sys
+import unittest
+
+from dothttp.parse import dothttp_model, metamodel_registry
+from dothttp.parse.request_base import dothttp_model as request_base_model
+
+
+class MetamodelRegistryTest(unittest.TestCase):
+    def test_single_shared_metamodel(self):
+        self.assertIs(dothttp_model, request_base_model)
+        self.assertIs(metamodel_registry.get(), metamodel_registry.get())
+        self.assertIs(dothttp_model["HTTP"], metamodel_registry.get()["HTTP"])
+
+    def test_not_built_on_import(self):
+        # run in fresh interpreter, as other tests would have built it already
+        output = subprocess.check_output(
+            [
+                sys.executable,
+                "-c",
+                "import dothttp.__main__;"
+                "from dothttp.parse import metamodel_registry;"
+                "print(metamodel_registry.is_built)",
+            ],
+            text=True,
+        )
+        self.assertEqual("False", output.strip())
+
+    def test_built_on_first_use(self):
+        model = dothttp_model.model_from_str("GET https://httpbin.org/get")
+        self.assertTrue(metamodel_registry.is_built)
+        self.assertEqual("https://httpbin.org/get", model.allhttps[0].urlwrap.url)
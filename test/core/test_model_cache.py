@@ -0,0 +1,126 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from dothttp.parse import dothttp_model
+from dothttp.parse.model_cache import DEFAULT_MODEL_CACHE_DIR, ModelCache, dump_model, get_cache_dir
+
+base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+example_file = os.path.join(base_dir, "examples", "example.http")
+
+
+def positions(obj, path="root"):
+    """flattens textx model to (path, value) including positions, skips parent links"""
+    if isinstance(obj, list):
+        for index, item in enumerate(obj):
+            yield from positions(item, f"{path}[{index}]")
+    elif hasattr(type(obj), "_tx_fqn"):
+        yield path, type(obj).__name__
+        for key, value in sorted(vars(obj).items()):
+            if key in ("parent",) or key.startswith("_tx") and key not in (
+                "_tx_position",
+                "_tx_position_end",
+            ):
+                continue
+            yield from positions(value, f"{path}.{key}")
+    else:
+        yield path, obj
+
+
+class ModelCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        with open(example_file) as f:
+            self.content = f.read()
+
+    def test_hit_returns_identical_model(self):
+        cache = ModelCache(dothttp_model)
+        parsed = cache.model_from_str(self.content)
+        cached = cache.model_from_str(self.content)
+        self.assertIsNot(parsed, cached)
+        self.assertEqual(list(positions(parsed)), list(positions(cached)))
+        self.assertEqual({"hits": 1, "misses": 1, "disk_hits": 0, "size": 1, "maxsize": 128}, cache.stats())
+
+    def test_parent_links_restored(self):
+        cache = ModelCache(dothttp_model)
+        cache.model_from_str(self.content)
+        cached = cache.model_from_str(self.content)
+        http = cached.allhttps[0]
+        self.assertIs(http.parent, cached)
+        self.assertIs(http.urlwrap.parent, http)
+
+    def test_cached_model_can_be_mutated(self):
+        cache = ModelCache(dothttp_model)
+        first = cache.model_from_str(self.content)
+        count = len(first.allhttps)
+        first.allhttps += first.allhttps
+        second = cache.model_from_str(self.content)
+        self.assertEqual(count, len(second.allhttps))
+
+    def test_lru_eviction(self):
+        cache = ModelCache(dothttp_model, maxsize=1)
+        cache.model_from_str("GET https://httpbin.org/get")
+        cache.model_from_str("GET https://httpbin.org/post")
+        cache.model_from_str("GET https://httpbin.org/get")
+        self.assertEqual(0, cache.hits)
+        self.assertEqual(3, cache.misses)
+        self.assertEqual(1, cache.stats()["size"])
+
+    def test_disk_store(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            ModelCache(dothttp_model, cache_dir=cache_dir).model_from_str(self.content)
+            self.assertEqual(1, len(os.listdir(cache_dir)))
+            # new process, empty in-memory cache
+            cache = ModelCache(dothttp_model, cache_dir=cache_dir)
+            model = cache.model_from_str(self.content)
+            self.assertEqual(1, cache.disk_hits)
+            self.assertEqual(0, cache.misses)
+            self.assertEqual(
+                list(positions(dothttp_model.model_from_str(self.content))),
+                list(positions(model)),
+            )
+
+    def test_corrupted_disk_entry_is_ignored(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ModelCache(dothttp_model, cache_dir=cache_dir)
+            key = cache.get_key(self.content)
+            with open(os.path.join(cache_dir, f"{key}.json"), "wb") as f:
+                f.write(b"not json")
+            model = cache.model_from_str(self.content)
+            self.assertEqual(1, cache.misses)
+            self.assertEqual(dump_model(dothttp_model.model_from_str(self.content)), dump_model(model))
+
+    def test_cache_dir(self):
+        with mock.patch.dict(os.environ, clear=True):
+            self.assertEqual(os.path.expanduser(DEFAULT_MODEL_CACHE_DIR), get_cache_dir())
+        with mock.patch.dict(os.environ, {"DOTHTTP_MODEL_CACHE_DIR": "/tmp/models"}):
+            self.assertEqual("/tmp/models", get_cache_dir())
+        # empty value disables disk store
+        with mock.patch.dict(os.environ, {"DOTHTTP_MODEL_CACHE_DIR": ""}):
+            self.assertIsNone(get_cache_dir())
+
+    def test_disk_store_is_bounded(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ModelCache(dothttp_model, cache_dir=cache_dir)
+            cache.model_from_str(self.content)
+            entry_size = os.path.getsize(os.path.join(cache_dir, os.listdir(cache_dir)[0]))
+            cache.max_disk_bytes = entry_size * 3
+            contents = [f"{self.content}\n# {index}" for index in range(10)]
+            for content in contents:
+                cache.model_from_str(content)
+            entries = os.listdir(cache_dir)
+            self.assertLessEqual(len(entries), 3)
+            # latest entry is kept
+            self.assertIn(f"{cache.get_key(contents[-1])}.json", entries)
+
+    def test_shared_cache_on_disk_only_for_cli(self):
+        from dothttp.cli import main
+        from dothttp.parse import model_cache
+
+        self.addCleanup(model_cache.set_cache_dir, None)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with mock.patch.dict(os.environ, {"DOTHTTP_MODEL_CACHE_DIR": cache_dir}), mock.patch(
+                "dothttp.cli.apply"
+            ):
+                main([example_file])
+            self.assertEqual(cache_dir, model_cache.cache_dir)
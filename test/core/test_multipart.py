@@ -0,0 +1,81 @@
+import os
+import tempfile
+from test import TestBase
+from test.core.test_request import dir_path
+from unittest import mock
+
+from requests.models import PreparedRequest, RequestEncodingMixin
+
+from dothttp.exceptions import DataFileChangedException
+from dothttp.utils.multipart import MultipartEncoder
+
+base_dir = f"{dir_path}/payload"
+
+
+class MultipartEncoderTest(TestBase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.filename = os.path.join(directory.name, "résumé.txt")
+        with open(self.filename, "wb") as f:
+            f.write(os.urandom(100_000))
+
+    def get_fields(self):
+        f = open(self.filename, "rb")
+        self.addCleanup(f.close)
+        return [
+            ("resume", ("résumé.txt", f, "text/plain")),
+            ("text", (None, "this is text part", "text/plain")),
+            ("bytes", (None, b"\x00\x01", None)),
+        ]
+
+    def test_same_as_requests(self):
+        encoder = MultipartEncoder(self.get_fields(), boundary="dothttpboundary", chunk_size=1000)
+        with mock.patch("urllib3.filepost.choose_boundary", return_value="dothttpboundary"):
+            expected, content_type = RequestEncodingMixin._encode_files(self.get_fields(), {})
+        self.assertEqual(content_type, encoder.content_type)
+        self.assertEqual(len(expected), encoder.len)
+        chunks = list(encoder)
+        self.assertEqual(expected, b"".join(chunks))
+        self.assertTrue(all(len(chunk) < 2000 for chunk in chunks))
+        # body can be sent again (redirects, retries)
+        self.assertEqual(expected, encoder.to_bytes())
+
+    def test_file_changed(self):
+        encoder = MultipartEncoder(self.get_fields())
+        with open(self.filename, "wb") as f:
+            f.write(b"short")
+        with self.assertRaises(DataFileChangedException):
+            encoder.to_bytes()
+
+    def test_unknown_size_is_chunked(self):
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, b"from pipe")
+        os.close(write_fd)
+        with os.fdopen(read_fd, "rb") as stream:
+            encoder = MultipartEncoder([("stream", ("stream", stream, None))])
+            self.assertIsNone(encoder.len)
+            request = PreparedRequest()
+            request.prepare_headers({})
+            request.prepare_body(data=encoder, files=None)
+            self.assertEqual("chunked", request.headers["Transfer-Encoding"])
+            self.assertNotIn("Content-Length", request.headers)
+            self.assertIn(b"from pipe", encoder.to_bytes())
+
+    def test_request_streams_files(self):
+        comp = self.get_request_comp(
+            f"{base_dir}/multipartfiles2.http",
+            properties=[f"filename={self.filename}", "data=this is text part"],
+        )
+        request = comp.get_request()
+        self.assertIsInstance(request.body, MultipartEncoder)
+        self.assertEqual(str(request.body.len), request.headers["Content-Length"])
+        self.assertNotIn("Transfer-Encoding", request.headers)
+        self.assertTrue(request.headers["content-type"].startswith("multipart/form-data; boundary="))
+        response = comp.get_response().json()
+        self.assertEqual(str(request.body.len), response["headers"]["Content-Length"])
+        self.assertEqual({"content2": "this is text part"}, response["form"])
+        self.assertIn("resume", response["files"])
+        # file handles are closed once request is sent
+        resume = comp.httpdef.payload.files[0][1][1]
+        self.assertTrue(resume.closed)
@@ -0,0 +1,73 @@
+import os
+import tempfile
+
+from dothttp.exceptions import ParameterException
+from dothttp.parse import UndefinedHttpToExtend, model_cache
+from dothttp.parse.name_index import NameIndex, find_duplicate_name
+from test import TestBase
+
+content = """
+@name("first")
+GET "https://httpbin.org/get"
+
+GET "https://httpbin.org/unnamed"
+
+@name("first")
+POST "https://httpbin.org/post"
+"""
+
+
+class NameIndexTest(TestBase):
+    def setUp(self) -> None:
+        self.https = model_cache.model_from_str(content).allhttps
+        self.name_index = NameIndex(self.https)
+
+    def test_lookup(self):
+        self.assertIs(self.https[0], self.name_index.get("first"))
+        self.assertIs(self.https[1], self.name_index.get("2"))
+        self.assertIs(self.https[2], self.name_index.get(3))
+        self.assertEqual(["first", "2", "first"], self.name_index.names)
+        with self.assertRaises(ParameterException):
+            self.name_index.get("4")
+        with self.assertRaises(ParameterException):
+            self.name_index.get("second")
+
+    def test_stale(self):
+        self.assertFalse(self.name_index.is_stale(self.https))
+        self.https.append(self.https[0])
+        self.assertTrue(self.name_index.is_stale(self.https))
+        self.assertTrue(self.name_index.is_stale(list(self.https)))
+
+    def test_find_duplicate_name(self):
+        self.assertEqual("first", find_duplicate_name(["first", None, "first"]))
+        self.assertEqual("2", find_duplicate_name(["2", None]))
+        self.assertEqual("1", find_duplicate_name([None, "1"]))
+        self.assertIsNone(find_duplicate_name(["first", None, "3"]))
+
+    def test_circular_base(self):
+        fd, filename = tempfile.mkstemp(suffix=".http")
+        with os.fdopen(fd, "w") as f:
+            f.write(
+                '@name("a"): "b"\nGET "https://httpbin.org/get"\n\n'
+                '@name("b"): "a"\nGET "https://httpbin.org/get"\n'
+            )
+        self.addCleanup(os.remove, filename)
+        with self.assertRaises(ParameterException) as context:
+            self.get_req_comp(filename, target="a")
+        self.assertEqual(
+            "incorrect paramter key: `a` value: `a` . message `Found circular reference`",
+            context.exception.message,
+        )
+
+    def test_undefined_base(self):
+        fd, filename = tempfile.mkstemp(suffix=".http")
+        with os.fdopen(fd, "w") as f:
+            f.write('@name("a"): "missing"\nGET "https://httpbin.org/get"\n')
+        self.addCleanup(os.remove, filename)
+        with self.assertRaises(UndefinedHttpToExtend) as context:
+            self.get_req_comp(filename, target="a")
+        self.assertEqual(
+            "http def with name `missing` not defined for http  with name `a`",
+            context.exception.message,
+        )
+
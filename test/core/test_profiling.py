@@ -0,0 +1,55 @@
+import os
+import pstats
+import tempfile
+
+from dothttp.utils.profiling import CPROFILE, SAMPLE, Profiler, format_profile_summary
+from test import TestBase
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+http_file = f"{dir_path}/requests/defaultget.http"
+
+
+class ProfilerTest(TestBase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def load_requests(self, count=5):
+        for _ in range(count):
+            self.get_request(http_file)
+
+    def test_cprofile(self):
+        output = os.path.join(self.directory, "run.prof")
+        with Profiler(CPROFILE, output) as profiler:
+            self.load_requests()
+        # pstats file
+        stats = pstats.Stats(output)
+        self.assertTrue(stats.total_calls)
+        top = profiler.get_top(5)
+        self.assertEqual(5, len(top))
+        # only dothttp functions, by cumulative time
+        self.assertTrue(all(stat.function.startswith("dothttp") for stat in top))
+        self.assertEqual(sorted(top, key=lambda stat: -stat.cumulative), top)
+        self.assertTrue(any("load_def" in stat.function for stat in profiler.get_top(50)))
+        self.assertIn("top dothttp functions", format_profile_summary(profiler))
+
+    def test_sample(self):
+        output = os.path.join(self.directory, "run.collapsed")
+        with Profiler(SAMPLE, output, interval=0.001) as profiler:
+            self.load_requests(20)
+        self.assertTrue(profiler.samples)
+        with open(output) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(profiler.samples), len(lines))
+        stack, _, count = lines[0].rpartition(" ")
+        self.assertTrue(count.isdigit())
+        self.assertIn(";", stack)
+        self.assertTrue(any("dothttp/parse" in line for line in lines))
+        top = profiler.get_top()
+        self.assertTrue(top)
+        self.assertLessEqual(top[0].own, top[0].cumulative)
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            Profiler("perf")
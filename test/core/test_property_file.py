@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+import unittest
+
+from dothttp.exceptions import (
+    PropertyFileException,
+    PropertyFileNotFoundException,
+    PropertyFileNotJsonException,
+)
+from dothttp.parse.property_file import PropertyFileCache
+
+
+class PropertyFileCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.cache = PropertyFileCache()
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as f:
+            f.write(content)
+        return path
+
+    def test_reused_until_modified(self):
+        path = self.write("prop.json", json.dumps({"*": {"a": "1"}}))
+        props = self.cache.load(path)
+        self.assertEqual({"*": {"a": "1"}}, props)
+        self.assertIs(props, self.cache.load(path))
+        self.assertEqual((1, 1), (self.cache.misses, self.cache.hits))
+
+        self.write("prop.json", json.dumps({"*": {"a": "10"}}))
+        self.assertEqual({"*": {"a": "10"}}, self.cache.load(path))
+        self.assertEqual(2, self.cache.misses)
+
+    def test_errors(self):
+        with self.assertRaises(PropertyFileNotFoundException):
+            self.cache.load(os.path.join(self.directory.name, "missing.json"))
+        path = self.write("invalid.json", "{")
+        for _ in range(2):
+            with self.assertRaises(PropertyFileNotJsonException):
+                self.cache.load(path)
+        self.assertEqual(1, self.cache.misses)
+        path = self.write("schema.yaml", "headers: 10")
+        with self.assertRaises(PropertyFileException):
+            self.cache.load(path)
+
+    def test_discover(self):
+        self.assertIsNone(self.cache.discover(self.directory.name))
+        yaml_path = self.write(".dothttp.yaml", "'*':\n  a: 1")
+        os.utime(self.directory.name, ns=(1, 1))
+        self.assertEqual(yaml_path, self.cache.discover(self.directory.name))
+        # json takes preference over yaml
+        json_path = self.write(".dothttp.json", "{}")
+        os.utime(self.directory.name, ns=(2, 2))
+        self.assertEqual(json_path, self.cache.discover(self.directory.name))
@@ -0,0 +1,128 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from dothttp.exceptions import PropertyCycleException
+from dothttp.utils.property_graph import PropertyGraph
+from dothttp.utils.property_util import PropertyProvider
+from test import TestBase
+
+
+class PropertyGraphTest(unittest.TestCase):
+    def test_order(self):
+        graph = PropertyGraph()
+        graph.add("a", {"b"})
+        graph.add("b", {"c"})
+        graph.add("c", set())
+        self.assertEqual(
+            ["c", "b", "a"], [node.key for node in graph.get_resolution_order(graph.nodes)]
+        )
+        # external references are not followed
+        self.assertEqual(
+            ["a", "b"],
+            [node.key for node in graph.get_resolution_order(["a", "b"], lambda name: name == "b")],
+        )
+
+    def test_cycle(self):
+        graph = PropertyGraph()
+        graph.add("a", {"b"})
+        graph.add("b", {"c"})
+        graph.add("c", {"a"})
+        with self.assertRaises(PropertyCycleException) as context:
+            graph.get_resolution_order(graph.nodes)
+        self.assertEqual("a -> b -> c -> a", context.exception.kwargs["cycle"])
+
+    def test_redeclaration(self):
+        graph = PropertyGraph()
+        graph.add("a", set())
+        graph.add("b", {"a"})
+        graph.add("a", {"b"})
+        self.assertEqual(
+            ["a", "b", "a#2"], [node.key for node in graph.get_resolution_order(graph.nodes)]
+        )
+        self.assertEqual(["b", "a#2"], graph.get_dependents(["a"]))
+
+
+class PropertyGraphIntegrationTest(TestBase):
+    def get_request_from_content(self, content, **kwargs):
+        with tempfile.NamedTemporaryFile("w", suffix=".http", delete=False) as f:
+            f.write(content)
+        self.addCleanup(os.remove, f.name)
+        return self.get_request(f.name, **kwargs)
+
+    def test_declaration_order_independent(self):
+        req = self.get_request_from_content(
+            """
+var total = (count + 1);
+var body = {"total": {{total}}, "name": {{name}}};
+var name = $"user-{count}";
+var count = 2;
+
+POST "https://httpbin.org/post"
+json({{body}})
+"""
+        )
+        self.assertEqual({"total": 3, "name": "user-2"}, json.loads(req.body))
+
+    def test_cycle_reported(self):
+        with self.assertRaises(PropertyCycleException) as context:
+            self.get_request_from_content(
+                """
+var a = (b + 1);
+var b = {{a}};
+
+GET "https://httpbin.org/get"
+"""
+            )
+        self.assertIn("a -> b -> a", context.exception.message)
+
+    def test_command_line_breaks_cycle(self):
+        req = self.get_request_from_content(
+            """
+var a = (b + 1);
+var b = {{a}};
+
+GET "https://httpbin.org/get?a={{a}}"
+""",
+            properties=["b=4"],
+        )
+        self.assertEqual("https://httpbin.org/get?a=5", req.url)
+
+    def test_reresolve_after_script(self):
+        req = self.get_request_from_content(
+            """
+var token = "old";
+var auth = $"Bearer {token}";
+
+@name("test")
+GET "https://httpbin.org/get"
+"Authorization": "{{auth}}"
+> {%
+client.properties.set("token", "new");
+%}
+""",
+            target="test",
+        )
+        self.assertEqual("Bearer new", req.headers["Authorization"])
+
+
+class SystemCommandTest(unittest.TestCase):
+    def test_memoized(self):
+        provider = PropertyProvider()
+        provider.enable_system_command()
+        provider.add_system_command_properties({"out": "echo hello"})
+        with mock.patch("subprocess.run") as run:
+            run.return_value.stdout = "hello"
+            self.assertEqual("hello", provider.resolve_system_command_prop("out"))
+            self.assertEqual("hello", provider.resolve_system_command_prop("out"))
+            self.assertEqual(1, run.call_count)
+            # redefined command is executed again
+            provider.add_system_command_properties({"out": "echo world"})
+            provider.resolve_system_command_prop("out")
+            self.assertEqual(2, run.call_count)
+            # next request runs it again
+            provider.forget_system_command_results()
+            provider.resolve_system_command_prop("out")
+            self.assertEqual(3, run.call_count)
@@ -0,0 +1,55 @@
+import unittest
+
+from dothttp.utils.property_template import (
+    MAX_CACHED_TEMPLATE_LENGTH,
+    PropertyReference,
+    compile_template,
+)
+from dothttp.utils.property_util import PropertyProvider
+
+
+class PropertyTemplateTest(unittest.TestCase):
+    def test_segments(self):
+        template = compile_template("https://{{host}}/{{ path = 'get' }}?a={{}}&b={{host}}")
+        self.assertEqual(
+            (
+                "https://",
+                PropertyReference("host", "host"),
+                "/",
+                PropertyReference(" path = 'get' ", "path"),
+                "?a={{}}&b=",
+                PropertyReference("host", "host"),
+                "",
+            ),
+            template.segments,
+        )
+        self.assertEqual(("host", "path"), template.keys)
+        self.assertEqual(
+            "https://a.com/get?a={{}}&b=a.com",
+            template.render({"host": "a.com", "path": "get"}),
+        )
+
+    def test_cached_per_string(self):
+        self.assertIs(compile_template("{{a}}"), compile_template("{{a}}"))
+        large = "{{a}}" + "a" * MAX_CACHED_TEMPLATE_LENGTH
+        self.assertIsNot(compile_template(large), compile_template(large))
+        self.assertFalse(compile_template("no properties").has_properties)
+
+    def test_render_with_provider(self):
+        content = 'https://{{host="httpbin.org"}}/{{path}}?a={{$expr:1+2}}&b={{$randomInt:3}}'
+        provider = PropertyProvider()
+        provider.add_infile_properties(content)
+        provider.add_command_line_property("path", "get")
+        updated = provider.get_updated_content(content)
+        self.assertRegex(updated, r"^https://httpbin.org/get\?a=3&b=\d+$")
+        self.assertEqual([], provider.errors)
+
+    def test_missing_property(self):
+        provider = PropertyProvider()
+        self.assertEqual("{{missing}}/{{a=1}}", provider.get_updated_content("{{missing}}/{{a=1}}"))
+        self.assertEqual({"missing", "a"}, provider.errors[0].kwargs["var"])
+
+    def test_object(self):
+        provider = PropertyProvider()
+        provider.add_env_property_from_dict({"obj": {"a": [1, 2]}})
+        self.assertEqual({"a": [1, 2]}, provider.get_updated_obj_content("{{obj}}"))
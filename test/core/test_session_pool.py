@@ -0,0 +1,58 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from dothttp.parse.request_base import RequestBase, RequestCompiler
+from dothttp.parse.session_pool import SessionPool, get_scope_key
+from dothttp.models.computed import Config
+
+
+class SessionScopeTest(unittest.TestCase):
+    def test_scope_key(self):
+        self.assertEqual(("global",), get_scope_key())
+        self.assertEqual(("named", "admin"), get_scope_key(None, "admin"))
+        self.assertEqual(("env", "prop.json", ("*", "dev")), get_scope_key("env", None, ["*", "dev"], "prop.json"))
+        self.assertEqual(("thread", threading.get_ident()), get_scope_key("thread"))
+        self.assertEqual(("global",), get_scope_key("unknown"))
+
+    def test_session_shares_connections(self):
+        pool = SessionPool()
+        jar = pool.get_cookie_jar(("named", "a"))
+        self.assertIs(jar, pool.get_cookie_jar(("named", "a")))
+        session = pool.get_session(("named", "a"), RequestBase.global_session, jar)
+        self.assertIs(session, pool.get_session(("named", "a"), RequestBase.global_session, jar))
+        self.assertIs(RequestBase.global_session.adapters, session.adapters)
+        self.assertIsNot(session, pool.get_session(("named", "b"), RequestBase.global_session, jar))
+
+
+class SessionIsolationTest(unittest.TestCase):
+    def setUp(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".http", delete=False) as f:
+            f.write(
+                '@name("set")\n'
+                'GET "http://localhost:8000/cookies/set"\n'
+                '? user = "{{user}}"\n\n'
+                '@name("get")\n'
+                'GET "http://localhost:8000/cookies"\n'
+            )
+        self.addCleanup(os.remove, f.name)
+        self.filename = f.name
+
+    def run_target(self, target, user):
+        config = Config(
+            file=self.filename, target=target, properties=[f"user={user}"], env=[],
+            curl=False, property_file=None, debug=False, info=False, no_cookie=False,
+            format=False, session_scope="named", session_name=user,
+        )
+        return RequestCompiler(config).get_response()
+
+    def test_parallel_named_sessions(self):
+        users = [f"user{index}" for index in range(8)]
+        with ThreadPoolExecutor(4) as executor:
+            list(executor.map(lambda user: self.run_target("set", user), users))
+            responses = list(executor.map(lambda user: self.run_target("get", user), users))
+        for user, response in zip(users, responses):
+            self.assertEqual({"user": user}, json.loads(response.text)["cookies"])
@@ -0,0 +1,151 @@
+import os
+import tempfile
+from unittest import mock
+
+from dothttp.exceptions import HttpFileException
+from dothttp.parse import model_cache
+from dothttp.parse.request_base import Config, RequestCompiler
+from dothttp.parse.splitter import split_http_blocks
+from test import TestBase
+
+content = """
+var host = "httpbin.org";
+
+@name("base")
+GET "https://{{host}}"
+? ("common", "value")
+
+@name("post"): "base"
+POST "/post"
+// @name("commented")
+json({
+    "text": "@name('in string')",
+})
+
+@name('script')
+GET "https://httpbin.org/get"
+> {%
+client.properties.set("@name", "value");
+%}
+
+@name(last): base
+PUT "/put"
+data("{{name=default}}")
+"""
+
+
+def generate_http_file(count):
+    return "\n".join(
+        f'@name("req{index}")\nGET "https://httpbin.org/get/{index}"\n? ("index", "{index}")\n'
+        for index in range(count)
+    )
+
+
+class FullParseCompiler(RequestCompiler):
+    target_only_parsing = False
+
+
+def get_compiler(filename, target, cls=RequestCompiler):
+    config = Config(
+        file=filename,
+        curl=False,
+        debug=False,
+        property_file=None,
+        env=[],
+        properties=[],
+        no_cookie=False,
+        format=False,
+        stdout=False,
+        experimental=False,
+        info=False,
+        target=target,
+    )
+    return cls(config)
+
+
+class TargetOnlyParsingTest(TestBase):
+    def write(self, text):
+        fd, filename = tempfile.mkstemp(suffix=".http")
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        self.addCleanup(os.remove, filename)
+        return filename
+
+    def test_split_ignores_strings_comments_and_scripts(self):
+        blocks = split_http_blocks(content)
+        self.assertEqual(
+            [("base", None), ("post", "base"), ("script", None), ("last", "base")],
+            [(block.name, block.base) for block in blocks.blocks],
+        )
+        self.assertEqual(content.index('@name("base")'), blocks.preamble_end)
+
+    def test_same_request_as_complete_parse(self):
+        filename = self.write(content)
+        for target in ["base", "post", "script", "last"]:
+            partial = get_compiler(filename, target)
+            full = get_compiler(filename, target, FullParseCompiler)
+            self.assertIsNotNone(getattr(partial.model, "http_blocks", None))
+            self.assertIsNone(getattr(full.model, "http_blocks", None))
+            partial_request = partial.get_request()
+            full_request = full.get_request()
+            self.assertEqual(full_request.method, partial_request.method)
+            self.assertEqual(full_request.url, partial_request.url)
+            self.assertEqual(full_request.body, partial_request.body)
+            self.assertEqual(
+                full.http._tx_position, partial.http._tx_position, target
+            )
+
+    def test_only_target_and_bases_are_parsed(self):
+        filename = self.write(content)
+        compiler = get_compiler(filename, "last")
+        self.assertEqual(
+            ["base", "last"],
+            [http.namewrap.name for http in compiler.model.allhttps],
+        )
+
+    def test_falls_back_for_unnamed_and_numbered_targets(self):
+        filename = self.write(
+            content.replace('@name("post"): "base"\n', '')
+        )
+        # unnamed definition is parsed along with `base` block
+        compiler = get_compiler(filename, "base")
+        self.assertIsNone(getattr(compiler.model, "http_blocks", None))
+        self.assertEqual(4, len(compiler.model.allhttps))
+        compiler = get_compiler(self.write(content), "2")
+        self.assertIsNone(getattr(compiler.model, "http_blocks", None))
+        self.assertEqual("post", compiler.http.namewrap.name)
+
+    def test_duplicate_names_still_rejected(self):
+        filename = self.write(content + '\n@name("post")\nGET "https://httpbin.org/get"\n')
+        with self.assertRaises(HttpFileException):
+            get_compiler(filename, "script")
+
+    def test_syntax_error_in_other_block_is_ignored(self):
+        filename = self.write(content + '\n@name("broken")\nGET "https://httpbin.org/get" ?\n')
+        compiler = get_compiler(filename, "post")
+        self.assertEqual("https://httpbin.org/post?common=value", compiler.get_request().url)
+        # reported when broken block is run, same as complete parse
+        with self.assertRaises(HttpFileException) as full:
+            get_compiler(filename, "broken", FullParseCompiler)
+        with self.assertRaises(HttpFileException) as partial:
+            get_compiler(filename, "broken")
+        self.assertEqual(full.exception.message, partial.exception.message)
+
+    def test_cold_parse_reads_only_target_chain(self):
+        text = generate_http_file(300)
+        filename = self.write(text)
+        parsed = []
+        original = model_cache.metamodel.model_from_str
+
+        def model_from_str(text, *args, **kwargs):
+            parsed.append(len(text))
+            return original(text, *args, **kwargs)
+
+        model_cache.clear()
+        self.addCleanup(model_cache.clear)
+        with mock.patch.object(model_cache.metamodel, "model_from_str", side_effect=model_from_str):
+            compiler = get_compiler(filename, "req150")
+        self.assertEqual("https://httpbin.org/get/150?index=150", compiler.get_request().url)
+        # one block, instead of complete file
+        self.assertTrue(parsed)
+        self.assertLess(sum(parsed), len(text) / 100)
@@ -0,0 +1,170 @@
+import io
+import os
+import tempfile
+from contextlib import redirect_stderr
+
+from dothttp.cli import main
+from dothttp.models.computed import Config
+from dothttp.parse.target_runner import MultiTargetRunner, TargetPlanner
+from test import TestBase
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+dependent_file = f"{dir_path}/multi/dependent.http"
+
+
+def get_config(file, **kwargs):
+    return Config(
+        file=file,
+        curl=False,
+        debug=False,
+        property_file=None,
+        env=[],
+        properties=[],
+        no_cookie=True,
+        format=False,
+        info=False,
+        target=None,
+        **kwargs,
+    )
+
+
+class TargetRunnerTest(TestBase):
+    def write_http(self, content):
+        with tempfile.NamedTemporaryFile("w", suffix=".http", delete=False) as f:
+            f.write(content)
+        self.addCleanup(os.remove, f.name)
+        return f.name
+
+    def test_plan(self):
+        nodes = TargetPlanner(get_config(dependent_file)).plan()
+        self.assertEqual(["login", "profile", "status", "echo"], [node.target for node in nodes])
+        self.assertEqual({"token"}, nodes[0].produces)
+        # through variable `auth`
+        self.assertEqual({0}, nodes[1].depends_on)
+        self.assertEqual(set(), nodes[2].depends_on)
+        self.assertEqual({0}, nodes[3].depends_on)
+
+    def test_computed_property_name_is_barrier(self):
+        filename = self.write_http(
+            "GET http://localhost:8000/get\n"
+            "> {%\n"
+            "def test_set():\n"
+            "    name = 'a'\n"
+            "    client.properties.set(name, 1)\n"
+            "%} python\n\n"
+            "GET http://localhost:8000/get\n"
+        )
+        nodes = TargetPlanner(get_config(filename)).plan()
+        self.assertEqual(["1", "2"], [node.target for node in nodes])
+        self.assertTrue(nodes[0].produces_unknown)
+        self.assertEqual({0}, nodes[1].depends_on)
+
+    def test_parallel_run(self):
+        finished = []
+        runner = MultiTargetRunner(
+            get_config(dependent_file), parallel=4, on_result=lambda result: finished.append(result.target)
+        )
+        results = runner.run()
+        self.assertEqual(["login", "profile", "status", "echo"], [result.target for result in results])
+        self.assertTrue(all(result.success for result in results), results)
+        self.assertEqual([200, 200, 201, 200], [result.status for result in results])
+        # property set by login is visible to targets after it
+        self.assertEqual({"token": "secret"}, results[0].properties)
+        self.assertEqual({"token": "secret"}, runner.properties)
+        self.assertLess(finished.index("login"), finished.index("profile"))
+        self.assertLess(finished.index("login"), finished.index("echo"))
+
+    def test_target_with_parallel_rejected(self):
+        stderr = io.StringIO()
+        with redirect_stderr(stderr), self.assertRaises(SystemExit) as exit_info:
+            main([dependent_file, "--target", "status", "--parallel", "2"])
+        self.assertEqual(1, exit_info.exception.code)
+        self.assertIn("target and parallel are conflicting options", stderr.getvalue())
+
+    def test_selected_targets(self):
+        results = MultiTargetRunner(get_config(dependent_file), ["status", "profile"]).run()
+        self.assertEqual(201, results[0].status)
+        # login is not run, token is not set
+        self.assertFalse(results[1].success)
+        self.assertEqual(1, results[1].failed_tests)
+
+    def test_dependents_skipped_on_failure(self):
+        filename = self.write_http(
+            'var token = "none";\n'
+            '@name("login")\n'
+            "GET http://localhost:8000/status/500\n"
+            "> {%\n"
+            "def test_set():\n"
+            "    client.properties.set('token', 'value')\n"
+            "%} python\n\n"
+            '@name("use")\n'
+            "GET http://localhost:8000/get?token={{token}}\n"
+        )
+        results = MultiTargetRunner(get_config(filename), parallel=2).run()
+        self.assertEqual(500, results[0].status)
+        self.assertTrue(results[1].skipped)
+        self.assertIn("login", results[1].error)
+
+    def test_script_references(self):
+        filename = self.write_http(
+            '@name("login")\n'
+            "GET http://localhost:8000/get\n"
+            "> {%\n"
+            "def test_set():\n"
+            "    client.properties.set('token', 'value')\n"
+            "%} python\n\n"
+            '@name("check")\n'
+            "GET http://localhost:8000/get\n"
+            "> {%\n"
+            "def test_token():\n"
+            "    assert client.properties['token'] == 'value'\n"
+            "%} python\n\n"
+            '@name("chained")\n'
+            "GET http://localhost:8000/get\n"
+            "> {%\n"
+            "def test_chained():\n"
+            "    client.properties.set('other', client.properties.get('token'))\n"
+            "%} python\n\n"
+            '@name("last")\n'
+            "GET http://localhost:8000/get?other={{other}}\n"
+        )
+        nodes = TargetPlanner(get_config(filename)).plan()
+        self.assertEqual({0}, nodes[1].depends_on)
+        self.assertEqual({0}, nodes[2].depends_on)
+        self.assertEqual({2}, nodes[3].depends_on)
+        self.assertEqual({0, 2}, nodes[3].ancestors)
+        results = MultiTargetRunner(get_config(filename), parallel=4).run()
+        self.assertTrue(all(result.success for result in results), results)
+
+    def test_properties_of_independent_targets(self):
+        filename = self.write_http(
+            'var token = "none";\n'
+            'var other = "none";\n'
+            '@name("token")\n'
+            "GET http://localhost:8000/get\n"
+            "> {%\n"
+            "def test_set():\n"
+            "    client.properties.set('token', 'value')\n"
+            "%} python\n\n"
+            '@name("other")\n'
+            "GET http://localhost:8000/get\n"
+            "> {%\n"
+            "def test_set():\n"
+            "    client.properties.set('other', 'value')\n"
+            "%} python\n\n"
+            '@name("use")\n'
+            "GET http://localhost:8000/get?token={{token}}&other={{other}}\n"
+        )
+        nodes = TargetPlanner(get_config(filename)).plan()
+        self.assertEqual({0, 1}, nodes[2].depends_on)
+        # `other` doesn't depend on `token`, it doesn't see `token` in any order
+        self.assertEqual(set(), nodes[1].ancestors)
+        runner = MultiTargetRunner(get_config(filename), parallel=1)
+        results = runner.run()
+        self.assertTrue(all(result.success for result in results), results)
+        self.assertEqual({"token", "other"}, set(runner.properties))
+        self.assertEqual({}, runner.get_compiler(runner.nodes[1]).property_util.command_line_properties)
+        self.assertEqual(
+            {"token": "value", "other": "value"},
+            runner.get_compiler(runner.nodes[2]).property_util.command_line_properties,
+        )
@@ -0,0 +1,100 @@
+import os
+import ssl
+import tempfile
+import threading
+import time
+import unittest
+from http.server import ThreadingHTTPServer
+
+from dothttp.utils.timing import PHASES, RequestTimings, format_timings
+from test import TestBase
+from test.core.test_client_cert import OkHandler, cert_file, key_file
+
+
+class RequestTimingsTest(unittest.TestCase):
+    def test_nested_phases_exclusive(self):
+        timings = RequestTimings()
+        with timings.measure("load_def"):
+            time.sleep(0.01)
+            with timings.measure("auth"):
+                time.sleep(0.05)
+            time.sleep(0.01)
+        self.assertGreaterEqual(timings.get("auth"), 0.05)
+        self.assertGreaterEqual(timings.get("load_def"), 0.02)
+        self.assertLess(timings.get("load_def"), 0.05)
+        self.assertAlmostEqual(timings.get("load_def") + timings.get("auth"), timings.total)
+
+    def test_to_dict_and_har(self):
+        timings = RequestTimings()
+        timings.add("send", 0.001)
+        timings.add("ttfb", 0.02)
+        timings.add("download", 0.003)
+        data = timings.to_dict()
+        self.assertEqual(list(PHASES) + ["total"], list(data))
+        self.assertEqual((0, 20.0, 24.0), (data["dns"], data["ttfb"], data["total"]))
+        har = timings.to_har()
+        # reused connection
+        self.assertEqual((-1, -1, -1), (har["dns"], har["connect"], har["ssl"]))
+        self.assertEqual((1.0, 20.0, 3.0), (har["send"], har["wait"], har["receive"]))
+        timings.add("connect", 0.002)
+        timings.add("tls", 0.004)
+        self.assertEqual((6.0, 4.0), (timings.to_har()["connect"], timings.to_har()["ssl"]))
+        self.assertIn("ttfb", format_timings(timings))
+        self.assertNotIn("dns", format_timings(timings))
+
+
+class RequestPhasesTest(TestBase):
+    tls = False
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("localhost", 0), OkHandler)
+        if cls.tls:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(cert_file, key_file)
+            cls.server.socket = context.wrap_socket(cls.server.socket, server_side=True)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def get_file(self):
+        scheme = "https" if self.tls else "http"
+        with tempfile.NamedTemporaryFile("w", suffix=".http", delete=False) as f:
+            f.write(
+                "@insecure\n"
+                f'GET "{scheme}://localhost:{self.server.server_port}/"\n'
+                "> {%\n"
+                "def test_ok():\n"
+                "    assert client.response.status_code == 200\n"
+                "%}\n"
+            )
+        self.addCleanup(os.remove, f.name)
+        return f.name
+
+    def run_request(self, filename):
+        comp = self.get_req_comp(filename)
+        resp = comp.get_response()
+        self.assertEqual(200, resp.status_code)
+        comp.script_execution.execute_test_script(resp)
+        return comp.timings
+
+    def test_phases(self):
+        filename = self.get_file()
+        timings = self.run_request(filename)
+        for phase in ("parse", "properties", "load_def", "pre_request_script", "dns", "connect", "send", "ttfb",
+                      "download", "test_script"):
+            self.assertIn(phase, timings.phases)
+        self.assertEqual(self.tls, "tls" in timings.phases)
+        # connection is reused
+        timings = self.run_request(filename)
+        self.assertNotIn("dns", timings.phases)
+        self.assertNotIn("connect", timings.phases)
+        self.assertIn("ttfb", timings.phases)
+
+
+class TlsRequestPhasesTest(RequestPhasesTest):
+    tls = True
@@ -0,0 +1,101 @@
+import io
+import json
+import os
+import subprocess
+import sys
+from test import TestBase
+
+from dotextensions.server.batch import BatchRunner
+from dotextensions.server.handlers.basic_handlers import RunHttpFileHandler
+from dotextensions.server.models import Command
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+command_dir = f"{dir_path}/commands"
+package_dir = os.path.dirname(os.path.dirname(dir_path))
+
+
+class BatchTest(TestBase):
+    def run_batch(self, jobs, workers=1, defaults=None):
+        output = io.StringIO()
+        runner = BatchRunner(output, workers, defaults)
+        summary = runner.run([job if isinstance(job, str) else json.dumps(job) for job in jobs])
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        return summary, {result["id"]: result["result"] for result in results}
+
+    def test_same_result_as_server(self):
+        summary, results = self.run_batch([{"id": "simple", "file": f"{command_dir}/simple.http"}])
+        self.assertTrue(summary.success)
+        expected = RunHttpFileHandler().run(
+            Command(method=RunHttpFileHandler.name, params={"file": f"{command_dir}/simple.http"}, id=1)
+        ).result
+        result = results["simple"]
+        self.assertEqual(set(expected), set(result))
+        self.assertEqual(expected["http"], result["http"])
+        self.assertEqual(200, result["status"])
+
+    def test_parallel_jobs(self):
+        jobs = [
+            {"id": index, "file": f"{command_dir}/complexrun.http", "target": "2"}
+            for index in range(6)
+        ]
+        summary, results = self.run_batch(jobs, workers=3)
+        self.assertEqual(6, summary.jobs)
+        self.assertTrue(summary.success)
+        self.assertEqual(set(range(6)), set(results))
+        for result in results.values():
+            self.assertEqual(
+                "http://localhost:8000/post?startusing=dothttp", json.loads(result["body"])["url"]
+            )
+
+    def test_content_and_properties(self):
+        summary, results = self.run_batch(
+            [{"content": "GET http://localhost:8000/get?name={{name}}", "properties": {"name": "batch"}}]
+        )
+        self.assertTrue(summary.success)
+        self.assertEqual({"name": "batch"}, json.loads(results[1]["body"])["args"])
+
+    def test_defaults(self):
+        content = "GET http://localhost:8000/get?name={{name}}&other={{other}}"
+        _, results = self.run_batch(
+            [
+                {"content": content},
+                {"content": content, "properties": {"name": "job"}},
+            ],
+            defaults={"properties": {"name": "default", "other": "default"}},
+        )
+        self.assertEqual({"name": "default", "other": "default"}, json.loads(results[1]["body"])["args"])
+        # merged over command line properties
+        self.assertEqual({"name": "job", "other": "default"}, json.loads(results[2]["body"])["args"])
+
+    def test_errors_are_not_logged(self):
+        with self.assertNoLogs("handler", level="INFO"):
+            summary, results = self.run_batch([{"file": f"{command_dir}/missing.http"}])
+        self.assertEqual(1, summary.errors)
+        self.assertTrue(results[1]["error"])
+        self.assertIn("missing.http", results[1]["error_message"])
+
+    def test_invalid_jobs(self):
+        summary, results = self.run_batch(["not json", "", {"target": "1"}, [1]])
+        self.assertEqual(3, summary.jobs)
+        self.assertEqual(3, summary.errors)
+        self.assertEqual("not json decodable", results[1]["error_message"])
+        self.assertEqual("job needs `file` or `content`", results[3]["error_message"])
+        self.assertTrue(results[4]["error"])
+
+    def test_cli(self):
+        jobs = "\n".join(
+            json.dumps({"id": index, "file": f"{command_dir}/simple.http"}) for index in range(3)
+        )
+        output = subprocess.run(
+            [sys.executable, "-m", "dothttp", "--batch", "--parallel", "2"],
+            input=jobs,
+            capture_output=True,
+            text=True,
+            cwd=package_dir,
+            env={**os.environ, "DOTHTTP_NO_DAEMON": "1"},
+        )
+        self.assertEqual(0, output.returncode, output.stderr)
+        results = [json.loads(line) for line in output.stdout.splitlines()]
+        self.assertEqual({0, 1, 2}, {result["id"] for result in results})
+        self.assertTrue(all(result["result"]["status"] == 200 for result in results))
+        self.assertIn("3 jobs, 3 succeeded, 0 failed", output.stderr)
@@ -360,6 +360,21 @@ class FileExecute(TestBase):
         self.assertEqual({}, body["args"])
         self.assertEqual("http://localhost:8000/get", body["url"])
 
+    def test_execute_profile(self):
+        result = self.execute_handler.run(
+            Command(
+                method=RunHttpFileHandler.name,
+                params={"file": f"{command_dir}/simple.http", "profile": {"mode": "cprofile"}},
+                id=1,
+            )
+        )
+        self.assertEqual(200, result.result["status"])
+        profile = result.result["profile"]
+        self.assertEqual("cprofile", profile["mode"])
+        functions = [stat["function"] for stat in profile["top"]]
+        self.assertTrue(functions)
+        self.assertTrue(all(function.startswith("dothttp") for function in functions))
+
     def test_complex_file(self):
         result = self.execute_handler.run(
             Command(
@@ -0,0 +1,164 @@
+from test import TestBase
+from test.core.test_model_cache import positions
+
+from dothttp.parse import dothttp_model
+from dotextensions.server.document import HttpDocument, TextEdit, document_store
+from dotextensions.server.handlers.basic_handlers import (
+    ContentNameReferencesHandler,
+    GetHoveredResolvedParamContentHandler,
+)
+from dotextensions.server.handlers.document_handlers import (
+    DocumentChangeHandler,
+    DocumentCloseHandler,
+    DocumentOpenHandler,
+)
+from dotextensions.server.handlers.gohandler import TypeFromPos
+from dotextensions.server.models import Command
+
+content = """var host = "httpbin.org";
+
+@name("first")
+GET "https://{{host}}/get"
+"header": "value"
+
+@name("second"): "first"
+POST "/post"
+json({"a": 1})
+
+# comment
+@name("third")
+PUT "https://{{host}}/put"
+"""
+
+
+class HttpDocumentTest(TestBase):
+    def assert_same_as_complete_parse(self, document: HttpDocument):
+        self.assertEqual(
+            list(positions(dothttp_model.model_from_str(document.content))),
+            list(positions(document.get_model())),
+        )
+
+    def apply(self, document: HttpDocument, old: str, new: str, version=None):
+        start = document.content.index(old)
+        document.apply_change([TextEdit(start, start + len(old), new)], version)
+
+    def test_edit_reparses_only_touched_definition(self):
+        document = HttpDocument("test.http", content)
+        self.apply(document, '"/post"', '"/post/edited"')
+        self.assertEqual(1, document.full_parses)
+        self.assertEqual(1, document.partial_parses)
+        self.assertEqual("/post/edited", document.get_model().allhttps[1].urlwrap.url)
+        self.assert_same_as_complete_parse(document)
+
+    def test_edits_adding_and_removing_definitions(self):
+        document = HttpDocument("test.http", content)
+        for old, new in [
+            ("# comment\n", 'GET "https://httpbin.org/new"\n'),
+            ('"header": "value"\n', '"header": "value"\n"other": "header"\n'),
+            ('@name("first")\n', ""),
+            ('var host = "httpbin.org";', 'var host = "example.com";\nvar a = 1;'),
+            ('json({"a": 1})\n', ""),
+        ]:
+            self.apply(document, old, new)
+            self.assert_same_as_complete_parse(document)
+        self.assertEqual(4, len(document.get_model().allhttps))
+
+    def test_syntax_error_and_recovery(self):
+        document = HttpDocument("test.http", content)
+        self.apply(document, 'json({"a": 1})', 'json({"a": ')
+        with self.assertRaises(Exception):
+            document.get_model()
+        self.apply(document, 'json({"a": ', 'json({"a": 2})')
+        self.assert_same_as_complete_parse(document)
+
+    def test_out_of_order_changes(self):
+        document = HttpDocument("test.http", content, version=1)
+        start = content.index('"/post"') + 1
+        document.apply_change([TextEdit(start + 1, start + 1, "b")], 3)
+        self.assertEqual(1, document.version)
+        document.apply_change([TextEdit(start + 1, start + 1, "a")], 2)
+        self.assertEqual(3, document.version)
+        self.assertEqual("/bapost", document.get_model().allhttps[1].urlwrap.url)
+        # stale change is ignored
+        document.apply_change([TextEdit(0, 0, "x")], 3)
+        self.assert_same_as_complete_parse(document)
+
+
+class DocumentHandlersTest(TestBase):
+    uri = "file:///document-handlers.http"
+
+    def setUp(self) -> None:
+        result = DocumentOpenHandler().run(
+            Command(method="/document/open", params={"uri": self.uri, "content": content, "version": 1}, id=1)
+        )
+        self.assertEqual({"uri": self.uri, "version": 1, "error": False, "valid": True}, result.result)
+        self.addCleanup(document_store.close, self.uri)
+
+    def test_change_then_lookup(self):
+        start = content.index("# comment")
+        result = DocumentChangeHandler().run(
+            Command(
+                method="/document/change",
+                params={
+                    "uri": self.uri,
+                    "version": 2,
+                    "changes": [{"start": start, "end": start + len("# comment"), "text": ""}],
+                },
+                id=2,
+            )
+        )
+        self.assertFalse(result.result["error"])
+        document = document_store.get(self.uri)
+        position = document.content.index("/post") + 1
+        result = TypeFromPos().run(
+            Command(method="/content/type", params={"uri": self.uri, "position": position}, id=3)
+        )
+        self.assertEqual(
+            {
+                "type": "url",
+                "target": "second",
+                "target_base": "first",
+                "base_start": document.content.index('@name("first")'),
+            },
+            result.result,
+        )
+        result = ContentNameReferencesHandler().run(
+            Command(method="/content/names", params={"uri": self.uri}, id=4)
+        )
+        self.assertEqual(
+            ["first", "second", "third"],
+            [name["name"] for name in result.result["names"]],
+        )
+
+    def test_hover_after_change(self):
+        start = content.index("/post")
+        DocumentChangeHandler().run(
+            Command(
+                method="/document/change",
+                params={"uri": self.uri, "version": 2, "changes": [{"start": start, "end": start + 5, "text": "/edited"}]},
+                id=2,
+            )
+        )
+        document = document_store.get(self.uri)
+        position = document.content.index("/edited") + 1
+        # only uri is sent, content of synced document is resolved
+        result = GetHoveredResolvedParamContentHandler().run(
+            Command(method="/content/resolve", params={"uri": self.uri, "position": position}, id=3)
+        )
+        self.assertEqual("url", result.result["type"])
+        self.assertEqual("second", result.result["target"])
+        self.assertEqual("https://httpbin.org/get/edited", result.result["resolved"])
+
+    def test_invalid_change(self):
+        result = DocumentChangeHandler().run(
+            Command(
+                method="/document/change",
+                params={"uri": self.uri, "changes": [{"start": 0, "end": 100000, "text": ""}]},
+                id=2,
+            )
+        )
+        self.assertTrue(result.result["error"])
+        result = DocumentCloseHandler().run(
+            Command(method="/document/close", params={"uri": "not-open"}, id=3)
+        )
+        self.assertTrue(result.result["error"])
@@ -63,6 +63,22 @@ class ToHarTest(TestBase):
             result.result,
         )
 
+    def test_timings(self):
+        command = Command(
+            method=Http2Har.name,
+            params={
+                "content": "GET http://{{host=localhost:8000}}/get",
+                "target": "1",
+                "timings": True,
+            },
+            id=1,
+        )
+        result = self.execute_handler.run(command=command)
+        timings = result.result["timings"]["1"]
+        # not sent
+        self.assertEqual((-1, -1, 0), (timings["dns"], timings["connect"], timings["wait"]))
+        self.assertGreater(timings["_parse"], 0)
+
     def test_content_target(self):
         self.complex_test(file=f"{command_dir}/complexrun.http", content=None)
 